@@ -1,32 +1,24 @@
 # app/api/v1/auth.py
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 
 from app.schemas.auth import LoginRequest, TokenPair, MeResponse
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    verify_password,
+    verify_password_async,
     get_current_user,
 )
 from app.core.config import settings
-from app.core.db import get_db
+from app.db.session import get_session
 from app.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def safe_verify(plain: str, hashed: str | None) -> bool:
-    if not hashed or not isinstance(hashed, str):
-        return False
-    try:
-        return verify_password(plain, hashed)
-    except Exception:
-        # например, хеш в неожиданном формате — считаем невалидным
-        return False
-
 @router.post("/login", response_model=TokenPair)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_session)):
     email = payload.email.strip().lower()
 
     # 0) Быстрый путь — админ из .env (обход БД, чтобы не ловить 500 из-за БД)
@@ -42,24 +34,33 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         )
 
     # 1) Основной путь — пользователь в БД
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
 
-    # 2) Проверка пароля — строго через safe_verify, чтобы не уронить сервер
-    if not user or not safe_verify(payload.password, getattr(user, "password_hash", None)):
+    # 2) Проверка пароля — в отдельном ограниченном пуле (argon2 — CPU-тяжёлая операция);
+    # битый хеш = неверный пароль, сервер не падает
+    ok, new_hash = (False, None)
+    if user:
+        ok, new_hash = await verify_password_async(payload.password, user.password_hash)
+    if not ok:
         # всегда одинаковый ответ — не раскрываем, существует ли email
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # 3) Схема/параметры хеша устарели (bcrypt -> argon2) — пересохраняем, пока пароль на руках
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     return TokenPair(
         access=create_access_token(user.email),
         refresh=create_refresh_token(user.email),
     )
 
 @router.get("/me", response_model=MeResponse)
-def me(current=Depends(get_current_user)):
+async def me(current=Depends(get_current_user)):
     return MeResponse(email=current.email, role=current.role, is_active=current.is_active)
 
 @router.post("/refresh", response_model=TokenPair)
-def refresh(refresh_token: str):
+async def refresh(refresh_token: str):
     try:
         payload = jwt.decode(refresh_token, settings.JWT_SECRET, algorithms=[settings.ALGO])
         if payload.get("type") != "refresh":
@@ -1,42 +1,71 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Header
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4  # на будущее, если понадобится строгая валидация UUID4
 from starlette.status import HTTP_404_NOT_FOUND
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, cast, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, cast, String
 
 from uuid import UUID
 
+from app.core.pagination import Keyset, fetch_page
+from app.core.querybudget import query_budget
+from app.core.serialization import FastJSONResponse, Projection, page_response
+from app.core import search as search_index
+from app.core.config import settings
 from app.core.security import require_roles
-from app.core.db import get_db
+from app.db.session import get_session
+from app.importers.employees import EmployeeImport
 from app.models.employee import Employee
 from app.models.assessment import Assessment
+from app.models.career import CareerHistory
+from app.models.hierarchy import EmployeeHierarchy, ancestors_stmt
+from app.models.review import Review
+from app.models.role import Role
+from app.models.succession import Succession
+from app.reports import service as reports
+from app.reports.context import idp_contexts
 from app.schemas.assessment import AssessmentList, AssessmentOut
-from app.schemas.employee import EmployeeList, EmployeeOut
+from app.schemas.career import CareerHistoryOut
+from app.schemas.employee import EmployeeImportResult, EmployeeList, EmployeeOut, EmployeeProfile
+from app.schemas.review import ReviewOut
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
+EMPLOYEES_ORDER = Keyset(Employee.name, Employee.id)
+ASSESSMENTS_ORDER = Keyset(Assessment.date.desc(), Assessment.id.desc())
+
+# list-эндпоинты выбирают только поля схемы и отдают их через orjson
+EMPLOYEE_OUT = Projection(Employee, EmployeeOut)
+ASSESSMENT_OUT = Projection(Assessment, AssessmentOut)
+CAREER_OUT = Projection(CareerHistory, CareerHistoryOut)
+REVIEW_OUT = Projection(Review, ReviewOut)
+
 
 @router.get("", response_model=EmployeeList, dependencies=[Depends(require_roles())])
-def list_employees(
-    db: Session = Depends(get_db),
+@query_budget(2)
+async def list_employees(
+    db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=200),
+    cursor: str | None = None,
+    with_total: bool | None = None,
     search: str | None = None,
     role: str | None = None,   # на будущее (из title или join)
     dept: str | None = Query(None, alias="dept"),
     unit: str | None = None,
-    manager: str | None = None  # UUID строкой
+    manager: str | None = None,  # UUID строкой
+    fields: str | None = Query(None, description="Поля через запятую (id и ключи сортировки — всегда)"),
 ):
-    stmt = select(Employee)
+    projection = EMPLOYEE_OUT.only(fields, keep=EMPLOYEES_ORDER.columns)
+    stmt = projection.select()
+    rank = None
 
     if search:
-        like = f"%{search}%"
-        stmt = stmt.where(
-            func.lower(Employee.name).like(func.lower(like)) |
-            func.lower(Employee.email).like(func.lower(like)) |
-            func.lower(Employee.title).like(func.lower(like))
-        )
+        # name/email/title через нормализованный search_text (trigram-индекс в Postgres)
+        where, rank = search_index.match(Employee.search_text, search)
+        if where is not None:
+            stmt = stmt.where(where)
     if dept:
         stmt = stmt.where(Employee.department == dept)
     if unit:
@@ -45,42 +74,156 @@ def list_employees(
         # фильтр по менеджеру: сравниваем UUID как строку
         stmt = stmt.where(cast(Employee.manager_id, String) == manager)
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
-    stmt = stmt.order_by(Employee.name).offset((page - 1) * per_page).limit(per_page)
-    items = db.scalars(stmt).all()
+    items, total, next_cursor = await fetch_page(
+        db, stmt, EMPLOYEES_ORDER,
+        page=page, per_page=per_page, cursor=cursor, with_total=with_total, rank=rank,
+    )
+
+    return page_response(
+        projection, items,
+        page=page, per_page=per_page, total=total, next_cursor=next_cursor,
+    )
+
 
-    return EmployeeList(
-        items=[EmployeeOut.model_validate(i, from_attributes=True) for i in items],
-        page=page,
-        per_page=per_page,
-        total=total or 0,
+@router.post("/import", response_model=EmployeeImportResult, dependencies=[Depends(require_roles("hr", "admin"))])
+async def import_employees(
+    file: UploadFile = File(...),  # CSV (UTF-8, «,» или «;») или XLSX
+    db: AsyncSession = Depends(get_session),
+):
+    """Upsert сотрудников по email + руководители вторым проходом; ошибки — построчно."""
+    try:
+        return await EmployeeImport(db).run(file.file, file.filename)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+
+
+@router.get("/idp.zip", dependencies=[Depends(require_roles("hr", "admin"))])
+async def department_idp_zip(department: str, db: AsyncSession = Depends(get_session)):
+    """ИПР всех сотрудников подразделения одним ZIP; архив отдаётся по мере рендера."""
+    ids = (await db.scalars(
+        select(Employee.id).where(Employee.department == department).limit(settings.PDF_BATCH_MAX + 1)
+    )).all()
+    if not ids:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Department not found")
+    if len(ids) > settings.PDF_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"More than {settings.PDF_BATCH_MAX} employees")
+
+    contexts = await idp_contexts(db, ids)
+    entries = [
+        (reports.safe_filename(f"{ctx['employee']['name']}_{str(employee_id)[:8]}", ".pdf"), "idp.html.j2", ctx)
+        for employee_id, ctx in contexts.items()
+    ]
+    filename = reports.safe_filename(f"IDP_{department}", ".zip")
+    return StreamingResponse(
+        reports.zip_stream(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": reports.disposition(filename, "attachment")},
     )
 
 
 @router.get("/{employee_id}", response_model=EmployeeOut, dependencies=[Depends(require_roles())])
-def get_employee(employee_id: UUID, db: Session = Depends(get_db)):
-    obj = db.get(Employee, employee_id)
-    if not obj:
+@query_budget(1)
+async def get_employee(
+    employee_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    fields: str | None = Query(None, description="Поля через запятую (id — всегда)"),
+):
+    projection = EMPLOYEE_OUT.only(fields)
+    row = (await db.execute(projection.select().where(Employee.id == employee_id))).first()
+    if not row:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Employee not found")
-    return EmployeeOut.model_validate(obj, from_attributes=True)
+    return FastJSONResponse(projection.dump([row])[0])
 
 
 @router.get("/{employee_id}/assessments", response_model=AssessmentList, dependencies=[Depends(require_roles())])
-def list_employee_assessments(
+@query_budget(3)
+async def list_employee_assessments(
     employee_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=200),
+    cursor: str | None = None,
+    with_total: bool | None = None,
+):
+    base = ASSESSMENT_OUT.select().where(Assessment.employee_id == employee_id)
+    items, total, next_cursor = await fetch_page(
+        db, base, ASSESSMENTS_ORDER,
+        page=page, per_page=per_page, cursor=cursor, with_total=with_total,
+    )
+    # чёткая 404, если сотрудника нет; есть оценки — значит, есть и сотрудник
+    if not items and not await db.scalar(select(Employee.id).where(Employee.id == employee_id)):
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Employee not found")
+
+    return page_response(
+        ASSESSMENT_OUT, items,
+        page=page, per_page=per_page, total=total, next_cursor=next_cursor,
+    )
+
+
+@router.get("/{employee_id}/profile", response_model=EmployeeProfile, dependencies=[Depends(require_roles())])
+@query_budget(6)
+async def get_employee_profile(
+    employee_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    assessments: int = Query(5, ge=0, le=50),
+    reviews: int = Query(10, ge=0, le=100),
 ):
-    # чёткая 404, если сотрудника нет
-    exists = db.get(Employee, employee_id)
-    if not exists:
+    """
+    Всё для карточки сотрудника за один HTTP-запрос и фиксированные 6 SQL-запросов
+    (по одному на блок, без N+1): сотрудник, последние оценки, карьера, отзывы,
+    «звёзды» преемственности с названием роли и цепочка руководителей из closure table.
+    """
+    row = (await db.execute(EMPLOYEE_OUT.select().where(Employee.id == employee_id))).first()
+    if not row:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Employee not found")
 
-    base = select(Assessment).where(Assessment.employee_id == employee_id)
-    total = db.scalar(select(func.count()).select_from(base.subquery()))
-    stmt = base.order_by(Assessment.date.desc()).offset((page - 1) * per_page).limit(per_page)
-    items = db.scalars(stmt).all()
+    assessment_rows = (await db.execute(
+        ASSESSMENTS_ORDER.order_by(ASSESSMENT_OUT.select().where(Assessment.employee_id == employee_id))
+        .limit(assessments)
+    )).all()
+    career_rows = (await db.execute(
+        CAREER_OUT.select().where(CareerHistory.employee_id == employee_id)
+        .order_by(CareerHistory.started_at.desc(), CareerHistory.id.desc())
+    )).all()
+    review_rows = (await db.execute(
+        REVIEW_OUT.select().where(Review.employee_id == employee_id)
+        .order_by(Review.date.desc(), Review.id.desc())
+        .limit(reviews)
+    )).all()
+    star_rows = (await db.execute(
+        select(
+            Succession.id, Succession.target_role, Role.name.label("role_name"), Role.division,
+            Succession.notes, Succession.created_at,
+        )
+        .join(Role, Role.id == Succession.target_role)
+        .where(Succession.employee_id == employee_id, Succession.is_starred.is_(True))
+        .order_by(Succession.created_at.desc())
+    )).all()
+    manager_rows = (await db.execute(
+        ancestors_stmt(employee_id).with_only_columns(
+            Employee.id, Employee.name, Employee.title, Employee.avatar_url, EmployeeHierarchy.depth,
+        )
+    )).all()
+
+    return FastJSONResponse({
+        "employee": EMPLOYEE_OUT.dump([row])[0],
+        "assessments": ASSESSMENT_OUT.dump(assessment_rows),
+        "career": CAREER_OUT.dump(career_rows),
+        "reviews": REVIEW_OUT.dump(review_rows),
+        "succession": [r._asdict() for r in star_rows],
+        "managers": [r._asdict() for r in manager_rows],
+    })
+
 
-    out = [AssessmentOut.model_validate(i, from_attributes=True) for i in items]
-    return AssessmentList(items=out, page=page, per_page=per_page, total=total or 0)
+@router.get("/{employee_id}/idp.pdf", dependencies=[Depends(require_roles())])
+async def employee_idp_pdf(
+    employee_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    if_none_match: str | None = Header(None),
+):
+    """ИПР сотрудника в PDF: цели, разрыв компетенций с эталоном, активности и сроки, 360°."""
+    context = (await idp_contexts(db, [employee_id])).get(employee_id)
+    if context is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Employee not found")
+    filename = reports.safe_filename(f"IDP_{context['employee']['name']}", ".pdf")
+    return await reports.pdf_response("idp.html.j2", context, filename, if_none_match)
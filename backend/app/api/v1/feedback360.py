@@ -0,0 +1,107 @@
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from app.core import feedback360 as aggregates
+from app.core.querybudget import query_budget
+from app.core.security import require_roles
+from app.core.serialization import FastJSONResponse
+from app.db.session import get_session
+from app.importers.feedback360 import ingest
+from app.models.employee import Employee
+from app.models.feedback360 import GROUPS, Feedback360Score
+from app.schemas.feedback360 import Feedback360Employee, Feedback360Summary, Feedback360UploadResult
+
+router = APIRouter(prefix="/feedback360", tags=["feedback360"])
+
+Preset = Literal["equal", "manager40", "peers40", "custom"]
+
+
+@router.get("/summary", response_model=Feedback360Summary, dependencies=[Depends(require_roles())])
+@query_budget(3)
+async def department_summary(
+    department: str,
+    db: AsyncSession = Depends(get_session),
+    cycle: str | None = None,  # по умолчанию — последний цикл подразделения
+    preset: Preset = "equal",
+):
+    """Метрики 360° всех сотрудников подразделения (и по компетенциям) за один проход."""
+    people = (await db.execute(
+        select(Employee.id, Employee.name, Employee.title)
+        .where(Employee.department == department)
+        .order_by(Employee.name, Employee.id)
+    )).all()
+    ids = [p.id for p in people]
+    if cycle is None and ids:
+        cycle = await db.scalar(select(func.max(Feedback360Score.cycle)).where(Feedback360Score.employee_id.in_(ids)))
+    if cycle is None:
+        return FastJSONResponse({"department": department, "cycle": None, "preset": preset, "items": []})
+
+    per_employee = await aggregates.load_sums(db, ids, cycle)
+    summary = aggregates.summarize(per_employee, aggregates.WEIGHT_PRESETS[preset])
+    items = [
+        {"employee_id": p.id, "name": p.name, "title": p.title, "cycle": cycle, **summary[p.id]}
+        for p in people if per_employee[p.id].competencies
+    ]
+    return FastJSONResponse({"department": department, "cycle": cycle, "preset": preset, "items": items})
+
+
+@router.get("/{employee_id}", response_model=Feedback360Employee, dependencies=[Depends(require_roles())])
+@query_budget(3)
+async def employee_feedback(
+    employee_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    cycle: str | None = None,  # по умолчанию — последний цикл сотрудника
+    preset: Preset = "equal",
+):
+    person = (await db.execute(
+        select(Employee.id, Employee.name, Employee.title).where(Employee.id == employee_id)
+    )).first()
+    if not person:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if cycle is None:
+        cycle = await db.scalar(
+            select(func.max(Feedback360Score.cycle)).where(Feedback360Score.employee_id == employee_id)
+        )
+
+    body = {"employee_id": person.id, "name": person.name, "title": person.title, "cycle": cycle,
+            "overall": None, "competencies": []}
+    if cycle is None:
+        return FastJSONResponse(body)
+
+    per_employee = await aggregates.load_sums(db, [employee_id], cycle)
+    body.update(aggregates.summarize(per_employee, aggregates.WEIGHT_PRESETS[preset])[employee_id])
+
+    S = Feedback360Score
+    questions: dict[str, list] = {}
+    rows = (await db.execute(
+        select(S.competency, S.question, S.peers, S.reports, S.manager, S.self_)
+        .where(S.employee_id == employee_id, S.cycle == cycle)
+        .order_by(S.position)
+    )).all()
+    for competency, question, *scores in rows:
+        questions.setdefault(competency, []).append({"question": question, "scores": dict(zip(GROUPS, scores))})
+    for comp in body["competencies"]:
+        comp["questions"] = questions.get(comp["name"], [])
+    return FastJSONResponse(body)
+
+
+@router.post("/{employee_id}", response_model=Feedback360UploadResult, status_code=201,
+             dependencies=[Depends(require_roles("hr", "admin"))])
+async def upload_feedback(
+    employee_id: UUID,
+    cycle: str = Query(..., min_length=1, max_length=32),
+    file: UploadFile = File(...),  # XLSX (или CSV) в формате анкеты 360°
+    db: AsyncSession = Depends(get_session),
+):
+    """Заменить ответы 360° сотрудника за цикл содержимым файла."""
+    if not await db.scalar(select(Employee.id).where(Employee.id == employee_id)):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    try:
+        result = await ingest(db, employee_id, cycle, file.file, file.filename)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    return FastJSONResponse(result, status_code=201)
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from pathlib import Path
-from uuid import uuid4
-import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
 
-from app.core.db import get_db
+from app.core.avatars import save_avatar
+from app.core.config import settings
+from app.core.security import Principal, require_roles
+from app.db.session import get_session
+from app.models.employee import Employee
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -14,29 +16,37 @@ ALLOWED = {"image/jpeg", "image/png", "image/webp"}
 @router.post("/avatar")
 async def upload_avatar(
     file: UploadFile = File(...),                # ключ FormData — "file"
-    employee_id: str | None = Form(None),       # опционально
-    db: Session = Depends(get_db),
+    employee_id: UUID | None = Form(None),      # опционально: сразу проставить Employee.avatar_url
+    db: AsyncSession = Depends(get_session),
+    user: Principal = Depends(require_roles()),
 ):
     if file.content_type not in ALLOWED:
         raise HTTPException(status_code=415, detail="Unsupported image type")
-
-    media_root = Path(os.environ.get("MEDIA_DIR", "/app/media"))
-    dest_dir = media_root / "avatars"
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    ext = (Path(file.filename).suffix or ".jpg").lower()
-    name = f"{uuid4().hex}{ext}"
-    dest_path = dest_dir / name
-
-    try:
-        with dest_path.open("wb") as fout:
-            while True:
-                chunk = await file.read(1024 * 1024)
-                if not chunk:
-                    break
-                fout.write(chunk)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Save failed: {e}")
-
-    url = f"/media/avatars/{name}"
-    return JSONResponse({"url": url, "filename": file.filename, "content_type": file.content_type, "size": dest_path.stat().st_size}, status_code=201)
+    # multipart уже разобран во временный файл — отсекаем большой до чтения/декодирования
+    if file.size is not None and file.size > settings.AVATAR_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Avatar larger than {settings.AVATAR_MAX_BYTES} bytes")
+
+    employee = None
+    if employee_id is not None:
+        if user.role not in ("hr", "admin"):
+            raise HTTPException(status_code=403, detail="Forbidden: insufficient role")
+        employee = await db.get(Employee, employee_id)
+        if employee is None:
+            raise HTTPException(status_code=404, detail="Employee not found")
+
+    # чтение, хэш, миниатюры и запись на диск — в пуле аватаров, не в event loop
+    stored = await save_avatar(file.file)
+
+    if employee is not None and employee.avatar_url != stored.url:
+        employee.avatar_url = stored.url
+        await db.commit()
+
+    return JSONResponse({
+        "url": stored.url,
+        "variants": {str(size): url for size, url in stored.variants.items()},
+        "hash": stored.digest,
+        "deduplicated": stored.deduplicated,
+        "filename": file.filename,
+        "content_type": file.content_type,
+        "size": stored.size,
+    }, status_code=201)
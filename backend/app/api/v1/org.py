@@ -1,22 +1,52 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from app.core.db import get_db
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import false, select, func
+from sqlalchemy.orm import aliased
+from app.db.session import get_session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import Keyset
+from app.core.querybudget import query_budget
+from app.core.response_cache import etag_matches
 from app.core.security import require_roles
+from app.core import search as search_index
 from app.models.employee import Employee
-from app.schemas.org import OrgTreeResponse, OrgNode
+from app.models.org_change import current_version_stmt, changes_since
+from app.models.hierarchy import (
+    EmployeeHierarchy, subtree_stmt, ancestors_stmt, headcounts_stmt, levels_stmt,
+)
+from app.schemas.org import (
+    OrgTreeResponse, OrgNode, OrgHierarchyNode, OrgSubtreeResponse, OrgAncestorsResponse,
+    OrgExpandResponse,
+)
 from collections import defaultdict
+from dataclasses import dataclass
+from uuid import UUID
+import hashlib
 
 router = APIRouter(prefix="/org", tags=["org"])
 
-@router.get("/tree", response_model=OrgTreeResponse, dependencies=[Depends(require_roles())])
-def org_tree(
-    db: Session = Depends(get_db),
-    dept: str | None = None,
-    unit: str | None = None,
-    manager: str | None = None,
-    search: str | None = None,
-):
+# порядок детей внутри одного родителя (и ключ курсора их пагинации)
+CHILDREN_ORDER = Keyset(Employee.name, Employee.id)
+
+@dataclass(frozen=True)
+class OrgSnapshot:
+    version: int
+    tree: OrgTreeResponse
+    body: bytes  # готовый JSON полного ответа
+
+
+# (dept, unit) -> OrgSnapshot последней собранной версии; деревья под manager/search
+# собираются на запрос и не хранятся — произвольные фильтры не вытесняют снимки подразделений
+_snapshots = TTLCache(maxsize=settings.ORG_SNAPSHOT_CACHE_SIZE, ttl=24 * 3600, name="org_snapshots")
+
+
+def _snapshot_etag(version: int, key: tuple) -> str:
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    return f'"org-{version}-{digest}"'
+
+
+async def _build_tree(db: AsyncSession, dept, unit, manager, search) -> OrgTreeResponse:
     # базовый выбор сотрудников под фильтры
     stmt = select(Employee)
     if dept:
@@ -24,16 +54,16 @@ def org_tree(
     if unit:
         stmt = stmt.where(Employee.unit == unit)
     if manager:
-        stmt = stmt.where(func.cast(Employee.manager_id, func.TEXT) == manager)
+        try:
+            stmt = stmt.where(Employee.manager_id == UUID(manager))
+        except ValueError:
+            stmt = stmt.where(false())  # не UUID — подчинённых нет
     if search:
-        like = f"%{search}%"
-        stmt = stmt.where(
-            func.lower(Employee.name).like(func.lower(like)) |
-            func.lower(Employee.email).like(func.lower(like)) |
-            func.lower(Employee.title).like(func.lower(like))
-        )
+        where, _ = search_index.match(Employee.search_text, search)
+        if where is not None:
+            stmt = stmt.where(where)
 
-    emps = db.scalars(stmt).all()
+    emps = (await db.scalars(stmt)).all()
     if not emps:
         return OrgTreeResponse(nodes={}, children={}, deptCounts={})
 
@@ -62,6 +92,13 @@ def org_tree(
         if mid in nodes:
             nodes[mid].span = cnt
 
+    # уровень и численность поддерева — из closure table, по всей оргструктуре
+    ids = stmt.with_only_columns(Employee.id).order_by(None)
+    for eid, level in (await db.execute(levels_stmt(ids))).all():
+        nodes[str(eid)].level = level
+    for eid, headcount in (await db.execute(headcounts_stmt(ids))).all():
+        nodes[str(eid)].headcount = headcount
+
     # посчитаем deptCounts по текущей выдаче
     dept_counts = defaultdict(int)
     for e in emps:
@@ -74,3 +111,289 @@ def org_tree(
     dept_out = dict(dept_counts)
 
     return OrgTreeResponse(nodes=nodes_out, children=children_out, deptCounts=dept_out)
+
+
+def _tree_delta(snap: OrgSnapshot, since: int, changes) -> OrgTreeResponse:
+    """
+    Только то, что поменялось после since: изменённые узлы, их старые и новые
+    руководители (span/children), все предки (headcount) и, при переносе, всё
+    поддерево узла (level) — по текущему снимку.
+    """
+    tree = snap.tree
+    changed, parents, moved = set(), set(), []
+    for _, employee_id, manager_id, prev_manager_id, _op in changes:
+        changed.add(str(employee_id))
+        parents.update(str(p) for p in (manager_id, prev_manager_id) if p)
+        if manager_id != prev_manager_id:
+            moved.append(str(employee_id))
+
+    affected = changed | parents
+    while moved:
+        for cid in tree.children.get(moved.pop(), []):
+            if cid not in affected:
+                affected.add(cid)
+                moved.append(cid)
+    for eid in list(affected):
+        node = tree.nodes.get(eid)
+        while node is not None and node.manager_id is not None:
+            mid = str(node.manager_id)
+            if mid in affected and mid != eid:
+                break
+            affected.add(mid)
+            node = tree.nodes.get(mid)
+
+    return OrgTreeResponse(
+        nodes={k: tree.nodes[k] for k in affected if k in tree.nodes},
+        children={p: tree.children.get(p, []) for p in parents},
+        deptCounts=tree.deptCounts,
+        version=snap.version,
+        since=since,
+        removed=sorted(k for k in changed if k not in tree.nodes),
+    )
+
+
+@router.get("/tree", response_model=OrgTreeResponse, dependencies=[Depends(require_roles())])
+@query_budget(5)
+async def org_tree(
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    dept: str | None = None,
+    unit: str | None = None,
+    manager: str | None = None,
+    search: str | None = None,
+    since: int | None = Query(None, ge=0),
+):
+    """
+    Полное дерево под фильтры; без manager/search — из снимка текущей версии по (dept, unit).
+
+    ETag = версия + набор фильтров: If-None-Match с ним отвечает 304 за один
+    запрос max(version). ?since=<version> — дельта (nodes/children/removed только
+    по изменившемуся); если дельту посчитать нельзя или она длиннее ORG_DELTA_MAX_CHANGES,
+    приходит полный снимок (since=null).
+    """
+    version = await db.scalar(current_version_stmt())
+    key = (dept, unit, manager, search)
+    etag = _snapshot_etag(version, key)
+
+    if since is None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cacheable = manager is None and search is None
+    snap = _snapshots.get((dept, unit)) if cacheable else None
+    if snap is None or snap.version != version:
+        tree = await _build_tree(db, dept, unit, manager, search)
+        tree.version = version
+        snap = OrgSnapshot(version=version, tree=tree, body=tree.model_dump_json().encode())
+        if cacheable:
+            _snapshots.set((dept, unit), snap)
+
+    if since is not None:
+        if since == version:
+            return OrgTreeResponse(nodes={}, children={}, deptCounts=snap.tree.deptCounts, version=version, since=since)
+        changes = await changes_since(db, since)
+        if changes:
+            return _tree_delta(snap, since, changes)
+        # since раньше массовой записи, обрезанного журнала, слишком далеко или новее текущей
+        # версии (клиент видел базу до восстановления) — полный снимок
+
+    return Response(content=snap.body, media_type="application/json", headers={"ETag": etag})
+
+
+async def _children_page(
+    db: AsyncSession, parent_ids: list, limit: int, cursor: str | None = None, max_rows: int | None = None,
+):
+    """
+    До limit + 1 детей каждого из parent_ids (None — корни) одним запросом через
+    row_number() по manager_id. Лишний (limit + 1)-й ребёнок — признак следующей страницы.
+    max_rows — сколько детей всего: родители после предела не попадают в ответ, а тот,
+    на котором он пришёлся, получает курсор на оставшихся.
+    """
+    order = CHILDREN_ORDER
+    rn = func.row_number().over(
+        partition_by=Employee.manager_id,
+        order_by=[Employee.name.asc(), Employee.id.asc()],
+    ).label("rn")
+    inner = select(Employee, rn)
+    if parent_ids == [None]:
+        inner = inner.where(Employee.manager_id.is_(None))
+    else:
+        inner = inner.where(Employee.manager_id.in_(parent_ids))
+    if cursor:
+        inner = order.after(inner, cursor)
+    sub = inner.subquery()
+    child = aliased(Employee, sub)
+    stmt = (
+        select(child)
+        .where(sub.c.rn <= limit + 1)
+        .order_by(sub.c.manager_id, sub.c.rn)
+    )
+    if max_rows is not None:
+        stmt = stmt.limit(max_rows + 1)
+    by_parent = defaultdict(list)
+    for e in (await db.scalars(stmt)).all():
+        by_parent[e.manager_id].append(e)
+
+    pages, left = {}, max_rows
+    for pid, rows in by_parent.items():
+        rows, more = order.page(rows, limit)
+        if left is not None:
+            if left <= 0:
+                break
+            if len(rows) > left:
+                rows = rows[:left]
+                more = order.encode(rows[-1])
+            left -= len(rows)
+        pages[pid] = (rows, more)
+    return pages
+
+
+@router.get("/expand", response_model=OrgExpandResponse, dependencies=[Depends(require_roles())])
+@query_budget(9)
+async def org_expand(
+    db: AsyncSession = Depends(get_session),
+    node: UUID | None = None,
+    depth: int = Query(1, ge=1, le=5),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+):
+    """
+    Ленивое дерево: узел (или корни, если node не задан) и depth уровней под ним,
+    не больше limit детей на родителя. У каждого узла есть span и headcount, так что
+    клиент рисует «+N» и раскрывает дальше сам: ?node=<id> для поддерева,
+    ?node=<родитель>&cursor=<next_cursor[родитель]> для следующих детей.
+    Один запрос на уровень плюс два агрегата, независимо от размера оргструктуры.
+    Всего узлов не больше ORG_EXPAND_MAX_NODES: на пределе обход останавливается, у
+    недогруженного родителя — next_cursor, у незатронутых нет children (раскрыть ?node=<id>).
+    """
+    max_nodes = settings.ORG_EXPAND_MAX_NODES
+    loaded: dict = {}
+    children: dict[str, list[str]] = {}
+    next_cursor: dict[str, str] = {}
+    roots_next_cursor = None
+
+    if node is not None:
+        root = await db.get(Employee, node)
+        if not root:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        loaded[root.id] = root
+        root_ids, frontier = [root.id], [root.id]
+        root_level = await db.scalar(levels_stmt([root.id]).with_only_columns(func.max(EmployeeHierarchy.depth))) or 0
+        levels = {root.id: root_level}
+        level_cursor = cursor
+    else:
+        # корни — это «дети» None; их страницу листает тот же cursor
+        roots, roots_next_cursor = (
+            await _children_page(db, [None], limit, cursor, max_rows=max_nodes)
+        ).get(None, ([], None))
+        for e in roots:
+            loaded[e.id] = e
+        root_ids, frontier = [e.id for e in roots], [e.id for e in roots]
+        levels = {e.id: 0 for e in roots}
+        level_cursor = None
+
+    for _ in range(depth):
+        if not frontier or len(loaded) >= max_nodes:
+            break
+        pages = await _children_page(db, frontier, limit, level_cursor, max_rows=max_nodes - len(loaded))
+        level_cursor = None  # курсор относится только к первому уровню под node
+        frontier = []
+        for pid, (rows, more) in pages.items():
+            children[str(pid)] = [str(e.id) for e in rows]
+            if more:
+                next_cursor[str(pid)] = more
+            for e in rows:
+                loaded[e.id] = e
+                levels[e.id] = levels[pid] + 1
+                frontier.append(e.id)
+
+    ids = list(loaded)
+    spans = await _direct_spans(db, ids)
+    headcounts = dict((await db.execute(headcounts_stmt(ids))).all()) if ids else {}
+    nodes = {
+        str(e.id): OrgNode(
+            id=e.id, name=e.name, title=e.title,
+            department=e.department, unit=e.unit, manager_id=e.manager_id,
+            span=spans.get(e.id, 0), level=levels.get(e.id), headcount=headcounts.get(e.id, 0),
+        )
+        for e in loaded.values()
+    }
+    return OrgExpandResponse(
+        root_ids=[str(i) for i in root_ids],
+        nodes=nodes,
+        children=children,
+        next_cursor=next_cursor,
+        roots_next_cursor=roots_next_cursor,
+    )
+
+
+async def _direct_spans(db: AsyncSession, ids: list) -> dict:
+    if not ids:
+        return {}
+    stmt = (
+        select(Employee.manager_id, func.count())
+        .where(Employee.manager_id.in_(ids))
+        .group_by(Employee.manager_id)
+    )
+    return dict((await db.execute(stmt)).all())
+
+
+def _hierarchy_node(e: Employee, depth: int, span: int, level: int | None, headcount: int | None):
+    return OrgHierarchyNode(
+        id=e.id, name=e.name, title=e.title,
+        department=e.department, unit=e.unit, manager_id=e.manager_id,
+        span=span, level=level, headcount=headcount, depth=depth,
+    )
+
+
+@router.get("/{employee_id}/subtree", response_model=OrgSubtreeResponse, dependencies=[Depends(require_roles())])
+@query_budget(5)
+async def org_subtree(
+    employee_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    max_depth: int | None = Query(None, ge=1),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(200, ge=1, le=1000),
+):
+    """Все подчинённые employee_id (на любой глубине или до max_depth), ближние уровни первыми."""
+    root_level = await db.scalar(levels_stmt([employee_id]).with_only_columns(func.max(EmployeeHierarchy.depth)))
+    if root_level is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    headcount = await db.scalar(headcounts_stmt([employee_id]).with_only_columns(func.count() - 1))
+    stmt = (
+        subtree_stmt(employee_id, max_depth=max_depth)
+        .order_by(EmployeeHierarchy.depth, Employee.name, Employee.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    rows = (await db.execute(stmt)).all()
+    ids = [e.id for e, _ in rows]
+    spans = await _direct_spans(db, ids)
+    headcounts = dict((await db.execute(headcounts_stmt(ids))).all()) if ids else {}
+
+    items = [
+        _hierarchy_node(e, depth, spans.get(e.id, 0), root_level + depth, headcounts.get(e.id, 0))
+        for e, depth in rows
+    ]
+    return OrgSubtreeResponse(
+        root_id=employee_id, headcount=headcount or 0, items=items, page=page, per_page=per_page,
+    )
+
+
+@router.get("/{employee_id}/ancestors", response_model=OrgAncestorsResponse, dependencies=[Depends(require_roles())])
+@query_budget(3)
+async def org_ancestors(employee_id: UUID, db: AsyncSession = Depends(get_session)):
+    """Цепочка руководителей employee_id до корня (CEO)."""
+    rows = (await db.execute(ancestors_stmt(employee_id))).all()
+    if not rows and not await db.get(Employee, employee_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    level = len(rows)
+    ids = [e.id for e, _ in rows]
+    spans = await _direct_spans(db, ids)
+    headcounts = dict((await db.execute(headcounts_stmt(ids))).all()) if ids else {}
+    items = [
+        _hierarchy_node(e, depth, spans.get(e.id, 0), level - depth, headcounts.get(e.id, 0))
+        for e, depth in rows
+    ]
+    return OrgAncestorsResponse(employee_id=employee_id, level=level, items=items)
@@ -1,42 +1,126 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, Query, HTTPException, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from uuid import UUID
-from app.core.security import require_roles
-from app.core.db import get_db
+from app.core.matching import competency_index
+from app.core.pagination import Keyset, fetch_page
+from app.core.serialization import FastJSONResponse, Projection, page_response
+from app.core import search as search_index
+from app.core.querybudget import query_budget
+from app.core import response_cache
+from app.core.security import Principal, require_roles
+from app.db.session import get_session
+from app.models.employee import Employee
 from app.models.role import Role
-from app.schemas.role import RoleList, RoleOut
+from app.reports import service as reports
+from app.reports.context import ROLE_FIELDS, role_context
+from app.schemas.role import RoleCandidates, RoleList, RoleOut
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
-@router.get("", response_model=RoleList, dependencies=[Depends(require_roles())])
-def list_roles(
-    db: Session = Depends(get_db),
+ROLES_ORDER = Keyset(Role.name, Role.version.desc(), Role.id)
+ROLE_OUT = Projection(Role, RoleOut)
+CACHED_FROM = ("roles",)  # таблицы кэшируемых ответов: запись в них сбрасывает кэш
+
+@router.get("", response_model=RoleList)
+@query_budget(2)
+async def list_roles(
+    request: Request,
+    user: Principal = Depends(require_roles()),
+    db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=200),
+    cursor: str | None = None,
+    with_total: bool | None = None,
     search: str | None = None,
     division: str | None = None,
-    status: str | None = None
+    status: str | None = None,
+    fields: str | None = Query(None, description="Поля через запятую (id и ключи сортировки — всегда)"),
+):
+    projection = ROLE_OUT.only(fields, keep=ROLES_ORDER.columns)
+
+    async def build():
+        stmt = projection.select()
+        rank = None
+        if search:
+            # по name и goal (search_text, trigram-индекс в Postgres)
+            where, rank = search_index.match(Role.search_text, search)
+            if where is not None:
+                stmt = stmt.where(where)
+        if division:
+            stmt = stmt.where(Role.division == division)
+        if status:
+            stmt = stmt.where(Role.status == status)
+
+        items, total, next_cursor = await fetch_page(
+            db, stmt, ROLES_ORDER,
+            page=page, per_page=per_page, cursor=cursor, with_total=with_total, rank=rank,
+        )
+        return page_response(
+            projection, items,
+            page=page, per_page=per_page, total=total, next_cursor=next_cursor,
+        )
+
+    return await response_cache.serve(request, user.role, CACHED_FROM, build)
+
+@router.get("/{role_id}", response_model=RoleOut)
+@query_budget(1)
+async def get_role(
+    request: Request,
+    role_id: UUID,
+    user: Principal = Depends(require_roles()),
+    db: AsyncSession = Depends(get_session),
+    fields: str | None = Query(None, description="Поля через запятую (id — всегда)"),
+):
+    projection = ROLE_OUT.only(fields)
+
+    async def build():
+        row = (await db.execute(projection.select().where(Role.id == role_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Role not found")
+        return FastJSONResponse(projection.dump([row])[0])
+
+    return await response_cache.serve(request, user.role, CACHED_FROM, build)
+
+
+@router.get("/{role_id}/candidates", response_model=RoleCandidates, dependencies=[Depends(require_roles())])
+@query_budget(4)
+async def role_candidates(
+    role_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Лучшие сотрудники под competency_map роли (формула matchPercent, по всем сотрудникам)."""
+    competency_map = (await db.execute(select(Role.competency_map).where(Role.id == role_id))).first()
+    if not competency_map:
+        raise HTTPException(status_code=404, detail="Role not found")
+
+    await competency_index.refresh(db)
+    top = competency_index.top(competency_map[0] or {}, limit)
+
+    cards = {}
+    if top:
+        stmt = select(
+            Employee.id, Employee.name, Employee.title, Employee.department, Employee.unit, Employee.avatar_url,
+        ).where(Employee.id.in_([employee_id for employee_id, _ in top]))
+        cards = {row.id: row._asdict() for row in (await db.execute(stmt)).all()}
+
+    items = [{**cards[i], "percent": p} for i, p in top if i in cards]
+    return FastJSONResponse({"role_id": role_id, "items": items, "scored": len(competency_index)})
+
+
+@router.get("/{role_id}/export.pdf", dependencies=[Depends(require_roles())])
+async def role_export_pdf(
+    role_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    if_none_match: str | None = Header(None),
 ):
-    stmt = select(Role)
-    if search:
-        like = f"%{search}%"
-        # по name и goal
-        stmt = stmt.where(func.lower(Role.name).like(func.lower(like)) | func.lower(Role.goal).like(func.lower(like)))
-    if division:
-        stmt = stmt.where(Role.division == division)
-    if status:
-        stmt = stmt.where(Role.status == status)
-
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
-    stmt = stmt.order_by(Role.name.asc(), Role.version.desc()).offset((page - 1) * per_page).limit(per_page)
-    items = db.scalars(stmt).all()
-    out = [RoleOut.model_validate(i.__dict__) for i in items]
-    return RoleList(items=out, page=page, per_page=per_page, total=total or 0)
-
-@router.get("/{role_id}", response_model=RoleOut, dependencies=[Depends(require_roles())])
-def get_role(role_id: UUID, db: Session = Depends(get_db)):
-    obj = db.get(Role, role_id)
-    if not obj:
+    """Карточка роли в PDF — то же, что exportRoleAsPDF во фронте, но готовым файлом."""
+    row = (await db.execute(
+        select(*[getattr(Role, f) for f in ROLE_FIELDS]).where(Role.id == role_id)
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Role not found")
-    return RoleOut.model_validate(obj.__dict__)
+    context = role_context(row._asdict())
+    filename = reports.safe_filename(f"{row.name}_v{row.version}", ".pdf")
+    return await reports.pdf_response("role.html.j2", context, filename, if_none_match)
@@ -1,71 +1,127 @@
+import uuid
+from typing import Sequence
+
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from app.core.db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Boolean, Text, Uuid, literal, select, func, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.db.session import get_session
+from app.core.config import settings
+from app.core.pagination import Keyset, fetch_page
+from app.core.serialization import FastJSONResponse, Projection, page_response
+from app.core.search import is_postgres
+from app.core.querybudget import query_budget
 from app.core.security import require_roles
 from app.models.succession import Succession
 from app.models.employee import Employee
 from app.models.role import Role
-from app.schemas.succession import SuccessionList, SuccessionOut, SuccessionToggleIn
-from app.core.security import require_roles
+from app.schemas.succession import (
+    SuccessionBulkIn, SuccessionBulkResult, SuccessionList, SuccessionOut, SuccessionPair, SuccessionToggleIn,
+)
 
 router = APIRouter(prefix="/succession", tags=["succession"])
 
+SUCCESSION_ORDER = Keyset(Succession.created_at.desc(), Succession.id.desc())
+SUCCESSION_OUT = Projection(Succession, SuccessionOut)
+
 @router.get("", response_model=SuccessionList, dependencies=[Depends(require_roles())])
-def list_succession(
-    db: Session = Depends(get_db),
+@query_budget(2)
+async def list_succession(
+    db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=200),
+    cursor: str | None = None,
+    with_total: bool | None = None,
     target_role: str | None = None,
     division: str | None = None,
 ):
-    stmt = select(Succession)
+    stmt = SUCCESSION_OUT.select()
     if target_role:
         stmt = stmt.where(func.cast(Succession.target_role, func.TEXT) == target_role)
     if division:
         # через join по Role.division
         stmt = stmt.join(Role, Role.id == Succession.target_role).where(Role.division == division)
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
-    stmt = stmt.order_by(Succession.created_at.desc()).offset((page - 1) * per_page).limit(per_page)
-    items = db.scalars(stmt).all()
-    out = [SuccessionOut.model_validate(i.__dict__) for i in items]
-    return SuccessionList(items=out, page=page, per_page=per_page, total=total or 0)
+    items, total, next_cursor = await fetch_page(
+        db, stmt, SUCCESSION_ORDER,
+        page=page, per_page=per_page, cursor=cursor, with_total=with_total,
+    )
+    return page_response(
+        SUCCESSION_OUT, items,
+        page=page, per_page=per_page, total=total, next_cursor=next_cursor,
+    )
+
+def _upsert_stmt(items: Sequence[SuccessionToggleIn], *, set_notes: bool):
+    """
+    Один INSERT ... SELECT ... ON CONFLICT (employee_id, target_role) DO UPDATE ... RETURNING
+    на все items. Строки подаются как UNION ALL литералов (SQLite не умеет VALUES с
+    именами колонок); пары без сотрудника или роли отсекает WHERE EXISTS — их нет в RETURNING.
+    set_notes=False — notes существующих записей не трогаем (notes=None во входе).
+    """
+    rows = [
+        select(
+            literal(uuid.uuid4(), Uuid).label("id"),
+            literal(item.employee_id, Uuid).label("employee_id"),
+            literal(item.target_role, Uuid).label("target_role"),
+            literal(item.is_starred, Boolean).label("is_starred"),
+            literal(item.notes or "", Text).label("notes"),
+        )
+        for item in items
+    ]
+    v = (rows[0] if len(rows) == 1 else union_all(*rows)).subquery("v")
+    source = select(*v.c).where(
+        select(Employee.id).where(Employee.id == v.c.employee_id).exists(),
+        select(Role.id).where(Role.id == v.c.target_role).exists(),
+    )
+
+    ins = (pg_insert if is_postgres() else sqlite_insert)(Succession).from_select(list(v.c.keys()), source)
+    set_ = {"is_starred": ins.excluded.is_starred}
+    if set_notes:
+        set_["notes"] = ins.excluded.notes
+    return ins.on_conflict_do_update(
+        index_elements=[Succession.employee_id, Succession.target_role],
+        set_=set_,
+    ).returning(*SUCCESSION_OUT.columns)
+
 
 @router.post("/toggle", response_model=SuccessionOut, dependencies=[Depends(require_roles("hr","admin","supervisor"))])
-def toggle_star(payload: SuccessionToggleIn, db: Session = Depends(get_db)):
-    # валидация FK: существующий сотрудник и роль
-    if not db.get(Employee, payload.employee_id):
-        raise HTTPException(status_code=404, detail="Employee not found")
-    if not db.get(Role, payload.target_role):
+@query_budget(1)
+async def toggle_star(payload: SuccessionToggleIn, db: AsyncSession = Depends(get_session)):
+    # один запрос: upsert пары, существование сотрудника и роли проверяется в нём же
+    row = (await db.execute(_upsert_stmt([payload], set_notes=payload.notes is not None))).first()
+    if row is None:
+        # медленный путь только для ошибки — уточнить, чего нет
+        if not await db.get(Employee, payload.employee_id):
+            raise HTTPException(status_code=404, detail="Employee not found")
         raise HTTPException(status_code=404, detail="Role not found")
+    await db.commit()
+    return FastJSONResponse(SUCCESSION_OUT.dump([row])[0])
 
-    # найдём существующую запись пары (employee_id, target_role)
-    stmt = select(Succession).where(
-        Succession.employee_id == payload.employee_id,
-        Succession.target_role == payload.target_role,
-    )
-    obj = db.scalars(stmt).first()
 
-    if obj:
-        obj.is_starred = payload.is_starred
-        if payload.notes is not None:
-            obj.notes = payload.notes
-        db.add(obj)
-        db.commit()
-        db.refresh(obj)
-        return SuccessionOut.model_validate(obj.__dict__)
-    else:
-        # создаём новую запись (если is_starred=false, особого смысла нет, но поддержим)
-        from uuid import uuid4
-        new_obj = Succession(
-            id=uuid4(),
-            employee_id=payload.employee_id,
-            target_role=payload.target_role,
-            is_starred=payload.is_starred,
-            notes=payload.notes or "",
-        )
-        db.add(new_obj)
-        db.commit()
-        db.refresh(new_obj)
-        return SuccessionOut.model_validate(new_obj.__dict__)
+@router.post("/bulk", response_model=SuccessionBulkResult, dependencies=[Depends(require_roles("hr","admin","supervisor"))])
+@query_budget(2)
+async def bulk_toggle(payload: SuccessionBulkIn, db: AsyncSession = Depends(get_session)):
+    """Пачка отметок: по одному upsert на группу (с notes / без), одна транзакция."""
+    if len(payload.items) > settings.SUCCESSION_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"More than {settings.SUCCESSION_BULK_MAX_ITEMS} items")
+
+    # повтор пары в одном запросе: побеждает последний (ON CONFLICT не обновляет строку дважды)
+    latest = {(item.employee_id, item.target_role): item for item in payload.items}
+    groups = {True: [], False: []}
+    for item in latest.values():
+        groups[item.notes is not None].append(item)
+
+    rows = []
+    for set_notes, items in groups.items():
+        if items:
+            rows.extend((await db.execute(_upsert_stmt(items, set_notes=set_notes))).all())
+    await db.commit()
+
+    items = SUCCESSION_OUT.dump(rows)
+    done = {(r["employee_id"], r["target_role"]) for r in items}
+    not_found = [
+        SuccessionPair(employee_id=e, target_role=r).model_dump()
+        for e, r in latest if (e, r) not in done
+    ]
+    return FastJSONResponse({"items": items, "not_found": not_found})
@@ -1,35 +1,54 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from app.core.db import get_db
-from app.core.security import require_roles
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
+from app.db.session import get_session
+from app.core.pagination import Keyset, fetch_page
+from app.core.serialization import Projection, page_response
+from app.core.querybudget import query_budget
+from app.core import response_cache
+from app.core.security import Principal, require_roles
 from app.models.vacancy import Vacancy
 from app.schemas.vacancy import VacancyList, VacancyOut
 
 router = APIRouter(prefix="/vacancies", tags=["vacancies"])
 
-@router.get("", response_model=VacancyList, dependencies=[Depends(require_roles())])
-def list_vacancies(
-    db: Session = Depends(get_db),
+VACANCIES_ORDER = Keyset(Vacancy.created_at.desc(), Vacancy.id.desc())
+VACANCY_OUT = Projection(Vacancy, VacancyOut)
+CACHED_FROM = ("vacancies",)  # таблицы кэшируемых ответов: запись в них сбрасывает кэш
+
+@router.get("", response_model=VacancyList)
+@query_budget(2)
+async def list_vacancies(
+    request: Request,
+    user: Principal = Depends(require_roles()),
+    db: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=200),
+    cursor: str | None = None,
+    with_total: bool | None = None,
     status: str | None = None,
     dept: str | None = None,
     unit: str | None = None,
     manager: str | None = None,
 ):
-    stmt = select(Vacancy)
-    if status:
-        stmt = stmt.where(Vacancy.status == status)
-    if dept:
-        stmt = stmt.where(Vacancy.department == dept)
-    if unit:
-        stmt = stmt.where(Vacancy.unit == unit)
-    if manager:
-        stmt = stmt.where(func.cast(Vacancy.manager_id, func.TEXT) == manager)
+    async def build():
+        stmt = VACANCY_OUT.select()
+        if status:
+            stmt = stmt.where(Vacancy.status == status)
+        if dept:
+            stmt = stmt.where(Vacancy.department == dept)
+        if unit:
+            stmt = stmt.where(Vacancy.unit == unit)
+        if manager:
+            stmt = stmt.where(func.cast(Vacancy.manager_id, func.TEXT) == manager)
+
+        items, total, next_cursor = await fetch_page(
+            db, stmt, VACANCIES_ORDER,
+            page=page, per_page=per_page, cursor=cursor, with_total=with_total,
+        )
+        return page_response(
+            VACANCY_OUT, items,
+            page=page, per_page=per_page, total=total, next_cursor=next_cursor,
+        )
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
-    stmt = stmt.order_by(Vacancy.created_at.desc()).offset((page - 1) * per_page).limit(per_page)
-    items = db.scalars(stmt).all()
-    out = [VacancyOut.model_validate(i.__dict__) for i in items]
-    return VacancyList(items=out, page=page, per_page=per_page, total=total or 0)
+    return await response_cache.serve(request, user.role, CACHED_FROM, build)
@@ -0,0 +1,156 @@
+# app/core/avatars.py
+"""
+Аватары: загрузка -> квадратные WebP-миниатюры фиксированных размеров.
+
+    media/avatars/<h[:2]>/<h>/48.webp, 128.webp, 512.webp     h — sha256 исходного файла (32 hex)
+
+Рядом с каждым WebP лежат .jpg (для клиентов без WebP) и .avif (если Pillow собран
+с libavif и он вышел меньше WebP) — их по Accept отдаёт /media (app/core/media.py);
+в URL всегда .webp.
+
+Имя зависит только от содержимого, поэтому одинаковые загрузки хранятся один раз
+(повторную даже не декодируем), а файлы по URL никогда не меняются.
+
+Декодирование/ресайз/запись — в отдельном ограниченном пуле AVATAR_WORKERS потоков
+(Pillow отпускает GIL на декодировании и ресайзе), чтобы пачка загрузок не забирала
+весь общий threadpool у запросов к БД.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from app.core.config import settings
+
+AVATAR_SIZES = (48, 128, 512)
+AVATAR_DEFAULT_SIZE = 128  # то, что пишется в Employee.avatar_url
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+# расширение файла -> (формат Pillow, параметры save); webp — основной, на него указывают URL
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 82, "method": 4}),
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+if features.check("avif"):
+    VARIANT_FORMATS["avif"] = ("AVIF", {"quality": 60, "speed": 8})
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatar")
+    return _executor
+
+
+@dataclass(frozen=True)
+class StoredAvatar:
+    digest: str
+    size: int            # байт в исходном файле
+    deduplicated: bool   # такие варианты уже были на диске
+
+    @property
+    def variants(self) -> dict[int, str]:
+        return {s: avatar_url(self.digest, s) for s in AVATAR_SIZES}
+
+    @property
+    def url(self) -> str:
+        return avatar_url(self.digest, AVATAR_DEFAULT_SIZE)
+
+
+def avatar_url(digest: str, size: int) -> str:
+    return f"/media/avatars/{digest[:2]}/{digest}/{size}.webp"
+
+
+def _avatar_dir(digest: str) -> Path:
+    return Path(settings.MEDIA_DIR) / "avatars" / digest[:2] / digest
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # пишем рядом и переименовываем: параллельная загрузка того же файла не увидит половину
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def _encode(img: Image.Image, ext: str) -> bytes:
+    fmt, params = VARIANT_FORMATS[ext]
+    if fmt == "JPEG" and img.mode == "RGBA":  # у JPEG нет альфы — на белый фон
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    buf = io.BytesIO()
+    img.save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+def render_variants(data: bytes) -> dict[tuple[int, str], bytes]:
+    """Исходные байты -> {(размер, расширение): файл}; центр-кроп в квадрат, EXIF-поворот учитывается."""
+    try:
+        img = Image.open(io.BytesIO(data))
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+    with img:
+        if img.format not in ALLOWED_FORMATS:
+            raise HTTPException(status_code=415, detail="Unsupported image type")
+        if img.width * img.height > settings.AVATAR_MAX_PIXELS:  # до декодирования: размер из заголовка
+            raise HTTPException(status_code=413, detail="Image dimensions too large")
+        # JPEG умеет декодировать сразу с уменьшением в 2/4/8 раз — большие фото не разворачиваем целиком
+        img.draft("RGB", (max(AVATAR_SIZES) * 2,) * 2)
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+        side = min(img.size)
+        square = ImageOps.fit(img, (side, side), Image.Resampling.LANCZOS)
+        out = {}
+        for size in sorted(AVATAR_SIZES, reverse=True):
+            # каждый следующий — из предыдущего (уже маленького), а не из исходника
+            square = square.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            for ext in VARIANT_FORMATS:
+                out[size, ext] = _encode(square, ext)
+            # на мелких размерах контейнер AVIF бывает тяжелее WebP — тогда не храним
+            if "avif" in VARIANT_FORMATS and len(out[size, "avif"]) >= len(out[size, "webp"]):
+                del out[size, "avif"]
+        return out
+
+
+def store_avatar(fileobj: BinaryIO) -> StoredAvatar:
+    """Блокирующая часть загрузки: чтение, хэш, (если нужно) ресайз и запись вариантов."""
+    data = fileobj.read(settings.AVATAR_MAX_BYTES + 1)
+    if len(data) > settings.AVATAR_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Avatar larger than {settings.AVATAR_MAX_BYTES} bytes")
+    digest = hashlib.sha256(data).hexdigest()[:32]
+
+    dest = _avatar_dir(digest)
+    paths = {(s, ext): dest / f"{s}.{ext}" for s in AVATAR_SIZES for ext in VARIANT_FORMATS}
+    if all(p.exists() for (_, ext), p in paths.items() if ext != "avif"):  # avif — не всегда
+        return StoredAvatar(digest=digest, size=len(data), deduplicated=True)
+
+    variants = render_variants(data)
+    dest.mkdir(parents=True, exist_ok=True)
+    for key, body in variants.items():
+        _write_atomic(paths[key], body)
+    return StoredAvatar(digest=digest, size=len(data), deduplicated=False)
+
+
+async def save_avatar(fileobj: BinaryIO) -> StoredAvatar:
+    return await asyncio.get_running_loop().run_in_executor(_pool(), store_avatar, fileobj)
@@ -18,11 +18,86 @@ class Settings(BaseSettings):
         validation_alias="DATABASE_URL",
     )
 
+    # Режим доступа к БД для роутеров: True — async-движок (app/db/session.py),
+    # False — sync-движок из app/core/db.py, вызовы уходят в threadpool
+    DB_ASYNC: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10
+
     JWT_SECRET: str = "change-me-dev-secret-please"
     ACCESS_TTL_MIN: int = 15
     REFRESH_TTL_DAYS: int = 7
     ALGO: str = "HS256"
 
+    # кэш пользователей для get_current_user (per-process)
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SEC: int = 60
+    # кэш проверенных JWT: токен -> sub, живёт до exp токена (per-process; 0 — выключен)
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # снимки /org/tree по наборам фильтров (per-process, инвалидация по версии оргструктуры)
+    ORG_SNAPSHOT_CACHE_SIZE: int = 256
+    # журнал org_changes: больше изменений после since — полный снимок вместо дельты;
+    # сколько последних версий хранить (0 — не обрезать, только на reset)
+    ORG_DELTA_MAX_CHANGES: int = 500
+    ORG_CHANGES_KEEP: int = 10_000
+    # GET /org/expand: узлов в одном ответе при любых depth × limit
+    ORG_EXPAND_MAX_NODES: int = 500
+
+    # готовые ответы GET /roles, /roles/{id}, /vacancies (app/core/response_cache.py, per-process;
+    # запись в roles/vacancies сбрасывает сразу, TTL — предел устаревания в других воркерах; 0 — выключен)
+    RESPONSE_CACHE_SIZE: int = 2000
+    RESPONSE_CACHE_TTL_SEC: int = 60
+
+    # POST /employees/import: строк на один INSERT ... ON CONFLICT и предел файла
+    IMPORT_BATCH_SIZE: int = 2000
+    IMPORT_MAX_ROWS: int = 200_000
+    # смен руководителя в импорте, после которых closure table пересобирается целиком
+    IMPORT_HIERARCHY_REBUILD_AT: int = 500
+
+    # агрегаты 360° по (сотрудник, цикл), per-process; загрузка анкеты сбрасывает свою запись
+    FEEDBACK360_CACHE_SIZE: int = 20_000
+    FEEDBACK360_CACHE_TTL_SEC: int = 300
+
+    # POST /succession/bulk: отметок в одном запросе (один INSERT ... ON CONFLICT)
+    SUCCESSION_BULK_MAX_ITEMS: int = 1000
+
+    # /media на диске; аватары: предел файла, пикселей (до декодирования) и пул обработки
+    MEDIA_DIR: str = "/app/media"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    AVATAR_MAX_PIXELS: int = 40_000_000
+    AVATAR_WORKERS: int = 2
+
+    # PDF (app/reports): процессов рендера, кэш готовых файлов, предел сотрудников в ZIP подразделения
+    PDF_WORKERS: int = 2
+    PDF_CACHE_SIZE: int = 256
+    PDF_CACHE_TTL_SEC: int = 3600
+    PDF_BATCH_MAX: int = 500
+
+    # проверка/хеширование паролей: свой пул потоков и сколько ждать свободного слота до 503
+    PASSWORD_WORKERS: int = 4
+    PASSWORD_QUEUE_TIMEOUT_SEC: float = 5.0
+
+    # GET /metrics (Prometheus) и /cachez: Authorization: Bearer METRICS_TOKEN или адрес клиента из
+    # METRICS_ALLOW_IPS (IP/CIDR через запятую, без пробелов); оба пустые — 404 всем.
+    # За прокси адрес клиента — адрес прокси, так что allowlist только для прямого scrape.
+    METRICS_TOKEN: str = ""
+    METRICS_ALLOW_IPS: str = ""
+
+    # диагностика (app/core/profiling.py): профили запросов и лог медленного SQL с планами
+    PROFILE_DIR: str = "/tmp/novaprofile-profiles"
+    PROFILE_SAMPLE_RATE: float = 0.0  # доля запросов под cProfile; X-Profile: 1 от админа — всегда
+    PROFILE_MAX_FILES: int = 200
+    SLOW_QUERY_MS: float = 0.0  # порог лога медленного SQL, 0 — выкл (включать на время разбора)
+    SLOW_QUERY_EXPLAIN: bool = False  # + план медленного SELECT (в фоне, отдельным соединением)
+    SLOW_QUERY_EXPLAIN_INTERVAL_SEC: int = 600  # EXPLAIN ANALYZE одного текста запроса не чаще
+
+    # @query_budget у хэндлеров: True — превышение = 500 (dev, tests/), False — лог и метрика
+    QUERY_BUDGET_STRICT: bool = False
+    # заголовок X-Query-Count у каждого ответа — только для dev/бенча, в проде не светим
+    QUERY_COUNT_HEADER: bool = False
+
     STORAGE_URL_BASE: str = "https://YOUR_REF.supabase.co/storage/v1"
     STORAGE_PUBLIC_URL: str = "https://YOUR_REF.supabase.co/storage/v1/object/public"
     STORAGE_BUCKET: str = "avatars"
@@ -4,6 +4,10 @@ from __future__ import annotations
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
+from app.core.profiling import instrument_slow_queries
+from app.core.querybudget import count_queries
+from app.core.response_cache import invalidate_on_writes
+from app.core.metrics import TimedQueuePool, instrument_engine
 
 class Base(DeclarativeBase):
     pass
@@ -18,12 +22,19 @@ CONNECT_ARGS = {
 engine = create_engine(
     settings.DB_URL,        # ожидается postgresql+psycopg://...&sslmode=require
     pool_pre_ping=True,     # проверяем соединение из пула перед использованием
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=10,        # макс. ожидание свободного коннекта из пула (сек)
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,  # макс. ожидание свободного коннекта из пула (сек)
+    poolclass=TimedQueuePool,  # QueuePool + время checkout и таймауты в /metrics
+    pool_logging_name="sync",
     future=True,
-    connect_args=CONNECT_ARGS,
+    # libpq-аргументы только для Postgres (локальные SQLite-прогоны их не понимают)
+    connect_args=CONNECT_ARGS if settings.DB_URL.startswith("postgresql") else {},
 )
+instrument_engine(engine, "sync")
+instrument_slow_queries(engine, "sync")
+count_queries(engine)
+invalidate_on_writes(engine)
 
 SessionLocal = sessionmaker(
     bind=engine,
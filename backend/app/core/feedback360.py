@@ -0,0 +1,152 @@
+# app/core/feedback360.py
+"""
+Агрегаты 360° — те же формулы, что в src/lib/analytics.js, но пачкой:
+
+    means       meanByGroup       — среднее по вопросам для каждой группы оценщиков
+    weighted    weightedOverall   — Σ mean·w / Σ w по группам, у которых есть баллы
+    spread      stdBetweenGroups  — стандартное отклонение средних групп (n-1)
+    self_delta  calcSelfDelta     — self минус среднее внешних групп
+
+Из БД берутся только суммы и количества баллов по (сотрудник, компетенция) — один
+GROUP BY на всё подразделение; они же кэшируются по (сотрудник, цикл). Метрики
+считаются NumPy сразу для всех строк (компетенции всех сотрудников + их итоги).
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.feedback360 import GROUPS, Feedback360Score
+
+# пресеты весов — как WEIGHT_PRESETS во фронте (src/lib/constants.js)
+WEIGHT_PRESETS = {
+    "equal": {"peers": 1, "reports": 1, "manager": 1, "self": 1},
+    "manager40": {"peers": 0.3, "reports": 0.3, "manager": 0.8, "self": 0.2},
+    "peers40": {"peers": 0.8, "reports": 0.4, "manager": 0.4, "self": 0.2},
+    "custom": {"peers": 1, "reports": 1, "manager": 1, "self": 0.5},
+}
+
+S = Feedback360Score
+_SCORE_COLUMNS = (S.peers, S.reports, S.manager, S.self_)
+
+# (employee_id, cycle) -> EmployeeSums
+sums_cache = TTLCache(maxsize=settings.FEEDBACK360_CACHE_SIZE, ttl=settings.FEEDBACK360_CACHE_TTL_SEC, name="feedback360")
+
+
+@dataclass(frozen=True)
+class EmployeeSums:
+    competencies: list[str]  # в порядке анкеты
+    sums: np.ndarray         # компетенции × группы
+    counts: np.ndarray       # компетенции × группы (сколько вопросов с баллом)
+
+
+def invalidate(employee_id: uuid.UUID, cycle: str) -> None:
+    sums_cache.pop((employee_id, cycle))
+
+
+def sums_stmt(employee_ids: Sequence[uuid.UUID], cycle: str):
+    """Σ и count баллов каждой группы по (сотрудник, компетенция); count(col) не считает NULL."""
+    return (
+        select(
+            S.employee_id,
+            S.competency,
+            func.min(S.position).label("position"),
+            *[func.sum(c) for c in _SCORE_COLUMNS],
+            *[func.count(c) for c in _SCORE_COLUMNS],
+        )
+        .where(S.employee_id.in_(employee_ids), S.cycle == cycle)
+        .group_by(S.employee_id, S.competency)
+        .order_by(S.employee_id, "position")
+    )
+
+
+async def load_sums(db, employee_ids: Sequence[uuid.UUID], cycle: str) -> dict[uuid.UUID, EmployeeSums]:
+    """Суммы по сотрудникам: из кэша, недостающие — одним запросом."""
+    out, missing = {}, []
+    for employee_id in employee_ids:
+        cached = sums_cache.get((employee_id, cycle))
+        if cached is None:
+            missing.append(employee_id)
+        else:
+            out[employee_id] = cached
+
+    if missing:
+        groups = len(GROUPS)
+        rows_by_employee: dict[uuid.UUID, list] = {employee_id: [] for employee_id in missing}
+        for row in (await db.execute(sums_stmt(missing, cycle))).all():
+            rows_by_employee[row[0]].append(row)
+        for employee_id, rows in rows_by_employee.items():
+            values = np.array([[v or 0 for v in r[3:]] for r in rows], dtype=np.float64).reshape(-1, 2 * groups)
+            entry = EmployeeSums(
+                competencies=[r[1] for r in rows],
+                sums=values[:, :groups],
+                counts=values[:, groups:],
+            )
+            sums_cache.set((employee_id, cycle), entry)
+            out[employee_id] = entry
+    return out
+
+
+def metrics(sums: np.ndarray, counts: np.ndarray, weights: dict) -> dict[str, np.ndarray]:
+    """Метрики для каждой строки (строки × группы сумм/количеств), NaN — «нет данных»."""
+    present = counts > 0
+    means = np.divide(sums, counts, out=np.full_like(sums, np.nan), where=present)
+    filled = np.where(present, means, 0.0)
+    k = present.sum(axis=1)
+
+    w = np.array([float(weights.get(g, 0) or 0) for g in GROUPS])
+    w_sum = (present * w).sum(axis=1)
+    weighted = np.divide((filled * w).sum(axis=1), w_sum, out=np.full(len(k), np.nan), where=w_sum != 0)
+
+    group_mean = np.divide(filled.sum(axis=1), k, out=np.zeros(len(k)), where=k > 0)
+    sq = np.where(present, (means - group_mean[:, None]) ** 2, 0.0).sum(axis=1)
+    spread = np.sqrt(np.divide(sq, k - 1, out=np.zeros(len(k)), where=k > 1))
+
+    ext_k = present[:, :3].sum(axis=1)
+    ext_mean = np.divide(filled[:, :3].sum(axis=1), ext_k, out=np.full(len(k), np.nan), where=ext_k > 0)
+    self_delta = means[:, 3] - ext_mean  # NaN, если нет self или внешних групп
+
+    return {"means": means, "weighted": weighted, "spread": spread, "self_delta": self_delta}
+
+
+def _num(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def summarize(per_employee: dict[uuid.UUID, EmployeeSums], weights: dict) -> dict[uuid.UUID, dict]:
+    """
+    {employee_id: {"overall": {...}, "competencies": [{"name", ...}]}} — одним проходом
+    NumPy по всем компетенциям всех сотрудников и их итогам (все вопросы сотрудника).
+    """
+    order = [e for e in per_employee if per_employee[e].competencies]
+    if not order:
+        return {e: {"overall": None, "competencies": []} for e in per_employee}
+
+    blocks = [per_employee[e] for e in order]
+    sums = np.vstack([b.sums for b in blocks] + [np.array([b.sums.sum(axis=0) for b in blocks])])
+    counts = np.vstack([b.counts for b in blocks] + [np.array([b.counts.sum(axis=0) for b in blocks])])
+    m = metrics(sums, counts, weights)
+
+    def row(i: int) -> dict:
+        return {
+            "means": {g: _num(m["means"][i, j]) for j, g in enumerate(GROUPS)},
+            "weighted": _num(m["weighted"][i]),
+            "spread": _num(m["spread"][i]),
+            "self_delta": _num(m["self_delta"][i]),
+        }
+
+    out = {e: {"overall": None, "competencies": []} for e in per_employee}
+    i, totals_at = 0, sum(len(b.competencies) for b in blocks)
+    for n, (employee_id, block) in enumerate(zip(order, blocks)):
+        out[employee_id] = {
+            "overall": row(totals_at + n),
+            "competencies": [{"name": name, **row(i + c)} for c, name in enumerate(block.competencies)],
+        }
+        i += len(block.competencies)
+    return out
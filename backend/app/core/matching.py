@@ -0,0 +1,168 @@
+# app/core/matching.py
+"""
+Соответствие сотрудников ролям по компетенциям (как matchPercent во фронте):
+
+    percent = round(100 * Σ min(have[k], need[k]) / Σ need[k])  по k из competency_map роли
+
+Все Employee.competencies держим плотной матрицей float32 (сотрудники × компетенции)
+в памяти процесса; роль (или пачка ролей) считается одним векторным проходом по ней.
+
+Матрица обновляется инкрементально по журналу org_changes (туда пишет каждая
+ORM-запись Employee, см. app/models/org_change.py): перечитываются только строки
+изменившихся сотрудников. Через op="reset" (seed, импорт), обрезанный журнал или
+больше ORG_DELTA_MAX_CHANGES изменений — полная пересборка.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any, Sequence
+
+import numpy as np
+from sqlalchemy import select
+
+from app.models.employee import Employee
+from app.models.org_change import changes_since, current_version_stmt
+
+# сотрудников за один шаг батча: (chunk × ролей × компетенций роли) float32 в памяти
+SCORE_CHUNK = 8192
+
+
+def _level(value: Any) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+class CompetencyMatrix:
+    def __init__(self):
+        self.version: int | None = None
+        self.ids: list[uuid.UUID] = []
+        self.index: dict[uuid.UUID, int] = {}
+        self.vocab: dict[str, int] = {}
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # --- заполнение ---
+
+    def _column(self, key: str) -> int:
+        col = self.vocab.get(key)
+        if col is None:
+            col = self.vocab[key] = len(self.vocab)
+            if self.matrix.shape[1] <= col:
+                grow = max(8, self.matrix.shape[1])
+                self.matrix = np.pad(self.matrix, ((0, 0), (0, grow)))
+        return col
+
+    def _fill(self, row: int, competencies: dict | None) -> None:
+        self.matrix[row, :] = 0
+        for key, value in (competencies or {}).items():
+            level = _level(value)
+            if level is not None:
+                col = self._column(key)  # может пересоздать self.matrix — до индексации
+                self.matrix[row, col] = level
+
+    def _upsert(self, employee_id: uuid.UUID, competencies: dict | None) -> None:
+        row = self.index.get(employee_id)
+        if row is None:
+            row = self.index[employee_id] = len(self.ids)
+            self.ids.append(employee_id)
+            if self.matrix.shape[0] <= row:
+                grow = max(64, self.matrix.shape[0] // 2)
+                self.matrix = np.pad(self.matrix, ((0, grow), (0, 0)))
+        self._fill(row, competencies)
+
+    def _remove(self, employee_id: uuid.UUID) -> None:
+        row = self.index.pop(employee_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:  # на место удалённого — последнюю строку
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.index[moved] = row
+            self.matrix[row] = self.matrix[last]
+        self.ids.pop()
+        self.matrix[last] = 0
+
+    def load(self, rows: Sequence[tuple[uuid.UUID, dict | None]], version: int) -> None:
+        self.ids, self.index, self.vocab = [], {}, {}
+        self.matrix = np.zeros((len(rows), 8), dtype=np.float32)
+        for employee_id, competencies in rows:
+            self._upsert(employee_id, competencies)
+        self.version = version
+
+    async def refresh(self, db) -> None:
+        """Догнать журнал org_changes: полная сборка или перечитать изменившихся."""
+        version = await db.scalar(current_version_stmt())
+        if version == self.version:
+            return
+        async with self._lock:
+            if version == self.version:  # уже обновил соседний запрос
+                return
+            changes = None
+            if self.version is not None:
+                changes = await changes_since(db, self.version)
+            if changes is None:
+                rows = (await db.execute(select(Employee.id, Employee.competencies))).all()
+                self.load(rows, version)
+                return
+
+            changed = {row.employee_id for row in changes}
+            fresh = dict((await db.execute(
+                select(Employee.id, Employee.competencies).where(Employee.id.in_(changed))
+            )).all())
+            for employee_id in changed:
+                if employee_id in fresh:
+                    self._upsert(employee_id, fresh[employee_id])
+                else:
+                    self._remove(employee_id)
+            self.version = version
+
+    # --- расчёт ---
+
+    def score(self, competency_maps: Sequence[dict]) -> np.ndarray:
+        """Проценты соответствия (сотрудники × роли), без округления."""
+        n = len(self.ids)
+        needs = [
+            {k: lvl for k, v in (m or {}).items() if (lvl := _level(v)) is not None}
+            for m in competency_maps
+        ]
+        out = np.zeros((n, len(needs)), dtype=np.float64)
+        keys = sorted({k for need in needs for k in need if k in self.vocab})
+        if not n or not keys:
+            return out
+
+        cols = [self.vocab[k] for k in keys]
+        need = np.array([[m.get(k, 0.0) for k in keys] for m in needs], dtype=np.float32)  # роли × k
+        # Σ need по всей карте роли, включая компетенции, которых нет ни у кого (have = 0)
+        total = np.array([sum(m.values()) for m in needs], dtype=np.float64)
+        total[total == 0] = 1
+
+        have = self.matrix[:n, cols]  # сотрудники × k
+        for start in range(0, n, SCORE_CHUNK):
+            part = have[start:start + SCORE_CHUNK, None, :]  # chunk × 1 × k
+            out[start:start + SCORE_CHUNK] = np.minimum(part, need[None, :, :]).sum(axis=2)
+        out *= 100.0 / total
+        return out
+
+    def top(self, competency_map: dict, limit: int) -> list[tuple[uuid.UUID, int]]:
+        """Лучшие limit сотрудников для одной роли: [(id, percent)] по убыванию."""
+        scores = self.score([competency_map])[:, 0]
+        if not len(scores) or limit <= 0:
+            return []
+        limit = min(limit, len(scores))
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        # Math.round, как на фронте: половина — вверх
+        percents = np.floor(scores[best] + 0.5).astype(int)
+        return [(self.ids[i], int(p)) for i, p in zip(best, percents)]
+
+
+# один на процесс
+competency_index = CompetencyMatrix()
@@ -0,0 +1,155 @@
+# app/core/media.py
+"""
+Раздача /media: StaticFiles + кэширующие заголовки, выбор варианта по Accept и Range.
+
+    avatars/<h[:2]>/<h>/<size>.webp   адрес по содержимому (app/core/avatars.py):
+                                      Cache-Control immutable на год, ETag "<h>-<size>.<ext>";
+                                      по Accept отдаётся .avif / .webp / .jpg из той же папки
+                                      (Vary: Accept)
+    avatars/<uuid hex>.<ext>          старые загрузки — имя случайное и не переиспользуется,
+                                      тоже immutable
+    остальное                         no-cache: каждый раз ревалидация по ETag (304)
+
+Range: один диапазон bytes=a-b / a- / -n (206, If-Range по ETag); несколько диапазонов
+не поддерживаем — отдаём файл целиком, как разрешает RFC 9110.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Iterable
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+
+_VARIANT = re.compile(r"^avatars/([0-9a-f]{2})/(\1[0-9a-f]{30})/(\d+)\.(webp|avif|jpg)$")
+_LEGACY_AVATAR = re.compile(r"^avatars/[0-9a-f]{32}\.(jpe?g|png|webp)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# mimetypes в 3.11 не знает .avif
+_MEDIA_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpg": "image/jpeg"}
+
+
+def _accepted(accept: str | None) -> set[str]:
+    """Типы из Accept без q=0; нет заголовка — принимается всё."""
+    if not accept:
+        return {"*/*"}
+    out = set()
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        if any(p.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000") for p in params):
+            continue
+        out.add(media_type.lower())
+    return out
+
+
+def _variant_order(accept: str | None) -> Iterable[str]:
+    """Расширения в порядке предпочтения: avif (только если просят явно), webp, jpg."""
+    accepted = _accepted(accept)
+    if "image/avif" in accepted:
+        yield "avif"
+    if accepted & {"image/webp", "image/*", "*/*"}:
+        yield "webp"
+    yield "jpg"
+
+
+def _normalize(path: str) -> str:
+    return path.replace(os.sep, "/")
+
+
+class RangeFileResponse(FileResponse):
+    """206 Partial Content: байты [start, end] файла."""
+
+    def __init__(self, path, *, start: int, end: int, size: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.start, self.end = start, end
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:  # файл укоротили на ходу
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class MediaFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        match = _VARIANT.match(_normalize(path))
+        if match and scope["method"] in ("GET", "HEAD"):
+            accept = Headers(scope=scope).get("accept")
+            base = path[: -len(match.group(4))]
+            for ext in _variant_order(accept):
+                _, stat_result = await anyio.to_thread.run_sync(self.lookup_path, base + ext)
+                if stat_result is not None:
+                    path = base + ext
+                    break
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        # lookup_path отдаёт realpath — и каталог сравниваем так же
+        relative = _normalize(os.path.relpath(full_path, os.path.realpath(self.directory)))
+        variant = _VARIANT.match(relative)
+
+        headers = {"Accept-Ranges": "bytes"}
+        media_type = None
+        if variant:
+            digest, size, ext = variant.group(2, 3, 4)
+            media_type = _MEDIA_TYPES[ext]
+            headers["Cache-Control"] = IMMUTABLE
+            headers["Vary"] = "Accept"
+            # содержимое определяется путём — сильный валидатор без stat/хэширования файла
+            headers["ETag"] = f'"{digest}-{size}.{ext}"'
+        elif _LEGACY_AVATAR.match(relative):
+            headers["Cache-Control"] = IMMUTABLE
+        else:
+            headers["Cache-Control"] = REVALIDATE
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return self._range_response(full_path, stat_result, request_headers, response)
+
+    def _range_response(self, full_path, stat_result, request_headers: Headers, response: FileResponse) -> Response:
+        range_header = request_headers.get("range")
+        if not range_header or response.status_code != 200:
+            return response
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range != response.headers.get("etag"):
+            return response  # файл поменялся — целиком
+
+        match = _RANGE.match(range_header.replace(" ", ""))
+        if not match or match.groups() == ("", ""):
+            return response  # несколько диапазонов / не bytes — игнорируем Range
+        size = stat_result.st_size
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:  # bytes=-n — последние n байт
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+        headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+        return RangeFileResponse(full_path, start=start, end=end, size=size, stat_result=stat_result,
+                                 headers=headers, media_type=response.media_type)
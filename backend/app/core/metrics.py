@@ -0,0 +1,238 @@
+# app/core/metrics.py
+"""
+Метрики процесса в текстовом формате Prometheus (GET /metrics) — без prometheus_client:
+три типа (counter, gauge, histogram) с метками, этого хватает.
+
+    http_*        middleware в main.py: запросы, латентность и in-flight по шаблону маршрута
+                  (/api/v1/employees/{employee_id}, не по конкретному пути — кардинальность)
+    db_statement* события движков (before/after_cursor_execute): время SQL по маршруту и типу
+    db_pool_*     пул соединений: занято/overflow снимаются при scrape, ожидание и таймауты
+                  checkout — в TimedQueuePool / TimedAsyncQueuePool
+
+Per-process: с несколькими воркерами uvicorn каждый отдаёт свои числа.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+UNMATCHED = "<unmatched>"
+INF = 'le="+Inf"'
+
+# шаблон маршрута текущего запроса — метка для SQL-метрик; вне запроса (seed, фоновые задачи) — "-"
+current_route: ContextVar[str] = ContextVar("current_route", default="-")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = HTTP_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, *labels: str, value: float) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        bounds = [f'le="{bound}"' for bound in self.buckets]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, bound)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, INF)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+registry: list[_Metric] = []
+# снимаемые при scrape (состояние пулов): вызываются перед render
+_collectors: list[Callable[[], None]] = []
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed.", ("method", "route"))
+
+DB_STATEMENTS = Histogram(
+    "db_statement_duration_seconds", "SQL statement time (cursor execute) by route and statement kind.",
+    ("engine", "route", "operation"), buckets=DB_BUCKETS,
+)
+DB_ERRORS = Counter("db_statement_errors_total", "SQL statements that raised.", ("engine", "route", "operation"))
+
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size.", ("engine",))
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out.", ("engine",))
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections currently open (negative: pool not filled yet).", ("engine",))
+POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_duration_seconds", "Time to get a connection from the pool (incl. opening a new one).",
+    ("engine",), buckets=DB_BUCKETS,
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout.", ("engine",))
+
+
+def render() -> str:
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in registry:
+        lines += metric.header()
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ── HTTP
+
+
+def route_template(routes, scope) -> str:
+    """Шаблон пути маршрута, который обработает запрос (так же, как выбирает его Router)."""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # путь совпал, метод нет — ответ будет 405
+    return partial or UNMATCHED
+
+
+# ── DB
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:16].split(None, 1)
+    return head[0].upper() if head else "-"
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Время каждого SQL и состояние пула движка (sync Engine или AsyncEngine) под меткой engine=name."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            DB_STATEMENTS.observe(name, current_route.get(), _operation(statement), value=time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        statement = exception_context.statement or ""
+        DB_ERRORS.inc(name, current_route.get(), _operation(statement))
+
+    def collect() -> None:
+        pool = sync_engine.pool  # после dispose() пул новый — берём актуальный
+        if isinstance(pool, QueuePool):
+            POOL_SIZE.set(name, value=pool.size())
+            POOL_CHECKED_OUT.set(name, value=pool.checkedout())
+            POOL_OVERFLOW.set(name, value=pool.overflow())
+
+    _collectors.append(collect)
+
+
+class _TimedCheckout:
+    """
+    Подмешивается к QueuePool: сколько ждали коннект (с pre_ping) и сколько раз упёрлись в pool_timeout.
+    Метка — pool_logging_name движка (переживает recreate() пула при dispose()).
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        name = self.logging_name or "-"
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(name)
+            raise
+        finally:
+            POOL_CHECKOUT.observe(name, value=time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
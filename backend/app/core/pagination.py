@@ -0,0 +1,159 @@
+# app/core/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_, literal, select, func
+from sqlalchemy.sql import Select, operators
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # enum
+        return value.value
+    return value
+
+
+def _load(column, value: Any) -> Any:
+    """Значение курсора -> тип колонки; всё, что не мог выдать encode(), — ValueError."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError("cursor value")
+    try:
+        py_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if py_type in (uuid.UUID, datetime, date, str) and not isinstance(value, str):
+        raise ValueError("cursor value")
+    if py_type is uuid.UUID:
+        return uuid.UUID(value)
+    if py_type is datetime:
+        return datetime.fromisoformat(value)
+    if py_type is date:
+        return date.fromisoformat(value)
+    if py_type is int and not isinstance(value, int):
+        raise ValueError("cursor value")
+    if py_type is float and not isinstance(value, (int, float)):
+        raise ValueError("cursor value")
+    return value
+
+
+class Keyset:
+    """
+    Keyset-пагинация по фиксированному порядку сортировки.
+
+    Курсор — непрозрачная base64url-строка со значениями ключей последней строки
+    страницы; следующая страница — это `WHERE (ключи) > (курсор) ORDER BY ключи LIMIT n`,
+    цена не зависит от глубины (в отличие от OFFSET). Последний ключ должен быть
+    уникальным (id), иначе строки с одинаковыми ключами потеряются на стыке страниц.
+
+        EMPLOYEES = Keyset(Employee.name, Employee.id)
+        ROLES = Keyset(Role.name, Role.version.desc(), Role.id)
+    """
+
+    def __init__(self, *order):
+        self.columns = []
+        self.desc = []
+        for item in order:
+            is_desc = getattr(item, "modifier", None) is operators.desc_op
+            self.columns.append(item.element if is_desc else item)
+            self.desc.append(is_desc)
+
+    def order_by(self, stmt: Select) -> Select:
+        return stmt.order_by(*[c.desc() if d else c.asc() for c, d in zip(self.columns, self.desc)])
+
+    def encode(self, row: Any) -> str:
+        values = [_dump(getattr(row, c.key)) for c in self.columns]
+        raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> list[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError("cursor shape")
+            return [_load(c, v) for c, v in zip(self.columns, values)]
+        except (ValueError, TypeError, AttributeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def after(self, stmt: Select, cursor: str) -> Select:
+        """Строки строго после курсора в порядке self.order_by."""
+        values = [literal(v, c.type) for c, v in zip(self.columns, self.decode(cursor))]
+        if not any(self.desc) or all(self.desc):
+            # одно направление: row-comparison, Postgres отдаёт его индексу целиком
+            left, right = tuple_(*self.columns), tuple_(*values)
+            return stmt.where(left < right if self.desc[0] else left > right)
+
+        # смешанные направления: (a > x) OR (a = x AND b < y) OR ...
+        clauses = []
+        for i, (col, val, is_desc) in enumerate(zip(self.columns, values, self.desc)):
+            prefix = [c == v for c, v in zip(self.columns[:i], values[:i])]
+            clauses.append(and_(*prefix, col < val if is_desc else col > val))
+        return stmt.where(or_(*clauses))
+
+    def page(self, rows: Sequence[Any], per_page: int) -> tuple[list[Any], str | None]:
+        """rows выбраны с limit(per_page + 1): лишняя строка означает, что есть продолжение."""
+        rows = list(rows)
+        if len(rows) <= per_page:
+            return rows, None
+        rows = rows[:per_page]
+        return rows, self.encode(rows[-1])
+
+
+def _selects_entity(stmt: Select) -> bool:
+    desc = stmt.column_descriptions
+    return len(desc) == 1 and isinstance(desc[0]["expr"], type)
+
+
+async def fetch_page(
+    db,
+    stmt: Select,
+    keyset: Keyset,
+    *,
+    page: int,
+    per_page: int,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    rank=None,
+):
+    """
+    Общая выборка страницы для list-эндпоинтов.
+
+    Без cursor — классический OFFSET по page (total считается по умолчанию, как раньше).
+    С cursor — keyset после курсора, page игнорируется, total только по with_total=true.
+    next_cursor возвращается в обоих режимах, так что с OFFSET можно перейти на курсор.
+    stmt — select(Model) (строки — ORM-объекты) или проекция колонок (строки — Row,
+    см. app/core/serialization.Projection); в проекции должны быть колонки keyset.
+    rank (релевантность поиска) сортирует OFFSET-страницы по убыванию; курсор такой
+    порядок не продолжает, поэтому при rank next_cursor нет, а в keyset-режиме rank
+    игнорируется — там остаётся стабильный порядок ключей.
+    Возвращает (rows, total | None, next_cursor | None).
+    """
+    if with_total is None:
+        with_total = cursor is None
+    total = await db.scalar(select(func.count()).select_from(stmt.subquery())) if with_total else None
+
+    if cursor:
+        stmt = keyset.after(stmt, cursor)
+    else:
+        stmt = stmt.offset((page - 1) * per_page)
+        if rank is not None:
+            stmt = stmt.order_by(rank.desc())
+    stmt = keyset.order_by(stmt).limit(per_page + 1)
+
+    result = await db.execute(stmt)
+    rows = (result.scalars() if _selects_entity(stmt) else result).all()
+    rows, next_cursor = keyset.page(rows, per_page)
+    if rank is not None and not cursor:
+        next_cursor = None
+    return rows, (total or 0) if with_total else None, next_cursor
@@ -0,0 +1,244 @@
+# app/core/profiling.py
+"""
+Диагностика на проде без отладчика — всё выключено или дёшево по умолчанию.
+
+Профиль запроса (cProfile -> PROFILE_DIR/*.prof, смотреть snakeviz / pstats):
+    - заголовок X-Profile: 1 от админа (проверяется токен из Authorization);
+    - или случайная доля запросов PROFILE_SAMPLE_RATE (0 — выкл).
+  Имя файла возвращается в X-Profile-File. Профилируется поток event loop'а, пока запрос
+  не отдал заголовки: параллельные запросы на том же loop тоже попадут в профиль, работа
+  в threadpool (sync-режим БД) — нет. Одновременно пишется только один профиль.
+
+Медленный SQL (дольше SLOW_QUERY_MS; по умолчанию 0 — выкл): warning в лог app.core.profiling и запись
+в PROFILE_DIR/slow_queries.jsonl — маршрут, время, текст запроса. Параметры — только у SELECT и
+только форма (типы и длины строк), значений в логе нет. План — если SLOW_QUERY_EXPLAIN:
+    - Postgres: EXPLAIN (ANALYZE, BUFFERS) — запрос выполняется ещё раз, поэтому только для
+      SELECT и не чаще раза в SLOW_QUERY_EXPLAIN_INTERVAL_SEC на один текст запроса;
+    - SQLite: EXPLAIN QUERY PLAN (без выполнения).
+  План снимается в фоне на отдельном соединении из пула того же движка, не в запросе.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import cProfile
+import hashlib
+import logging
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+SLOW_LOG = "slow_queries.jsonl"
+_PARAMS_MAX = 2000
+_SKIP = "slow_sql_explain"  # execution option фонового EXPLAIN: сам он в лог не пишется
+
+_profiling = False
+_explained = TTLCache(maxsize=1024, ttl=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SEC)
+_executor: ThreadPoolExecutor | None = None
+_tasks: set[asyncio.Task] = set()  # ссылки на фоновые EXPLAIN async-движка, чтобы их не собрал GC
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|COPY|CALL|LOCK)\b|\bFOR\s+(UPDATE|SHARE)\b", re.I)
+
+
+# ── Профиль запроса
+
+
+def sampled() -> bool:
+    """Попал ли запрос без X-Profile в случайную долю PROFILE_SAMPLE_RATE."""
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def start() -> cProfile.Profile | None:
+    """Новый профиль или None, если уже идёт другой (cProfile — один на поток)."""
+    global _profiling
+    if _profiling:
+        return None
+    _profiling = True
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def stop(profile: cProfile.Profile) -> None:
+    global _profiling
+    profile.disable()
+    _profiling = False
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:80] or "root"
+
+
+def save(profile: cProfile.Profile, method: str, route: str, elapsed: float) -> str:
+    """Записать профиль в PROFILE_DIR (блокирующе — звать через threadpool); вернуть имя файла."""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    name = f"{stamp}-{method}-{_slug(route)}-{int(elapsed * 1000)}ms.prof"
+    profile.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+    _rotate()
+    return name
+
+
+def _rotate() -> None:
+    files = sorted(f for f in os.listdir(settings.PROFILE_DIR) if f.endswith(".prof"))
+    for old in files[: max(len(files) - settings.PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(settings.PROFILE_DIR, old))
+        except OSError:
+            pass
+
+
+# ── Медленный SQL
+
+
+def _is_read(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(("SELECT", "WITH")) and not _WRITES.search(statement)
+
+
+def _shape(value) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def _params(statement: str, parameters) -> str | None:
+    """
+    Форма параметров, без значений: str(23), int, UUID… В значениях бывают email, хеши паролей,
+    строки импорта — в лог их не пишем. У записей (INSERT/UPDATE/DELETE) — не пишем вовсе.
+    """
+    if not _is_read(statement):
+        return None
+    if isinstance(parameters, dict):
+        text = repr({k: _shape(v) for k, v in parameters.items()})
+    elif isinstance(parameters, (list, tuple)):
+        text = repr([_shape(v) for v in parameters])
+    else:
+        text = _shape(parameters)
+    return text if len(text) <= _PARAMS_MAX else text[:_PARAMS_MAX] + "…"
+
+
+def _explain_sql(dialect: str, statement: str) -> str | None:
+    if dialect == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS) " + statement
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN " + statement
+    return None
+
+
+def _plan_rows(rows) -> list[str]:
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+def _explain_sync(engine, sql: str, parameters, record: dict) -> None:
+    try:
+        with engine.connect().execution_options(**{_SKIP: True}) as conn:
+            record["plan"] = _plan_rows(conn.exec_driver_sql(sql, parameters).all())
+            conn.rollback()
+    except Exception as exc:
+        record["plan"] = [f"EXPLAIN failed: {exc!r}"[:500]]
+    _log_slow(record)
+
+
+async def _explain_async(engine, sql: str, parameters, record: dict) -> None:
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(**{_SKIP: True})
+            record["plan"] = _plan_rows((await conn.exec_driver_sql(sql, parameters)).all())
+            await conn.rollback()
+    except Exception as exc:
+        record["plan"] = [f"EXPLAIN failed: {exc!r}"[:500]]
+    _log_slow(record)
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-sql-explain")
+    return _executor
+
+
+def _schedule_explain(engine, dialect: str, statement: str, parameters, record: dict) -> bool:
+    """
+    План — на отдельном соединении из пула движка, в фоне: запрос, который и так был медленным,
+    второй раз не ждёт. Только SELECT (ANALYZE выполняет запрос) и не чаще раза в
+    SLOW_QUERY_EXPLAIN_INTERVAL_SEC на один текст запроса. False — план сниматься не будет.
+    """
+    sql = _explain_sql(dialect, statement)
+    if sql is None or not _is_read(statement):
+        return False
+    key = hashlib.sha1(statement.encode()).hexdigest()
+    if _explained.get(key) is not None:
+        return False
+    _explained.set(key, True)
+    if isinstance(parameters, list):
+        parameters = tuple(parameters)
+    # чистый контекст: EXPLAIN не должен попасть в X-Query-Count и бюджет запроса
+    if isinstance(engine, AsyncEngine):
+        loop = asyncio.get_running_loop()  # после cursor execute мы в greenlet'е потока event loop'а
+        task = loop.create_task(_explain_async(engine, sql, parameters, record), context=contextvars.Context())
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    else:
+        _pool().submit(_explain_sync, engine, sql, parameters, record)
+    return True
+
+
+def _log_slow(record: dict) -> None:
+    """Запись в PROFILE_DIR/slow_queries.jsonl (warning в лог — сразу в _after)."""
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(settings.PROFILE_DIR, SLOW_LOG), "ab") as fh:
+            fh.write(orjson.dumps(record) + b"\n")
+    except OSError as exc:
+        logger.error("slow query log write failed: %r", exc)
+
+
+def instrument_slow_queries(engine, name: str) -> None:
+    """Запросы дольше SLOW_QUERY_MS движка (sync Engine или AsyncEngine) — в лог, план — по SLOW_QUERY_EXPLAIN."""
+    if settings.SLOW_QUERY_MS <= 0:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    threshold = settings.SLOW_QUERY_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and not context.execution_options.get(_SKIP):
+            context._slow_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < threshold:
+            return
+        record = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "engine": name,
+            "route": current_route.get(),
+            "ms": round(elapsed * 1000, 1),
+            "statement": statement,
+            "parameters": None if executemany else _params(statement, parameters),
+            "plan": None,
+        }
+        logger.warning("slow SQL %s %s ms: %r", record["route"], record["ms"], statement[:200])
+        explaining = (
+            settings.SLOW_QUERY_EXPLAIN and not executemany
+            and _schedule_explain(engine, conn.dialect.name, statement, parameters, record)
+        )
+        if not explaining:  # иначе запись допишет фоновый EXPLAIN вместе с планом
+            _log_slow(record)
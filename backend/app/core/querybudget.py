@@ -0,0 +1,109 @@
+# app/core/querybudget.py
+"""
+Счётчик SQL на запрос и бюджеты запросов для эндпоинтов — против тихого N+1.
+
+    middleware (main.py)  request_counter() на каждый запрос; при QUERY_COUNT_HEADER — заголовок X-Query-Count
+    @query_budget(2)      над хэндлером: сколько запросов сделал сам хэндлер (зависимости —
+                          авторизация, сессия — не в счёт). Превышение: при QUERY_BUDGET_STRICT
+                          — QueryBudgetExceeded (500), иначе warning в лог app.core.querybudget
+                          и db_query_budget_exceeded_total в /metrics
+    tests/                фикстура count_queries на том же счётчике: бюджеты маршрутов —
+                          тесты (tests/test_query_budgets.py), тут — страховка в рантайме
+
+Бюджет не должен зависеть от per_page: 2 на список — это count + страница при любом размере.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import Counter, current_route
+
+HEADER = "X-Query-Count"
+
+logger = logging.getLogger(__name__)
+
+BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total", "Handler calls that issued more SQL than their @query_budget.", ("route",),
+)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryCounter:
+    """
+    Изменяемый счётчик: контекст копируется в потоки threadpool, объект — общий.
+    parent — счётчик, который был в контексте до этого (например, у теста вокруг запроса):
+    ему засчитывается всё то же самое.
+    """
+
+    __slots__ = ("count", "parent")
+
+    def __init__(self, parent: QueryCounter | None = None):
+        self.count = 0
+        self.parent = parent
+
+
+_counter: ContextVar[QueryCounter | None] = ContextVar("query_counter", default=None)
+
+
+def request_counter() -> tuple[QueryCounter, object]:
+    """Новый счётчик для текущего контекста; второе значение — токен для reset()."""
+    counter = QueryCounter(_counter.get())
+    return counter, _counter.set(counter)
+
+
+def reset(token) -> None:
+    _counter.reset(token)
+
+
+def count_queries(engine) -> None:
+    """Считать каждый cursor execute движка (sync Engine или AsyncEngine) в счётчик запроса."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _counter.get()
+        while counter is not None:
+            counter.count += 1
+            counter = counter.parent
+
+
+def query_budget(limit: int):
+    """Декоратор async-хэндлера: не больше limit SQL-запросов за вызов (см. модуль)."""
+
+    def decorator(fn):
+        assert inspect.iscoroutinefunction(fn), "query_budget: only async handlers"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            counter = _counter.get()
+            token = None
+            if counter is None:  # вызов вне middleware (скрипты) — свой счётчик
+                counter, token = request_counter()
+            before = counter.count
+            try:
+                result = await fn(*args, **kwargs)
+            finally:
+                if token is not None:
+                    reset(token)
+            used = counter.count - before
+            if used > limit:
+                message = f"{fn.__qualname__} issued {used} SQL queries, budget is {limit}"
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+                BUDGET_EXCEEDED.inc(current_route.get())
+                logger.warning("%s: %s", current_route.get(), message)
+            return result
+
+        wrapper.query_budget = limit
+        return wrapper
+
+    return decorator
@@ -0,0 +1,144 @@
+# app/core/response_cache.py
+"""
+Read-through кэш готовых ответов справочных GET (роли, вакансии): меняются редко, а читает их каждая страница UI.
+
+    ключ       путь + отсортированные query-параметры + роль вызывающего (ответ, который начнёт
+               зависеть от прав, не утечёт другой роли)
+    значение   тело, media type, сильный ETag (sha1 тела) и таблицы, из которых собран ответ
+    вытеснение RESPONSE_CACHE_TTL_SEC и LRU по RESPONSE_CACHE_SIZE (TTLCache, видно в /cachez)
+
+If-None-Match с текущим ETag — 304 без тела; ETag зависит только от тела, поэтому 304 работает
+и после промаха, если данные не изменились.
+
+Инвалидация — invalidate_on_writes(engine): любой INSERT/UPDATE/DELETE по таблице (ORM, Core,
+bulk) сбрасывает её ответы сразу и ещё раз на COMMIT этого соединения — читатель между записью
+и коммитом мог положить в кэш старое; ответ, собранный во время инвалидации его таблиц, в кэш не
+попадает. Сырой text() мимо этих конструкций не ловится. Per-process: другие воркеры uvicorn
+увидят изменения не позже RESPONSE_CACHE_TTL_SEC.
+
+Метрика response_cache_requests_total{route, result=hit|miss|not_modified}: hit rate = hit / всего.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import Counter, current_route
+
+CACHE_CONTROL = "private, no-cache"  # браузер хранит, но каждый раз ревалидирует по ETag
+_PENDING = "response_cache_pending"  # conn.info: таблицы, записанные в незакоммиченной транзакции
+
+REQUESTS = Counter(
+    "response_cache_requests_total", "Cached GET endpoints: hit, miss or 304 by route template.", ("route", "result"),
+)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    media_type: str
+    etag: str
+    tables: tuple[str, ...]
+
+
+responses = TTLCache(maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SEC, name="responses")
+
+# таблица -> счётчик инвалидаций: ответ, собранный, пока таблицу меняли, в кэш не кладём
+_generations: dict[str | None, int] = {}
+# таблицы, из которых хоть раз собирали ответ: запись в остальные не перебирает кэш
+_tables: set[str] = set()
+
+
+def _generation(tables: tuple[str, ...]) -> tuple[int, ...]:
+    return (_generations.get(None, 0), *(_generations.get(t, 0) for t in tables))
+
+
+def invalidate(table: str | None = None) -> int:
+    """Сбросить ответы, собранные из table (или все); вернуть, сколько выкинули."""
+    _generations[table] = _generations.get(table, 0) + 1
+    if table is None:
+        count = len(responses)
+        responses.clear()
+        return count
+    if table not in _tables:
+        return 0
+    return responses.pop_where(lambda _key, cached: table in cached.tables)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match — список тегов через запятую или *; подстрока не в счёт."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _response(cached: CachedResponse, if_none_match: str | None) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+
+async def serve(
+    request: Request, role: str, tables: tuple[str, ...], build: Callable[[], Awaitable[Response]],
+) -> Response:
+    """Ответ из кэша или build() (200 кладётся в кэш); ошибки и не-200 не кэшируются."""
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), role)
+    if_none_match = request.headers.get("if-none-match")
+    route = current_route.get()
+    cached = responses.get(key)
+    if cached is None:
+        generation = _generation(tables)
+        response = await build()
+        if response.status_code != 200:
+            return response
+        body = bytes(response.body)
+        cached = CachedResponse(
+            body=body,
+            media_type=response.media_type or "application/json",
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            tables=tables,
+        )
+        _tables.update(tables)
+        if _generation(tables) == generation:
+            responses.set(key, cached)
+        result = "miss"
+    else:
+        result = "hit"
+    if etag_matches(if_none_match, cached.etag):
+        result = "not_modified"
+    REQUESTS.inc(route, result)
+    return _response(cached, if_none_match)
+
+
+def invalidate_on_writes(engine) -> None:
+    """Сбрасывать ответы по таблицам, в которые пишет движок (sync Engine или AsyncEngine)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "after_execute")
+    def _written(conn, clauseelement, multiparams, params, execution_options, result):
+        if not isinstance(clauseelement, UpdateBase):
+            return
+        table = getattr(clauseelement.table, "name", None)
+        if table is None:
+            return
+        invalidate(table)
+        conn.info.setdefault(_PENDING, set()).add(table)
+
+    @event.listens_for(sync_engine, "commit")
+    def _committed(conn):
+        for table in conn.info.pop(_PENDING, ()):
+            invalidate(table)
+
+    @event.listens_for(sync_engine, "rollback")
+    def _rolled_back(conn):
+        conn.info.pop(_PENDING, None)
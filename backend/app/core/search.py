@@ -0,0 +1,65 @@
+# app/core/search.py
+"""
+Поиск по сотрудникам и ролям.
+
+В каждой таблице есть колонка search_text — нормализованная склейка полей, по которым
+ищем (name/email/title у сотрудника, name/goal у роли). Её поддерживают ORM-события
+моделей, в Postgres по ней построен GIN-индекс pg_trgm (миграция search_trigram).
+
+Нормализация та же, что у фронта в orgLevels.normalizeOrgTag, только шире: нижний
+регистр, ё → е, строчные кириллические двойники латиницы (а е о р с у х) → латиница
+(«СЕО» == «CEO»), схлопнутые пробелы. Буквы, похожие на латиницу только заглавными
+(в н т м к), не трогаем: «вера» не должна совпадать с «bepa». Запрос нормализуется так же, поэтому «Петров» найдётся и по «петров»,
+и по «пeтpoв», набранному в смешанной раскладке.
+"""
+import re
+
+from sqlalchemy import func, or_, literal
+
+from app.core.config import settings
+
+# строчная кириллица -> латинские двойники (после lower); ё отдельно — к «е».
+# Таблица заморожена в миграции b7d41c09e5f2: меняешь здесь — нужен бэкфилл search_text
+_FOLD_FROM = "ёаеорсух"
+_FOLD_TO = "eaeopcyx"
+_FOLD = str.maketrans(_FOLD_FROM, _FOLD_TO)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str | None) -> str:
+    if not text:
+        return ""
+    return _SPACES.sub(" ", text.lower().translate(_FOLD)).strip()
+
+
+def build_search_text(*parts: str | None) -> str:
+    return normalize(" ".join(p for p in parts if p))
+
+
+def is_postgres() -> bool:
+    return settings.DB_URL.startswith("postgresql")
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def match(column, raw_query: str):
+    """
+    (where, rank) для поиска по нормализованной колонке.
+
+    Postgres: подстрока ИЛИ нечёткое совпадение по словам (`%>`, word_similarity) —
+    оба оператора обслуживает GIN gin_trgm_ops; rank = word_similarity.
+    Иначе (SQLite в тестах): только подстрока, rank — чем раньше совпадение, тем выше.
+    Пустой после нормализации запрос -> (None, None): фильтр не нужен.
+    """
+    q = normalize(raw_query)
+    if not q:
+        return None, None
+
+    substring = column.like(_like_pattern(q), escape="\\")
+    if is_postgres():
+        q_param = literal(q)
+        return or_(substring, column.op("%>")(q_param)), func.word_similarity(q_param, column)
+    return substring, -func.instr(column, q)
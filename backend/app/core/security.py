@@ -1,3 +1,7 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Callable
 from functools import wraps
@@ -6,9 +10,13 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.db import SessionLocal
+from app.db.session import get_session
 from app.models.user import User
 
 pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
@@ -20,6 +28,57 @@ def hash_password(plain: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+# ---- Пароли вне общего threadpool ----
+# argon2/bcrypt отпускают GIL, но каждая проверка — десятки мс CPU. В общем threadpool
+# (sync-эндпоинты, sync-режим БД) всплеск логинов занял бы все потоки. Поэтому свой пул
+# PASSWORD_WORKERS потоков и семафор на столько же: лишние ждут в event loop не дольше
+# PASSWORD_QUEUE_TIMEOUT_SEC, потом 503 — очередь не растёт бесконечно.
+
+_password_executor: ThreadPoolExecutor | None = None
+_password_slots: asyncio.Semaphore | None = None
+
+def _password_pool() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_WORKERS, thread_name_prefix="password")
+    return _password_executor
+
+async def _run_password_job(fn: Callable, *args):
+    global _password_slots
+    if _password_slots is None:
+        _password_slots = asyncio.Semaphore(settings.PASSWORD_WORKERS)
+    try:
+        await asyncio.wait_for(_password_slots.acquire(), timeout=settings.PASSWORD_QUEUE_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Too many login attempts, retry later", headers={"Retry-After": "1"})
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_pool(), fn, *args)
+    finally:
+        _password_slots.release()
+
+def _verify_and_update(plain: str, hashed: str | None) -> tuple[bool, str | None]:
+    if not hashed or not isinstance(hashed, str):
+        return False, None
+    try:
+        return pwd_context.verify_and_update(plain, hashed)
+    except Exception:
+        # например, хеш в неожиданном формате — считаем невалидным
+        return False, None
+
+async def verify_password_async(plain: str, hashed: str | None) -> tuple[bool, str | None]:
+    """
+    (пароль верный, новый хеш | None). Новый хеш — если схема/параметры устарели
+    (pwd_context.needs_update, например bcrypt -> argon2): его надо сохранить.
+    """
+    return await _run_password_job(_verify_and_update, plain, hashed)
+
+async def hash_password_async(plain: str) -> str:
+    return await _run_password_job(hash_password, plain)
+
+def hash_passwords(plains: list[str]) -> list[str]:
+    """Пачкой в пуле паролей (для sync-кода вроде seed): N хешей за ~N/PASSWORD_WORKERS времени."""
+    return list(_password_pool().map(hash_password, plains))
+
 def _create_token(sub: str, ttl_minutes: int, token_type: str) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -38,33 +97,141 @@ def create_refresh_token(sub: str) -> str:
 
 # ---- AuthN / AuthZ ----
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Проверяем JWT и отдаём юзера. 401 если токен битый/просрочен; 403 если юзер неактивен."""
-    credentials_exc = HTTPException(status_code=401, detail="Invalid or expired token")
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """То, что эндпоинтам нужно знать о текущем пользователе (без ORM-объекта и сессии)."""
+    email: str
+    role: str
+    is_active: bool
+
+
+# sub токена (email) -> Principal. Per-process: между воркерами uvicorn инвалидация
+# не ходит, поэтому устаревание сверху ограничено USER_CACHE_TTL_SEC.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SEC, name="users")
+
+# access-токен -> sub (email): повторные запросы с тем же токеном не гоняют HMAC и разбор
+# JSON в jwt.decode. Запись живёт ровно до exp токена; кладём только успешно проверенные
+# access-токены (мусор не кэшируем — его можно генерировать бесконечно). Кэш лишь
+# заменяет проверку подписи: is_active всё равно берётся из user_cache/БД на каждом запросе.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TTL_MIN * 60, name="tokens")
+
+# счётчик инвалидаций: Principal, прочитанный из БД во время инвалидации, в кэш не кладём
+_evictions = 0
+# session.info: email-ы (None — все), записанные в незакоммиченной транзакции
+_PENDING = "user_cache_pending"
+
+def invalidate_user(email: str | None = None) -> None:
+    """Сбросить закэшированного пользователя и его токены (или всё, если email не задан)."""
+    global _evictions
+    _evictions += 1
+    if email is None:
+        user_cache.clear()
+        token_cache.clear()
+    else:
+        user_cache.pop(email)
+        token_cache.pop_where(lambda _token, sub: sub == email)
+
+def _token_subject(token: str) -> str | None:
+    """sub проверенного access-токена; None — токен битый, просрочен или не access."""
+    email = token_cache.get(token)
+    if email is not None:
+        return email
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGO])
-        if payload.get("type") != "access":
-            raise credentials_exc
-        email = payload.get("sub")
     except JWTError:
-        raise credentials_exc
+        return None
+    email = payload.get("sub")
+    if payload.get("type") != "access" or not isinstance(email, str):
+        return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(token, email, ttl=ttl)
+    return email
 
-    # локальная сессия для запроса пользователя
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user or not user.is_active:
-            raise HTTPException(status_code=403, detail="User inactive or not found")
-        return user
-    finally:
-        db.close()
+# Запись в users выкидывает пользователя из кэша дважды: на flush и ещё раз на COMMIT —
+# параллельный запрос между ними читает старую строку и мог положить её обратно.
+
+def _evict(session: Session | None, *emails: str | None) -> None:
+    for email in emails:
+        invalidate_user(email)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).update(emails)
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    # деактивация / смена роли / смена email через ORM
+    email_hist = inspect(target).attrs.email.history
+    _evict(object_session(target), target.email, *(email_hist.deleted or ()))
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    _evict(object_session(target), target.email)
+
+@event.listens_for(Session, "do_orm_execute")
+def _user_bulk_write(orm_execute_state) -> None:
+    # update(User)/delete(User) мимо unit of work — кого задело, не знаем, чистим всё
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+        m.class_ is User for m in orm_execute_state.all_mappers
+    ):
+        _evict(orm_execute_state.session, None)
+
+@event.listens_for(Session, "after_commit")
+def _user_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING, ())
+    if None in pending:
+        invalidate_user()
+        return
+    for email in pending:
+        invalidate_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _user_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_session),
+) -> Principal:
+    """Проверяем JWT и отдаём юзера. 401 если токен битый/просрочен; 403 если юзер неактивен."""
+    email = _token_subject(token)
+    if email is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    # сессия запроса: FastAPI кэширует зависимость, эндпоинт получит ту же самую
+    principal = await _load_principal(db, email)
+    if not principal or not principal.is_active:
+        raise HTTPException(status_code=403, detail="User inactive or not found")
+    return principal
+
+async def _load_principal(db, email: str) -> Principal | None:
+    principal = user_cache.get(email)
+    if principal is None:
+        generation = _evictions
+        user = await db.scalar(select(User).where(User.email == email))
+        if user:
+            principal = Principal(email=user.email, role=user.role, is_active=user.is_active)
+            if _evictions == generation:
+                user_cache.set(email, principal)
+    return principal
+
+async def principal_from_header(authorization: str | None) -> Principal | None:
+    """Активный пользователь по заголовку Authorization — для middleware, вне DI; иначе None."""
+    scheme, _, token = (authorization or "").partition(" ")
+    email = _token_subject(token) if scheme.lower() == "bearer" and token else None
+    if email is None:
+        return None
+    principal = user_cache.get(email)
+    if principal is None:
+        async for db in get_session():  # своя короткая сессия, только на промахе кэша
+            principal = await _load_principal(db, email)
+    return principal if principal and principal.is_active else None
 
 def require_roles(*allowed_roles: str):
     """
     Dependency: кладём в эндпоинт как Depends(require_roles("hr","admin"))
     Если список пуст — только проверка, что пользователь аутентифицирован.
     """
-    def _dep(user: User = Depends(get_current_user)) -> User:
+    async def _dep(user: Principal = Depends(get_current_user)) -> Principal:
         if allowed_roles and user.role not in allowed_roles:
             raise HTTPException(status_code=403, detail="Forbidden: insufficient role")
         return user
@@ -0,0 +1,101 @@
+# app/core/serialization.py
+"""
+Быстрый путь сериализации list-эндпоинтов.
+
+Обычный путь: ORM-объект целиком -> XxxOut.model_validate -> FastAPI ещё раз валидирует
+по response_model -> stdlib json. Здесь вместо этого выбираются только колонки, нужные
+схеме ответа (Projection), строки раскладываются в dict по заранее посчитанному списку
+полей и кодируются orjson (FastJSONResponse). Возвращённый Response FastAPI не трогает,
+response_model остаётся только для OpenAPI.
+
+Данные из своей БД считаем уже валидными: типы колонок совпадают с полями схем.
+
+    EMPLOYEE_OUT = Projection(Employee, EmployeeOut)
+    stmt = EMPLOYEE_OUT.select().where(...)
+    return page_response(EMPLOYEE_OUT, rows, page=..., per_page=..., total=..., next_cursor=...)
+
+?fields= сужает проекцию (Projection.only): лишние колонки не читаются из БД вовсе.
+"""
+from decimal import Decimal
+from typing import Any, Sequence
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+# datetime с UTC -> "...Z", как у Pydantic; нестроковые ключи dict (JSON-блобы) — в строки
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):  # Numeric-колонки (assessments.percent)
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """JSON-ответ через orjson (UUID, date/datetime, Enum, Decimal — без jsonable_encoder)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class Projection:
+    """Колонки модели под поля схемы ответа и сборка строк выборки в dict по этим полям."""
+
+    def __init__(self, model, schema: type[BaseModel], fields: Sequence[str] | None = None):
+        self.model = model
+        self.schema = schema
+        self.fields = tuple(fields) if fields is not None else tuple(schema.model_fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+
+    def only(self, fields: str | None, *, keep: Sequence = ()) -> "Projection":
+        """
+        Подмножество полей по ?fields=name,title (sparse fieldset), в порядке схемы.
+        Неизвестное поле — 400. keep — колонки, без которых нельзя (ключи keyset для
+        next_cursor); они выбираются и отдаются всегда, как и id.
+        """
+        if not fields:
+            return self
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested.difference(self.fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        requested.add("id")
+        requested.update(c.key for c in keep)
+        return Projection(self.model, self.schema, [f for f in self.fields if f in requested])
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def dump(self, rows: Sequence[Sequence[Any]]) -> list[dict]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+
+def page_response(
+    projection: Projection,
+    rows: Sequence[Sequence[Any]],
+    *,
+    page: int,
+    per_page: int,
+    total: int | None,
+    next_cursor: str | None,
+) -> FastJSONResponse:
+    """Ответ формы XxxList (items/page/per_page/total/next_cursor) без Pydantic."""
+    return FastJSONResponse({
+        "items": projection.dump(rows),
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "next_cursor": next_cursor,
+    })
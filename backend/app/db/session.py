@@ -1,7 +1,11 @@
 # app/db/session.py
 import os
 import ssl
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, AsyncIterator
+
+from anyio import CapacityLimiter
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -11,6 +15,11 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.engine import make_url, URL
 
 from app.core.config import settings
+from app.core.db import SessionLocal as SyncSessionLocal
+from app.core.profiling import instrument_slow_queries
+from app.core.querybudget import count_queries
+from app.core.response_cache import invalidate_on_writes
+from app.core.metrics import TimedAsyncQueuePool, instrument_engine
 
 
 def _normalize_and_extract_ssl(raw_url: str) -> Tuple[str, Dict[str, Any]]:
@@ -115,23 +124,126 @@ ASYNC_DB_URL, CONNECT_ARGS = _normalize_and_extract_ssl(raw_url)
 if ASYNC_DB_URL.startswith("sqlite:///"):
     ASYNC_DB_URL = ASYNC_DB_URL.replace("sqlite:///", "sqlite+aiosqlite:///")
 
-# Создаём async-движок
-engine = create_async_engine(
-    ASYNC_DB_URL,
-    future=True,
-    pool_pre_ping=True,
-    connect_args=CONNECT_ARGS or None,
-)
+if ASYNC_DB_URL.startswith("postgresql+asyncpg"):
+    # Те же лимиты, что и у sync-движка: таймаут коннекта + statement_timeout.
+    # Кэш prepared statements выключен — Supabase pooler (pgbouncer, transaction mode)
+    # не гарантирует, что следующий запрос попадёт в тот же backend.
+    CONNECT_ARGS.update(
+        timeout=5,
+        statement_cache_size=0,
+        server_settings={"statement_timeout": "8000", "timezone": "UTC"},
+    )
 
-# Фабрика сессий
-SessionLocal = async_sessionmaker(
-    engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-)
+engine = None
+SessionLocal = None
+
+if settings.DB_ASYNC:
+    # Создаём async-движок (только в async-режиме: драйвер asyncpg/aiosqlite нужен лишь здесь)
+    engine = create_async_engine(
+        ASYNC_DB_URL,
+        future=True,
+        pool_pre_ping=True,
+        connect_args=CONNECT_ARGS,
+        **(
+            {}
+            if ASYNC_DB_URL.startswith("sqlite")
+            else dict(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                poolclass=TimedAsyncQueuePool,
+                pool_logging_name="async",
+            )
+        ),
+    )
+    instrument_engine(engine, "async")
+    instrument_slow_queries(engine, "async")
+    count_queries(engine)
+    invalidate_on_writes(engine)
+
+    # Фабрика сессий
+    SessionLocal = async_sessionmaker(
+        engine,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+class ThreadedSession:
+    """
+    Sync-сессия из app/core/db.py с интерфейсом AsyncSession.
+
+    Роутеры пишутся один раз в async-стиле (`await db.scalar(...)`), а в sync-режиме
+    (DB_ASYNC=false) каждый I/O-вызов уходит в threadpool. Результаты psycopg уже
+    буферизованы на клиенте, так что `.all()` после await не ходит в сеть.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, *args, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        # как AsyncSession.run_sync: fn(sync_session, ...) целиком в одном потоке
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+_sync_slots: CapacityLimiter | None = None
+
+
+def _sync_session_slots() -> CapacityLimiter:
+    # Sync-сессия держит коннект между await'ами. Без лимита потоки threadpool'а
+    # могут все встать на ожидании пула, пока владельцы коннектов ждут свободный поток.
+    global _sync_slots
+    if _sync_slots is None:
+        _sync_slots = CapacityLimiter(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    return _sync_slots
 
 
 # DI-генератор для FastAPI
-async def get_session() -> AsyncSession:
-    async with SessionLocal() as session:
-        yield session
+async def get_session() -> AsyncIterator[AsyncSession | ThreadedSession]:
+    if SessionLocal is not None:
+        async with SessionLocal() as session:
+            yield session
+        return
+
+    async with _sync_session_slots():
+        session = ThreadedSession(SyncSessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,333 @@
+# app/importers/employees.py
+"""
+Серверный импорт сотрудников из CSV / XLSX (POST /employees/import).
+
+Файл читается построчно (csv.reader / openpyxl read_only) в threadpool, валидируется
+пачками по IMPORT_BATCH_SIZE и пишется в employees одним `INSERT ... ON CONFLICT (email)
+DO UPDATE` на пачку (executemany). Руководители — вторым проходом, когда все сотрудники
+файла уже в БД: ссылки из колонки manager (email / UUID / id строки файла) резолвятся
+в id, циклы отбрасываются, manager_id обновляется одним executemany. Closure table
+поддерживается по месту: новым — строки (X, X, 0), сменившим руководителя — move_subtree,
+цикл ловится по ней же. Только если смен больше IMPORT_HIERARCHY_REBUILD_AT — циклы по
+всей таблице в памяти и rebuild_hierarchy. Версия оргструктуры сбрасывается
+(mark_org_reset): записи идут мимо ORM-журнала.
+
+Всё в одной транзакции: упасть на середине файла — значит не записать ничего.
+Ошибки отдельных строк не прерывают импорт, а возвращаются списком.
+
+Колонки — как у фронтового parseEmployeesCsv (id, name, title, department, managerId,
+region …) плюс email и остальные поля EmployeeOut; регистр и пробелы в заголовке не важны.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Any, BinaryIO, Iterator
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.search import build_search_text, is_postgres
+from app.importers.tabular import cell, table_rows
+from app.models.employee import Employee
+from app.models.hierarchy import HierarchyCycleError, add_nodes, move_subtree, rebuild_hierarchy
+from app.models.org_change import mark_org_reset
+from app.schemas.employee import EmployeeImportResult, EmployeeImportRow, ImportRowError, normalize_email
+
+E = Employee.__table__
+
+# больше ошибок в ответ не кладём (счётчик — полный)
+IMPORT_MAX_ERRORS = 1000
+
+# заголовок файла (lower, без пробелов/-/_) -> поле EmployeeImportRow
+HEADER_ALIASES = {
+    "id": "ref",
+    "ref": "ref",
+    "name": "name",
+    "fullname": "name",
+    "email": "email",
+    "title": "title",
+    "department": "department",
+    "unit": "unit",
+    "region": "region",
+    "bio": "bio",
+    "currentrolestartedat": "current_role_started_at",
+    "languages": "languages",
+    "contacts": "contacts",
+    "competencies": "competencies",
+    "manager": "manager",
+    "managerid": "manager",
+    "manageremail": "manager",
+}
+
+# поля, которые уходят в employees (ref/manager — только для второго прохода)
+EMPLOYEE_FIELDS = [f for f in EmployeeImportRow.model_fields if f not in ("ref", "manager")]
+
+
+def _header_key(raw: Any) -> str:
+    return "".join(ch for ch in str(raw or "").lower() if ch not in " -_")
+
+
+# --- чтение файла ---
+
+def read_rows(fileobj: BinaryIO, filename: str | None) -> tuple[set[str], list[str], Iterator[tuple[int, dict]]]:
+    """
+    (поля из заголовка, нераспознанные колонки, итератор (номер записи, {поле: значение})).
+    Пустые ячейки в записи не попадают — поле получит значение по умолчанию.
+    """
+    rows = table_rows(fileobj, filename)
+
+    header = next(rows, None) or []
+    fields = [HEADER_ALIASES.get(_header_key(h)) for h in header]
+    if "name" not in fields or "email" not in fields:
+        raise HTTPException(status_code=400, detail="File must have 'name' and 'email' columns")
+    ignored = [str(h) for h, f in zip(header, fields) if f is None and cell(h)]
+
+    def records() -> Iterator[tuple[int, dict]]:
+        for number, row in enumerate(rows, start=2):
+            record = {}
+            for field, value in zip(fields, row):
+                if field is not None and (value := cell(value)) is not None:
+                    record[field] = value
+            if record:
+                yield number, record
+
+    return {f for f in fields if f}, ignored, records()
+
+
+def _validated_batches(records: Iterator[tuple[int, dict]], size: int):
+    """Пачки ([(номер, EmployeeImportRow)], [ImportRowError]) — генератор для threadpool."""
+    batch, errors = [], []
+    for number, record in records:
+        if number - 1 > settings.IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"More than {settings.IMPORT_MAX_ROWS} rows")
+        try:
+            batch.append((number, EmployeeImportRow.model_validate(record)))
+        except ValidationError as exc:
+            for err in exc.errors():
+                field = ".".join(str(p) for p in err["loc"]) or None
+                errors.append(ImportRowError(row=number, field=field, message=err["msg"]))
+        if len(batch) >= size:
+            yield batch, errors
+            batch, errors = [], []
+    if batch or errors:
+        yield batch, errors
+
+
+# --- запись ---
+
+def _upsert_stmt(columns: list[str]):
+    """Существующим (по email) обновляются только columns — колонки, что есть в файле."""
+    ins = (pg_insert if is_postgres() else sqlite_insert)(E)
+    return ins.on_conflict_do_update(
+        index_elements=[E.c.email],
+        set_={c: ins.excluded[c] for c in columns if c not in ("email", "id")},
+    )
+
+
+def _find_cycles(parents: dict, changed: dict) -> set:
+    """Узлы из changed (id -> новый manager_id), которые лежат на цикле в parents."""
+    bad, done = set(), set()  # done — цепочка узла уже проверена
+    for start in changed:
+        path, on_path, cur = [], set(), start
+        while cur is not None and cur not in done and cur not in on_path:
+            path.append(cur)
+            on_path.add(cur)
+            cur = parents.get(cur)
+        if cur is not None and cur in on_path:  # вернулись в свой же путь — цикл
+            bad.update(n for n in path[path.index(cur):] if n in changed)
+        done.update(path)
+    return bad
+
+
+class EmployeeImport:
+    def __init__(self, db):
+        self.db = db
+        self.errors: list[ImportRowError] = []
+        self.error_count = 0
+        self.rows = self.created = self.updated = self.managers_linked = 0
+        self.ref_to_email: dict[str, str] = {}
+        self.seen_emails: dict[str, int] = {}
+        self.manager_refs: list[tuple[int, str, str | None]] = []  # (номер, email, ref руководителя)
+        self.columns: list[str] = []  # колонки employees, которые есть в файле
+        self.rebuild = False  # смен руководителя много — closure table пересобирается целиком
+
+    def _error(self, row: int, message: str, field: str | None = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append(ImportRowError(row=row, field=field, message=message))
+
+    async def run(self, fileobj: BinaryIO, filename: str | None) -> EmployeeImportResult:
+        present, ignored, records = await run_in_threadpool(read_rows, fileobj, filename)
+        self.columns = [f for f in EMPLOYEE_FIELDS if f in present] + ["search_text"]
+
+        batches = _validated_batches(records, settings.IMPORT_BATCH_SIZE)
+        while (item := await run_in_threadpool(next, batches, None)) is not None:
+            batch, errors = item
+            for err in errors:
+                self._error(err.row, err.message, err.field)
+            self.rows += len(batch) + len({e.row for e in errors})
+            await self._write_batch(batch)
+
+        if "manager" in present:
+            await self._link_managers()
+        if self.rebuild:
+            await self.db.run_sync(lambda s: rebuild_hierarchy(s.connection()))
+        elif self.created or self.updated:
+            await self.db.run_sync(lambda s: mark_org_reset(s.connection()))
+        await self.db.commit()
+
+        return EmployeeImportResult(
+            rows=self.rows,
+            created=self.created,
+            updated=self.updated,
+            managers_linked=self.managers_linked,
+            ignored_columns=ignored,
+            error_count=self.error_count,
+            errors=self.errors,
+        )
+
+    async def _write_batch(self, batch: list[tuple[int, EmployeeImportRow]]) -> None:
+        values = []
+        for number, row in batch:
+            if row.email in self.seen_emails:
+                self._error(number, f"Duplicate email (row {self.seen_emails[row.email]})", "email")
+                continue
+            self.seen_emails[row.email] = number
+            if row.ref:
+                self.ref_to_email[row.ref] = row.email
+            self.manager_refs.append((number, row.email, row.manager))
+
+            data = row.model_dump(include=set(EMPLOYEE_FIELDS))
+            data["search_text"] = build_search_text(row.name, row.email, row.title)
+            values.append(data)
+        if not values:
+            return
+
+        emails = [v["email"] for v in values]
+        existing = dict((await self.db.execute(
+            select(E.c.email, E.c.title).where(E.c.email.in_(emails))
+        )).all())
+        self.updated += len(existing)
+        self.created += len(values) - len(existing)
+        created_ids = []
+        for v in values:
+            if "title" not in self.columns and v["email"] in existing:
+                # title в файле нет и он не обновляется — search_text по текущему
+                v["search_text"] = build_search_text(v["name"], v["email"], existing[v["email"]])
+            # новым — id на стороне Python (для существующих в UPDATE не попадает)
+            v["id"] = uuid.uuid4()
+            if v["email"] not in existing:
+                created_ids.append(v["id"])
+
+        await self.db.execute(_upsert_stmt(self.columns), values)
+        await self.db.run_sync(lambda s: add_nodes(s.connection(), created_ids))
+
+    async def _resolve(self, emails: set[str], ids: set[uuid.UUID]) -> tuple[dict, set]:
+        by_email, known_ids = {}, set()
+        size = settings.IMPORT_BATCH_SIZE
+        emails_list, ids_list = list(emails), list(ids)
+        for i in range(0, len(emails_list), size):
+            chunk = emails_list[i:i + size]
+            by_email.update((await self.db.execute(select(E.c.email, E.c.id).where(E.c.email.in_(chunk)))).all())
+        for i in range(0, len(ids_list), size):
+            chunk = ids_list[i:i + size]
+            known_ids.update((await self.db.scalars(select(E.c.id).where(E.c.id.in_(chunk)))).all())
+        return by_email, known_ids
+
+    async def _managers(self, ids: set[uuid.UUID]) -> dict:
+        """Текущий manager_id сотрудников ids (только их, не всей таблицы)."""
+        parents, ids_list, size = {}, list(ids), settings.IMPORT_BATCH_SIZE
+        for i in range(0, len(ids_list), size):
+            chunk = ids_list[i:i + size]
+            parents.update((await self.db.execute(select(E.c.id, E.c.manager_id).where(E.c.id.in_(chunk)))).all())
+        return parents
+
+    def _manager_target(self, number: int, ref: str) -> tuple[str, Any] | None:
+        """('email', e) | ('id', uuid) для ссылки на руководителя; None — ошибка уже записана."""
+        if ref in self.ref_to_email:
+            return "email", self.ref_to_email[ref]
+        if "@" in ref:
+            try:
+                return "email", normalize_email(ref)
+            except ValueError:
+                self._error(number, f"Invalid manager email: {ref}", "manager")
+                return None
+        try:
+            return "id", uuid.UUID(ref)
+        except ValueError:
+            self._error(number, f"Unknown manager reference: {ref}", "manager")
+            return None
+
+    async def _link_managers(self) -> None:
+        targets = []
+        emails, ids = set(), set()
+        for number, email, ref in self.manager_refs:
+            target = self._manager_target(number, ref) if ref else None
+            if ref and target is None:
+                continue
+            targets.append((number, email, target))
+            emails.add(email)
+            if target:
+                (emails if target[0] == "email" else ids).add(target[1])
+
+        by_email, known_ids = await self._resolve(emails, ids)
+        parents = await self._managers({by_email[email] for _, email, _ in targets})
+
+        changed, rows_by_id = {}, {}
+        for number, email, target in targets:
+            node = by_email[email]
+            manager_id = None
+            if target is not None:
+                kind, value = target
+                manager_id = by_email.get(value) if kind == "email" else (value if value in known_ids else None)
+                if manager_id is None:
+                    self._error(number, f"Manager not found: {value}", "manager")
+                    continue
+                if manager_id == node:
+                    self._error(number, "Employee cannot be their own manager", "manager")
+                    continue
+            if parents.get(node) != manager_id:
+                changed[node] = manager_id
+                rows_by_id[node] = number
+
+        if len(changed) > settings.IMPORT_HIERARCHY_REBUILD_AT:
+            rejected = await self._reject_cycles_in_memory(changed, rows_by_id)
+            self.rebuild = True
+        else:
+            # по одному в порядке файла: проверка цикла видит уже перевешенные поддеревья
+            rejected = await self.db.run_sync(lambda s: _move_subtrees(s.connection(), changed))
+        for node in rejected:
+            self._error(rows_by_id[node], "Manager would create a cycle in the org chart", "manager")
+            del changed[node]
+
+        if changed:
+            stmt = update(E).where(E.c.id == bindparam("b_id")).values(manager_id=bindparam("b_manager_id"))
+            await self.db.execute(stmt, [{"b_id": k, "b_manager_id": v} for k, v in changed.items()])
+        self.managers_linked = len(changed)
+
+    async def _reject_cycles_in_memory(self, changed: dict, rows_by_id: dict) -> list:
+        """Большой импорт: циклы на итоговой структуре всей таблицы, замыкающие смены — по одной."""
+        parents = dict((await self.db.execute(select(E.c.id, E.c.manager_id))).all())
+        proposed, pending, rejected = {**parents, **changed}, dict(changed), []
+        while bad := _find_cycles(proposed, pending):
+            node = min(bad, key=rows_by_id.__getitem__)
+            rejected.append(node)
+            del pending[node]
+            proposed[node] = parents.get(node)
+        return rejected
+
+
+def _move_subtrees(connection, changed: dict) -> list:
+    """move_subtree для каждой смены руководителя; вернуть узлы, где получился бы цикл."""
+    rejected = []
+    for node, manager_id in changed.items():
+        try:
+            move_subtree(connection, node, manager_id)
+        except HierarchyCycleError:
+            rejected.append(node)
+    return rejected
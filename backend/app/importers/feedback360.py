@@ -0,0 +1,110 @@
+# app/importers/feedback360.py
+"""
+Загрузка анкеты 360° сотрудника (тот же формат, что разбирает parse360Excel во фронте).
+
+Строка заголовка — первая, где встречается «Компетенция»; колонки групп ищутся по
+подстрокам (коллег / подчин / руковод / само). Дальше: строка с текстом и без баллов —
+новая компетенция, строка с баллами — вопрос текущей компетенции.
+
+Лист читается построчно (openpyxl read_only) в threadpool и пишется пачками;
+прежние ответы сотрудника за тот же цикл заменяются целиком.
+"""
+from __future__ import annotations
+
+import re
+import uuid
+from typing import Any, BinaryIO, Iterator
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core import feedback360 as aggregates
+from app.core.config import settings
+from app.importers.tabular import cell, table_rows
+from app.models.feedback360 import T
+
+_COMPETENCY = re.compile(r"компетенц|competenc", re.I)
+# группа -> колонка модели (self — зарезервированное имя атрибута, там self_)
+_GROUP_HEADERS = [
+    ("peers", re.compile(r"коллег|peer", re.I)),
+    ("reports", re.compile(r"подчин|report", re.I)),
+    ("manager", re.compile(r"руковод|manager", re.I)),
+    ("self", re.compile(r"само|self", re.I)),
+]
+
+
+def _score(value: Any) -> float | None:
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = cell(value)
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def parse_rows(rows: Iterator[list[Any]]) -> Iterator[dict]:
+    """Вопросы анкеты: {competency, question, position, peers, reports, manager, self}."""
+    header = None
+    for row in rows:
+        if any(_COMPETENCY.search(str(c or "")) for c in row):
+            header = [str(c or "").strip() for c in row]
+            break
+    if header is None:
+        raise HTTPException(status_code=400, detail="Header row with 'Компетенция' not found")
+
+    idx_c = next(i for i, h in enumerate(header) if _COMPETENCY.search(h))
+    columns = {}
+    for group, pattern in _GROUP_HEADERS:
+        idx = next((i for i, h in enumerate(header) if i != idx_c and pattern.search(h)), None)
+        if idx is not None:
+            columns[group] = idx
+
+    competency, position, in_competency = None, 0, 0
+    for row in rows:
+        text = cell(row[idx_c]) if idx_c < len(row) else None
+        scores = {g: _score(row[i]) if i < len(row) else None for g, i in columns.items()}
+        has_scores = any(v is not None for v in scores.values())
+        if text and not has_scores:
+            competency, in_competency = text, 0
+        elif competency and (text or has_scores):
+            in_competency += 1
+            position += 1
+            yield {
+                "competency": competency,
+                "question": text or f"Вопрос {in_competency}",
+                "position": position,
+                **{g: scores.get(g) for g, _ in _GROUP_HEADERS},
+            }
+
+
+def _batches(questions: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for q in questions:
+        batch.append(q)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ingest(db, employee_id: uuid.UUID, cycle: str, fileobj: BinaryIO, filename: str | None) -> dict:
+    rows = await run_in_threadpool(table_rows, fileobj, filename)
+    batches = _batches(parse_rows(rows), settings.IMPORT_BATCH_SIZE)
+
+    await db.execute(delete(T).where(T.c.employee_id == employee_id, T.c.cycle == cycle))
+    questions, competencies = 0, set()
+    while (batch := await run_in_threadpool(next, batches, None)) is not None:
+        await db.execute(insert(T), [
+            {**q, "employee_id": employee_id, "cycle": cycle} for q in batch
+        ])
+        questions += len(batch)
+        competencies.update(q["competency"] for q in batch)
+    await db.commit()
+
+    aggregates.invalidate(employee_id, cycle)
+    return {"employee_id": employee_id, "cycle": cycle, "competencies": len(competencies), "questions": questions}
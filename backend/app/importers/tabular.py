@@ -0,0 +1,64 @@
+# app/importers/tabular.py
+"""Построчное чтение загруженных таблиц (CSV / XLSX) для импортёров."""
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from typing import Any, BinaryIO, Iterator
+
+from fastapi import HTTPException
+
+
+def cell(value: Any) -> str | None:
+    """Значение ячейки строкой (даты — ISO, 3.0 -> "3"); пустая — None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def csv_rows(fileobj: BinaryIO) -> Iterator[list[Any]]:
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        first = text.readline()
+        # Excel в ru-локали сохраняет CSV через «;»
+        delimiter = ";" if first.count(";") > first.count(",") else ","
+        yield next(csv.reader([first], delimiter=delimiter), [])
+        yield from csv.reader(text, delimiter=delimiter)
+    finally:
+        with contextlib.suppress(ValueError):  # уже закрыт
+            text.detach()  # файл закрывает владелец (UploadFile)
+
+
+def xlsx_rows(fileobj: BinaryIO) -> Iterator[list[Any]]:
+    """Первый лист, read_only: openpyxl не держит весь лист в памяти."""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise HTTPException(status_code=415, detail="XLSX import requires openpyxl")
+    try:
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):  # KeyError — zip без частей книги
+        raise HTTPException(status_code=400, detail="File is not a valid XLSX workbook")
+    try:
+        for row in wb.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+
+def table_rows(fileobj: BinaryIO, filename: str | None) -> Iterator[list[Any]]:
+    """Строки файла по расширению: .xlsx/.xlsm — openpyxl, остальное — CSV (UTF-8)."""
+    if (filename or "").lower().endswith((".xlsx", ".xlsm")):
+        return xlsx_rows(fileobj)
+    return csv_rows(fileobj)
@@ -1,11 +1,14 @@
 # app/main.py
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 
 
+from app.core import cache, metrics, profiling, querybudget
+from app.core.security import principal_from_header
 from app.core.config import settings
+from app.core.media import MediaFiles
 from app.api.v1 import auth as auth_router
 from app.api.v1 import employees as employees_router
 from app.api.v1 import roles as roles_router
@@ -13,18 +16,22 @@ from app.api.v1 import succession as succession_router
 from app.api.v1 import vacancies as vacancies_router
 from app.api.v1 import org as org_router
 from app.api.v1 import files as files_router
+from app.api.v1 import feedback360 as feedback360_router
 
+import functools
+import hmac
+import ipaddress
 import os
 import time
-from sqlalchemy import text
 from app.core.db import engine
+from app.db.session import engine as async_engine
+from app.models.hierarchy import HierarchyCycleError
 
 app = FastAPI(title=settings.APP_NAME)
 
 # ── Static /media
-media_dir = os.environ.get("MEDIA_DIR", "/app/media")
-os.makedirs(media_dir, exist_ok=True)
-app.mount("/media", StaticFiles(directory=media_dir), name="media")
+os.makedirs(settings.MEDIA_DIR, exist_ok=True)
+app.mount("/media", MediaFiles(directory=settings.MEDIA_DIR), name="media")
 
 # ── CORS
 app.add_middleware(
@@ -35,17 +42,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ── Лёгкий access-лог для долгих запросов
+async def _is_admin(request: Request) -> bool:
+    principal = await principal_from_header(request.headers.get("authorization"))
+    return principal is not None and principal.role == "admin"
+
+# ── Лёгкий access-лог для долгих запросов + метрики по маршрутам (/metrics) + профили (profiling.py)
 @app.middleware("http")
 async def access_log(request: Request, call_next):
+    method = request.method
+    route = metrics.route_template(app.router.routes, request.scope)
+    token = metrics.current_route.set(route)
+    queries, queries_token = querybudget.request_counter()
+    metrics.HTTP_IN_FLIGHT.inc(method, route)
+    profile = None
+    status = 500
     t0 = time.perf_counter()
     try:
+        if request.headers.get(profiling.PROFILE_HEADER) == "1":
+            if await _is_admin(request):
+                profile = profiling.start()
+        elif profiling.sampled():
+            profile = profiling.start()
         response = await call_next(request)
+        status = response.status_code
+        if settings.QUERY_COUNT_HEADER:
+            response.headers[querybudget.HEADER] = str(queries.count)
+        if profile is not None:
+            profiling.stop(profile)
+            response.headers["X-Profile-File"] = await run_in_threadpool(
+                profiling.save, profile, method, route, time.perf_counter() - t0
+            )
+            profile = None
         return response
     finally:
-        dt = (time.perf_counter() - t0) * 1000
-        if dt > 300:
-            print(f"[ACCESS] {request.method} {request.url.path} -> {int(dt)} ms")
+        if profile is not None:  # упали до ответа — профиль не нужен, но профилировщик снять
+            profiling.stop(profile)
+        elapsed = time.perf_counter() - t0
+        metrics.HTTP_IN_FLIGHT.dec(method, route)
+        metrics.HTTP_REQUESTS.inc(method, route, str(status))
+        metrics.HTTP_LATENCY.observe(method, route, value=elapsed)
+        metrics.current_route.reset(token)
+        querybudget.reset(queries_token)
+        if elapsed > 0.3:
+            print(f"[ACCESS] {method} {request.url.path} -> {int(elapsed * 1000)} ms")
+
+# ── Цикл в оргструктуре (manager_id внутри собственного поддерева) — это конфликт данных
+@app.exception_handler(HierarchyCycleError)
+async def hierarchy_cycle_handler(request: Request, exc: HierarchyCycleError):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
 
 # ── Health
 @app.get("/health")
@@ -57,13 +101,54 @@ def healthz():
     # alias под привычное имя
     return {"status": "ok", "env": settings.ENV}
 
+@functools.lru_cache(maxsize=4)
+def _metrics_networks(raw: str) -> tuple:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in raw.split(",") if item.strip())
+
+_metrics_networks(settings.METRICS_ALLOW_IPS)  # опечатка в allowlist — ошибка на старте, а не 500 на scrape
+
+def _metrics_allowed(request: Request) -> bool:
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(request.headers.get("authorization", "").encode(), f"Bearer {token}".encode()):
+        return True
+    try:
+        ip = ipaddress.ip_address(request.client.host if request.client else "")
+    except ValueError:
+        return False
+    return any(ip in net for net in _metrics_networks(settings.METRICS_ALLOW_IPS))
+
+_NOT_FOUND = {"detail": "Not Found"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    # scrape Prometheus: токен или адрес из allowlist, остальным — 404 (эндпоинт не светится)
+    if not _metrics_allowed(request):
+        return JSONResponse(status_code=404, content=_NOT_FOUND)
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/cachez", include_in_schema=False)
+def cachez(request: Request):
+    # счётчики per-process кэшей (hits/misses/evictions) этого воркера; доступ — как у /metrics
+    if not _metrics_allowed(request):
+        return JSONResponse(status_code=404, content=_NOT_FOUND)
+    return {name: c.stats() for name, c in sorted(cache.registry.items())}
+
+def _ping_sync_db():
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET LOCAL statement_timeout = 3000")
+        conn.exec_driver_sql("SELECT 1")
+
 @app.get("/dbz")
-def dbz():
+async def dbz():
     try:
-        with engine.connect() as conn:
-            conn.exec_driver_sql("SET LOCAL statement_timeout = 3000")
-            conn.exec_driver_sql("SELECT 1")
-        return {"db": "ok"}
+        # проверяем тот движок, которым реально ходят роутеры
+        if async_engine is not None:
+            async with async_engine.connect() as conn:
+                await conn.exec_driver_sql("SET LOCAL statement_timeout = 3000")
+                await conn.exec_driver_sql("SELECT 1")
+        else:
+            await run_in_threadpool(_ping_sync_db)
+        return {"db": "ok", "mode": "async" if async_engine is not None else "sync"}
     except Exception as e:
         print("[DBZ ERROR]", repr(e))
         return JSONResponse(status_code=503, content={"db": "down", "error": str(e)[:200]})
@@ -76,3 +161,4 @@ app.include_router(succession_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(vacancies_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(org_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(files_router.router, prefix=settings.API_V1_PREFIX)
+app.include_router(feedback360_router.router, prefix=settings.API_V1_PREFIX)
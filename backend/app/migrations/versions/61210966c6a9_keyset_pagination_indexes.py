@@ -0,0 +1,35 @@
+"""keyset pagination indexes
+
+Revision ID: 61210966c6a9
+Revises: 462ef0cf717f
+Create Date: 2026-10-18 18:20:11.402115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61210966c6a9'
+down_revision: Union[str, None] = '462ef0cf717f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # составные индексы под ORDER BY keyset-пагинации (app/core/pagination.py)
+    op.create_index('ix_employees_name_id', 'employees', ['name', 'id'], unique=False)
+    op.create_index('ix_roles_name_version_id', 'roles', ['name', sa.text('version DESC'), 'id'], unique=False)
+    op.create_index('ix_assessments_employee_date_id', 'assessments', ['employee_id', 'date', 'id'], unique=False)
+    op.create_index('ix_succession_created_at_id', 'succession', ['created_at', 'id'], unique=False)
+    op.create_index('ix_vacancies_created_at_id', 'vacancies', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacancies_created_at_id', table_name='vacancies')
+    op.drop_index('ix_succession_created_at_id', table_name='succession')
+    op.drop_index('ix_assessments_employee_date_id', table_name='assessments')
+    op.drop_index('ix_roles_name_version_id', table_name='roles')
+    op.drop_index('ix_employees_name_id', table_name='employees')
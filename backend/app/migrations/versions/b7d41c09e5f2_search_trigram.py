@@ -0,0 +1,58 @@
+"""search trigram
+
+Revision ID: b7d41c09e5f2
+Revises: 61210966c6a9
+Create Date: 2026-10-18 18:41:27.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c09e5f2'
+down_revision: Union[str, None] = '61210966c6a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# копия app.core.search._FOLD_FROM/_FOLD_TO: строчные двойники латиницы и ё -> e
+FOLD_FROM = "ёаеорсух"
+FOLD_TO = "eaeopcyx"
+
+
+def sql_normalize(expr):
+    # то же, что app.core.search.normalize: lower, двойники, схлопнутые пробелы
+    return sa.func.btrim(sa.func.regexp_replace(
+        sa.func.translate(sa.func.lower(expr), FOLD_FROM, FOLD_TO), "[[:space:]]+", " ", "g",
+    ))
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('employees', sa.Column('search_text', sa.Text(), server_default='', nullable=False))
+    op.add_column('roles', sa.Column('search_text', sa.Text(), server_default='', nullable=False))
+
+    # бэкфилл той же нормализацией, что и app.core.search.normalize
+    employees = sa.table('employees', sa.column('name'), sa.column('email'), sa.column('title'), sa.column('search_text'))
+    op.execute(employees.update().values(search_text=sql_normalize(
+        sa.func.concat_ws(' ', employees.c.name, employees.c.email, employees.c.title)
+    )))
+    roles = sa.table('roles', sa.column('name'), sa.column('goal'), sa.column('search_text'))
+    op.execute(roles.update().values(search_text=sql_normalize(
+        sa.func.concat_ws(' ', roles.c.name, roles.c.goal)
+    )))
+
+    op.create_index('ix_employees_search_trgm', 'employees', ['search_text'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+    op.create_index('ix_roles_search_trgm', 'roles', ['search_text'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_roles_search_trgm', table_name='roles')
+    op.drop_index('ix_employees_search_trgm', table_name='employees')
+    op.drop_column('roles', 'search_text')
+    op.drop_column('employees', 'search_text')
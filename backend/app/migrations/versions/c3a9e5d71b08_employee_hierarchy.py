@@ -0,0 +1,49 @@
+"""employee hierarchy closure table
+
+Revision ID: c3a9e5d71b08
+Revises: b7d41c09e5f2
+Create Date: 2026-10-18 19:02:43.560371
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e5d71b08'
+down_revision: Union[str, None] = 'b7d41c09e5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('employee_hierarchy',
+    sa.Column('ancestor_id', sa.UUID(), nullable=False),
+    sa.Column('descendant_id', sa.UUID(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index(op.f('ix_employee_hierarchy_descendant_id'), 'employee_hierarchy', ['descendant_id'], unique=False)
+
+    # заполняем из текущих manager_id; depth < 64 не даёт циклу в старых данных зациклить CTE
+    # (тогда миграция упадёт на PK — цикл нужно разорвать руками)
+    op.execute("""
+        WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM employees
+            UNION ALL
+            SELECT t.ancestor_id, e.id, t.depth + 1
+            FROM tree t JOIN employees e ON e.manager_id = t.descendant_id
+            WHERE t.depth < 64
+        )
+        INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_employee_hierarchy_descendant_id'), table_name='employee_hierarchy')
+    op.drop_table('employee_hierarchy')
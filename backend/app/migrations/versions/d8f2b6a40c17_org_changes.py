@@ -0,0 +1,36 @@
+"""org changes log
+
+Revision ID: d8f2b6a40c17
+Revises: c3a9e5d71b08
+Create Date: 2026-10-18 19:31:05.274419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b6a40c17'
+down_revision: Union[str, None] = 'c3a9e5d71b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('org_changes',
+    sa.Column('version', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('employee_id', sa.UUID(), nullable=True),
+    sa.Column('manager_id', sa.UUID(), nullable=True),
+    sa.Column('prev_manager_id', sa.UUID(), nullable=True),
+    sa.Column('op', sa.String(length=16), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('version')
+    )
+    # стартовая версия: всё, что было до журнала, — один «reset»
+    op.execute("INSERT INTO org_changes (op) VALUES ('reset')")
+
+
+def downgrade() -> None:
+    op.drop_table('org_changes')
@@ -0,0 +1,42 @@
+"""feedback360 scores
+
+Revision ID: e5c1a7f39b24
+Revises: d8f2b6a40c17
+Create Date: 2026-10-18 21:04:12.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c1a7f39b24'
+down_revision: Union[str, None] = 'd8f2b6a40c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('feedback360_scores',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('employee_id', sa.UUID(), nullable=False),
+    sa.Column('cycle', sa.String(length=32), nullable=False),
+    sa.Column('competency', sa.String(length=255), nullable=False),
+    sa.Column('question', sa.String(length=1000), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('peers', sa.Float(), nullable=True),
+    sa.Column('reports', sa.Float(), nullable=True),
+    sa.Column('manager', sa.Float(), nullable=True),
+    sa.Column('self', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_feedback360_employee_cycle', 'feedback360_scores', ['employee_id', 'cycle'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feedback360_employee_cycle', table_name='feedback360_scores')
+    op.drop_table('feedback360_scores')
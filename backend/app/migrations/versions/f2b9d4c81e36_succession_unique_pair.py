@@ -0,0 +1,42 @@
+"""succession unique (employee_id, target_role)
+
+Revision ID: f2b9d4c81e36
+Revises: e5c1a7f39b24
+Create Date: 2026-10-18 22:37:51.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b9d4c81e36'
+down_revision: Union[str, None] = 'e5c1a7f39b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # дубли пары от гонок toggle: оставляем отмеченную звездой, затем самую свежую
+    op.execute(sa.text("""
+        DELETE FROM succession WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY employee_id, target_role
+                    ORDER BY is_starred DESC, created_at DESC, id DESC
+                ) AS rn
+                FROM succession
+            ) ranked
+            WHERE rn > 1
+        )
+    """))
+    op.create_index('ux_succession_employee_role', 'succession', ['employee_id', 'target_role'], unique=True)
+    # покрывается префиксом уникального индекса
+    op.drop_index('ix_succession_employee_id', table_name='succession')
+
+
+def downgrade() -> None:
+    op.create_index('ix_succession_employee_id', 'succession', ['employee_id'], unique=False)
+    op.drop_index('ux_succession_employee_role', table_name='succession')
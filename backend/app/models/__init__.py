@@ -8,3 +8,6 @@ from .review import Review  # noqa
 from .career import CareerHistory  # noqa
 from .succession import Succession  # noqa
 from .vacancy import Vacancy  # noqa
+from .hierarchy import EmployeeHierarchy  # noqa
+from .org_change import OrgChange  # noqa
+from .feedback360 import Feedback360Score  # noqa
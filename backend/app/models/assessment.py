@@ -1,12 +1,15 @@
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import date, datetime
-from sqlalchemy import ForeignKey, Date, Numeric, String, JSON, DateTime
+from sqlalchemy import ForeignKey, Date, Numeric, String, JSON, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.db import Base
 
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_employee_date_id", "employee_id", "date", "id"),  # keyset-пагинация
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     employee_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), index=True)
     role_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("roles.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -3,14 +3,22 @@ import uuid
 from datetime import date
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, ForeignKey, JSON, Date, Integer
+from sqlalchemy import String, ForeignKey, JSON, Date, Integer, Index, Text, event
 from sqlalchemy.dialects.postgresql import UUID as PGUUID  # ← явный тип UUID под Postgres
 
 from app.core.db import Base
+from app.core.search import build_search_text
 
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_name_id", "name", "id"),  # keyset-пагинация
+        Index(
+            "ix_employees_search_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     # Явные UUID-типы + as_uuid=True для работы с python uuid.UUID
     id: Mapped[uuid.UUID] = mapped_column(
@@ -41,3 +49,12 @@ class Employee(Base):
 
     competencies: Mapped[dict] = mapped_column(JSON, default=dict)
     assessments_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # нормализованные name/email/title для поиска (app/core/search.py)
+    search_text: Mapped[str] = mapped_column(Text, default="")
+
+
+@event.listens_for(Employee, "before_insert")
+@event.listens_for(Employee, "before_update")
+def _employee_search_text(mapper, connection, target: Employee) -> None:
+    target.search_text = build_search_text(target.name, target.email, target.title)
@@ -0,0 +1,48 @@
+# app/models/feedback360.py
+"""
+Ответы 360°: одна строка на вопрос анкеты сотрудника в цикле оценки.
+
+Баллы групп оценщиков — отдельные числовые колонки (NULL — группа не оценивала),
+без JSON: средние по группам — это обычные AVG(...) GROUP BY по сотруднику /
+компетенции, сразу для всего подразделения (app/core/feedback360.py).
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+
+# группы оценщиков — как GROUP_LABELS во фронте
+GROUPS = ("peers", "reports", "manager", "self")
+
+
+class Feedback360Score(Base):
+    __tablename__ = "feedback360_scores"
+    __table_args__ = (
+        Index("ix_feedback360_employee_cycle", "employee_id", "cycle"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    employee_id: Mapped[uuid.UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("employees.id", ondelete="CASCADE"), nullable=False
+    )
+    cycle: Mapped[str] = mapped_column(String(32))  # период оценки, например "2025-H1"
+    competency: Mapped[str] = mapped_column(String(255))
+    question: Mapped[str] = mapped_column(String(1000))
+    position: Mapped[int] = mapped_column(Integer)  # порядок вопроса в анкете
+
+    peers: Mapped[float | None] = mapped_column(Float, nullable=True)
+    reports: Mapped[float | None] = mapped_column(Float, nullable=True)
+    manager: Mapped[float | None] = mapped_column(Float, nullable=True)
+    self_: Mapped[float | None] = mapped_column("self", Float, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+T = Feedback360Score.__table__
@@ -0,0 +1,187 @@
+# app/models/hierarchy.py
+"""
+Closure table над employees.manager_id.
+
+Для каждой пары (предок, потомок) одна строка с расстоянием depth, включая (X, X, 0).
+Тогда «все под X», «цепочка руководителей X», численность поддерева и уровень
+(CEO = 0, CEO-1 = 1 …) — это один запрос без рекурсии.
+
+Поддерживается ORM-событиями Employee (вставка / смена manager_id). Записи мимо ORM
+должны поддержать её сами: немного изменений — add_nodes для новых и move_subtree для
+смены руководителя (импорт), массовые (seed, большой импорт) — rebuild_hierarchy.
+"""
+import uuid
+
+from sqlalchemy import ForeignKey, Integer, event, select, delete, insert, literal, func, inspect, true
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+from app.models.employee import Employee
+from app.models.org_change import mark_org_reset
+
+# предел рекурсии при перестройке: цикл в данных не зациклит CTE (упадём на PK)
+MAX_DEPTH = 64
+
+
+class HierarchyCycleError(ValueError):
+    """manager_id замкнул бы цепочку руководителей в цикл."""
+
+
+class EmployeeHierarchy(Base):
+    __tablename__ = "employee_hierarchy"
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[uuid.UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+H = EmployeeHierarchy.__table__
+
+
+# --- запросы ---
+
+def subtree_stmt(root_id, max_depth: int | None = None, include_root: bool = False):
+    """(Employee, depth) всех подчинённых root_id, ближние первыми."""
+    stmt = (
+        select(Employee, EmployeeHierarchy.depth)
+        .join(EmployeeHierarchy, EmployeeHierarchy.descendant_id == Employee.id)
+        .where(EmployeeHierarchy.ancestor_id == root_id)
+    )
+    if not include_root:
+        stmt = stmt.where(EmployeeHierarchy.depth > 0)
+    if max_depth is not None:
+        stmt = stmt.where(EmployeeHierarchy.depth <= max_depth)
+    return stmt
+
+
+def ancestors_stmt(employee_id):
+    """(Employee, depth) руководителей employee_id от непосредственного до корня."""
+    return (
+        select(Employee, EmployeeHierarchy.depth)
+        .join(EmployeeHierarchy, EmployeeHierarchy.ancestor_id == Employee.id)
+        .where(EmployeeHierarchy.descendant_id == employee_id, EmployeeHierarchy.depth > 0)
+        .order_by(EmployeeHierarchy.depth)
+    )
+
+
+def headcounts_stmt(ids):
+    """(ancestor_id, численность поддерева без самого узла) для ids (список или подзапрос)."""
+    return (
+        select(EmployeeHierarchy.ancestor_id, func.count() - 1)
+        .where(EmployeeHierarchy.ancestor_id.in_(ids))
+        .group_by(EmployeeHierarchy.ancestor_id)
+    )
+
+
+def levels_stmt(ids):
+    """(descendant_id, уровень от корня: 0 — CEO, 1 — CEO-1 …) для ids."""
+    return (
+        select(EmployeeHierarchy.descendant_id, func.max(EmployeeHierarchy.depth))
+        .where(EmployeeHierarchy.descendant_id.in_(ids))
+        .group_by(EmployeeHierarchy.descendant_id)
+    )
+
+
+# --- поддержка ---
+
+def _link_under(connection, node_id, manager_id) -> None:
+    """Пришить поддерево node_id (его closure-строки уже есть) под manager_id."""
+    if manager_id is None:
+        return
+    sup, sub = H.alias("sup"), H.alias("sub")
+    connection.execute(
+        insert(H).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(sup.c.ancestor_id, sub.c.descendant_id, sup.c.depth + sub.c.depth + 1)
+            .select_from(sup.join(sub, true()))
+            .where(sup.c.descendant_id == manager_id, sub.c.ancestor_id == node_id),
+        )
+    )
+
+
+def _check_cycle(connection, node_id, manager_id) -> None:
+    if manager_id is None:
+        return
+    if manager_id == node_id or connection.scalar(
+        select(literal(1)).where(H.c.ancestor_id == node_id, H.c.descendant_id == manager_id)
+    ):
+        raise HierarchyCycleError(f"Employee {manager_id} is in the subtree of {node_id}")
+
+
+def _detach(connection, node_id) -> None:
+    """Отцепить поддерево node_id от прежних предков: пути (внешний предок -> узел поддерева)."""
+    inner = H.alias("sub_tree")
+    subtree = select(inner.c.descendant_id).where(inner.c.ancestor_id == node_id)
+    connection.execute(
+        delete(H).where(H.c.descendant_id.in_(subtree), H.c.ancestor_id.not_in(subtree))
+    )
+
+
+def add_nodes(connection, ids) -> None:
+    """Строки (X, X, 0) для сотрудников, вставленных мимо ORM; руководителя — move_subtree."""
+    if ids:
+        connection.execute(insert(H), [{"ancestor_id": i, "descendant_id": i, "depth": 0} for i in ids])
+
+
+def move_subtree(connection, node_id, manager_id) -> None:
+    """
+    Перевесить поддерево node_id под manager_id (None — в корни) в closure table;
+    employees.manager_id обновляет вызывающий. Цикл — HierarchyCycleError, ничего не тронуто.
+    """
+    _check_cycle(connection, node_id, manager_id)
+    _detach(connection, node_id)
+    _link_under(connection, node_id, manager_id)
+
+
+@event.listens_for(Employee, "before_insert")
+def _hierarchy_before_insert(mapper, connection, target: Employee) -> None:
+    if target.manager_id is not None and target.manager_id == target.id:
+        raise HierarchyCycleError("Employee cannot be their own manager")
+
+
+@event.listens_for(Employee, "after_insert")
+def _hierarchy_after_insert(mapper, connection, target: Employee) -> None:
+    connection.execute(insert(H).values(ancestor_id=target.id, descendant_id=target.id, depth=0))
+    _link_under(connection, target.id, target.manager_id)
+
+
+@event.listens_for(Employee, "before_update")
+def _hierarchy_before_update(mapper, connection, target: Employee) -> None:
+    if inspect(target).attrs.manager_id.history.has_changes():
+        _check_cycle(connection, target.id, target.manager_id)
+
+
+@event.listens_for(Employee, "after_update")
+def _hierarchy_after_update(mapper, connection, target: Employee) -> None:
+    if not inspect(target).attrs.manager_id.history.has_changes():
+        return
+    _detach(connection, target.id)
+    _link_under(connection, target.id, target.manager_id)
+
+
+def rebuild_hierarchy(connection) -> int:
+    """
+    Пересобрать closure table целиком из employees.manager_id (recursive CTE).
+    Заодно сбрасывает версию оргструктуры: массовая запись прошла мимо ORM-журнала.
+    """
+    e = Employee.__table__
+    base = select(
+        e.c.id.label("ancestor_id"), e.c.id.label("descendant_id"), literal(0).label("depth")
+    ).cte("tree", recursive=True)
+    child = e.alias("child")
+    tree = base.union_all(
+        select(base.c.ancestor_id, child.c.id, base.c.depth + 1)
+        .join(child, child.c.manager_id == base.c.descendant_id)
+        .where(base.c.depth < MAX_DEPTH)
+    )
+    connection.execute(delete(H))
+    result = connection.execute(
+        insert(H).from_select(["ancestor_id", "descendant_id", "depth"], select(tree))
+    )
+    mark_org_reset(connection)
+    return result.rowcount
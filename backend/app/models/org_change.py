@@ -0,0 +1,117 @@
+# app/models/org_change.py
+"""
+Журнал изменений оргструктуры: версия = max(org_changes.version).
+
+Запись Employee через ORM добавляет строку (ORM-события ниже), если поменялось что-то из
+TRACKED — то, что видно в /org/tree или в матрице компетенций; bio, контакты, аватар версию
+не двигают. Версия общая для всех воркеров, по ней же считается дельта
+`GET /org/tree?since=<version>` (changes_since). Массовые записи мимо ORM отмечаются строкой
+с op="reset" (mark_org_reset) — дельта через такую версию невозможна, клиент получает полный снимок.
+
+Журнал не растёт без предела: mark_org_reset удаляет всё до себя, а каждая
+ORG_CHANGES_KEEP-я версия удаляет строки старше последних ORG_CHANGES_KEEP.
+since, чьей строки уже нет, — тоже полный снимок.
+"""
+from datetime import datetime
+import uuid
+
+from sqlalchemy import BigInteger, Integer, String, DateTime, delete, event, insert, inspect, select, func
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.config import settings
+from app.core.db import Base
+from app.models.employee import Employee
+
+
+class OrgChange(Base):
+    __tablename__ = "org_changes"
+
+    # BIGSERIAL в Postgres; в SQLite автоинкремент бывает только у INTEGER PRIMARY KEY
+    version: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    employee_id: Mapped[uuid.UUID | None] = mapped_column(PGUUID(as_uuid=True), nullable=True)
+    manager_id: Mapped[uuid.UUID | None] = mapped_column(PGUUID(as_uuid=True), nullable=True)
+    prev_manager_id: Mapped[uuid.UUID | None] = mapped_column(PGUUID(as_uuid=True), nullable=True)
+    op: Mapped[str] = mapped_column(String(16))  # upsert|delete|reset
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+T = OrgChange.__table__
+
+# поля Employee, изменение которых пишется в журнал: узел /org/tree и матрица app/core/matching.py
+TRACKED = ("manager_id", "name", "title", "department", "unit", "competencies")
+
+
+def current_version_stmt():
+    return select(func.coalesce(func.max(OrgChange.version), 0))
+
+
+def changes_since_stmt(since: int, limit: int):
+    """Строка since и до limit + 1 следующих: по первой видно, не обрезан ли журнал."""
+    return (
+        select(OrgChange.version, OrgChange.employee_id, OrgChange.manager_id, OrgChange.prev_manager_id, OrgChange.op)
+        .where(OrgChange.version >= since)
+        .order_by(OrgChange.version)
+        .limit(limit + 2)
+    )
+
+
+async def changes_since(db, since: int, limit: int | None = None):
+    """
+    Изменения после версии since или None, если дельту считать нельзя или невыгодно:
+    строки since в журнале нет (since=0, чужая версия, удалена ретеншеном), после неё
+    был reset или изменений больше limit (ORG_DELTA_MAX_CHANGES) — тогда полная сборка.
+    """
+    limit = settings.ORG_DELTA_MAX_CHANGES if limit is None else limit
+    rows = (await db.execute(changes_since_stmt(since, limit))).all()
+    if not rows or rows[0].version != since:
+        return None
+    changes = rows[1:]
+    if len(changes) > limit or any(row.op == "reset" for row in changes):
+        return None
+    return changes
+
+
+def _trim(connection, version: int) -> None:
+    keep = settings.ORG_CHANGES_KEEP
+    if keep and version % keep == 0:
+        connection.execute(delete(T).where(T.c.version <= version - keep))
+
+
+def _log(connection, **values) -> None:
+    version = connection.execute(insert(T).values(**values)).inserted_primary_key[0]
+    _trim(connection, version)
+
+
+def mark_org_reset(connection) -> None:
+    """Отметить массовое изменение employees (seed, импорт): снимки и дельты — заново."""
+    version = connection.execute(insert(T).values(op="reset")).inserted_primary_key[0]
+    # дельта через reset невозможна — всё до него больше не нужно
+    connection.execute(delete(T).where(T.c.version < version))
+
+
+@event.listens_for(Employee, "after_insert")
+def _org_change_insert(mapper, connection, target: Employee) -> None:
+    _log(connection, employee_id=target.id, manager_id=target.manager_id, op="upsert")
+
+
+@event.listens_for(Employee, "after_update")
+def _org_change_update(mapper, connection, target: Employee) -> None:
+    attrs = inspect(target).attrs
+    if not any(attrs[name].history.has_changes() for name in TRACKED):
+        return
+    deleted = attrs.manager_id.history.deleted
+    _log(
+        connection,
+        employee_id=target.id,
+        manager_id=target.manager_id,
+        prev_manager_id=deleted[0] if deleted else target.manager_id,
+        op="upsert",
+    )
+
+
+@event.listens_for(Employee, "after_delete")
+def _org_change_delete(mapper, connection, target: Employee) -> None:
+    _log(connection, employee_id=target.id, prev_manager_id=target.manager_id, op="delete")
@@ -1,9 +1,10 @@
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
-from sqlalchemy import String, Text, JSON, Integer, Enum, DateTime
+from sqlalchemy import String, Text, JSON, Integer, Enum, DateTime, Index, text, event
 from sqlalchemy.sql import func
 from app.core.db import Base
+from app.core.search import build_search_text
 import enum
 
 class RoleStatus(str, enum.Enum):
@@ -13,6 +14,13 @@ class RoleStatus(str, enum.Enum):
 
 class Role(Base):
     __tablename__ = "roles"
+    __table_args__ = (
+        Index("ix_roles_name_version_id", "name", text("version DESC"), "id"),  # keyset-пагинация
+        Index(
+            "ix_roles_search_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), index=True)
     version: Mapped[int] = mapped_column(Integer, default=1)
@@ -27,4 +35,12 @@ class Role(Base):
     assessment_center: Mapped[dict] = mapped_column(JSON, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # нормализованные name/goal для поиска (app/core/search.py)
+    search_text: Mapped[str] = mapped_column(Text, default="")
+
+
+@event.listens_for(Role, "before_insert")
+@event.listens_for(Role, "before_update")
+def _role_search_text(mapper, connection, target: Role) -> None:
+    target.search_text = build_search_text(target.name, target.goal)
 
@@ -1,13 +1,18 @@
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, Boolean, String, Text, DateTime
+from sqlalchemy import ForeignKey, Boolean, String, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.db import Base
 
 class Succession(Base):
     __tablename__ = "succession"
+    __table_args__ = (
+        Index("ix_succession_created_at_id", "created_at", "id"),  # keyset-пагинация
+        # одна запись на пару: ON CONFLICT в /succession/toggle и /bulk; покрывает и поиск по employee_id
+        Index("ux_succession_employee_role", "employee_id", "target_role", unique=True),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    employee_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), index=True)
+    employee_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"))
     target_role: Mapped[uuid.UUID] = mapped_column(ForeignKey("roles.id", ondelete="CASCADE"), index=True)
     is_starred: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     notes: Mapped[str] = mapped_column(Text, default="")
@@ -1,7 +1,7 @@
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, Text, Integer, Enum, DateTime
+from sqlalchemy import ForeignKey, String, Text, Integer, Enum, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.db import Base
 import enum
@@ -13,6 +13,9 @@ class VacancyStatus(str, enum.Enum):
 
 class Vacancy(Base):
     __tablename__ = "vacancies"
+    __table_args__ = (
+        Index("ix_vacancies_created_at_id", "created_at", "id"),  # keyset-пагинация
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     role_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("roles.id", ondelete="CASCADE"), index=True)
     department: Mapped[str] = mapped_column(String(255), index=True, default="")
@@ -0,0 +1,160 @@
+# app/reports/context.py
+"""
+Данные для шаблонов PDF — только простые dict/list/str/числа/date: они уходят в процесс
+пула (pickle) и в ключ кэша (orjson), поэтому ORM-объектов тут нет.
+
+ИПР собирается пачкой: для одного сотрудника и для всего подразделения — одно и то же
+фиксированное число запросов (сотрудники, руководители, «звёзды» преемственности,
+эталоны текущих должностей, 360°), без запросов на каждого.
+"""
+from __future__ import annotations
+
+import calendar
+import uuid
+from datetime import date
+from typing import Any, Sequence
+
+from sqlalchemy import func, select
+
+from app.core import feedback360 as aggregates
+from app.models.employee import Employee
+from app.models.feedback360 import Feedback360Score
+from app.models.role import Role
+from app.models.succession import Succession
+
+# разрыв (уровней) -> рекомендованная активность и срок, мес.
+ACTIVITIES = {
+    1: ("Практика в текущих задачах с регулярной обратной связью руководителя", 3),
+    2: ("Курс / тренинг и рабочий проект с наставником", 6),
+    3: ("Программа развития: наставник, ротация или стажировка в целевой роли", 12),
+}
+
+ROLE_FIELDS = (
+    "name", "division", "version", "status", "goal", "responsibilities", "kpi", "competency_map",
+    "assessment_guidelines", "test_assignment", "assessment_center", "updated_at",
+)
+
+
+def _level(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value > 0 else 0.0
+
+
+def _plain(value: float) -> int | float:
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+def _add_months(d: date, months: int) -> date:
+    month = d.month - 1 + months
+    year, month = d.year + month // 12, month % 12 + 1
+    return d.replace(year=year, month=month, day=min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def competency_gaps(have: dict | None, need: dict | None, today: date) -> tuple[int, list[dict]]:
+    """(процент соответствия как matchPercent во фронте, строки разрыва по эталону роли)."""
+    have = have or {}
+    rows, matched, total = [], 0.0, 0.0
+    for name, raw in (need or {}).items():
+        n, h = _level(raw), _level(have.get(name))
+        if not n:
+            continue
+        matched += min(h, n)
+        total += n
+        gap = max(n - h, 0.0)
+        row = {"competency": name, "need": _plain(n), "have": _plain(h), "gap": _plain(gap)}
+        if gap > 0:
+            activity, months = ACTIVITIES[min(max(round(gap), 1), max(ACTIVITIES))]
+            row.update(activity=activity, due=_add_months(today, months))
+        rows.append(row)
+    rows.sort(key=lambda r: -r["gap"])
+    percent = int(matched / total * 100 + 0.5) if total else 0
+    return percent, rows
+
+
+def role_context(role: dict, today: date | None = None) -> dict:
+    role = {k: role[k] for k in ROLE_FIELDS}
+    role["status"] = getattr(role["status"], "value", role["status"])
+    return {"title": f"{role['name']} — профиль роли", "role": role, "generated_on": today or date.today()}
+
+
+async def idp_contexts(db, employee_ids: Sequence[uuid.UUID], today: date | None = None) -> dict[uuid.UUID, dict]:
+    """{employee_id: контекст idp.html.j2}; несуществующих id в ответе нет."""
+    today = today or date.today()
+    people = (await db.execute(
+        select(
+            Employee.id, Employee.name, Employee.title, Employee.department, Employee.unit,
+            Employee.manager_id, Employee.competencies,
+        ).where(Employee.id.in_(employee_ids))
+    )).all()
+    if not people:
+        return {}
+    ids = [p.id for p in people]
+
+    manager_ids = {p.manager_id for p in people if p.manager_id}
+    managers = dict((await db.execute(
+        select(Employee.id, Employee.name).where(Employee.id.in_(manager_ids))
+    )).all()) if manager_ids else {}
+
+    # цели: роли, на которые сотрудник отмечен звездой; без них — эталон текущей должности
+    stars: dict[uuid.UUID, list] = {}
+    for row in (await db.execute(
+        select(Succession.employee_id, Succession.notes, Role.name, Role.division, Role.competency_map)
+        .join(Role, Role.id == Succession.target_role)
+        .where(Succession.employee_id.in_(ids), Succession.is_starred.is_(True))
+        .order_by(Succession.created_at, Role.name)
+    )).all():
+        stars.setdefault(row.employee_id, []).append(row)
+
+    titles = {p.title for p in people if p.title and p.id not in stars}
+    current_roles = {}
+    if titles:
+        for row in (await db.execute(
+            select(Role.name, Role.division, Role.competency_map)
+            .where(Role.name.in_(titles))
+            .order_by(Role.name, Role.version.desc())
+        )).all():
+            current_roles.setdefault(row.name, row)  # последняя версия эталона
+
+    # 360°: последний цикл каждого сотрудника, суммы — из кэша агрегатов
+    latest = dict((await db.execute(
+        select(Feedback360Score.employee_id, func.max(Feedback360Score.cycle))
+        .where(Feedback360Score.employee_id.in_(ids))
+        .group_by(Feedback360Score.employee_id)
+    )).all())
+    feedback: dict[uuid.UUID, dict] = {}
+    for cycle in set(latest.values()):
+        members = [e for e, c in latest.items() if c == cycle]
+        sums = await aggregates.load_sums(db, members, cycle)
+        for employee_id, summary in aggregates.summarize(sums, aggregates.WEIGHT_PRESETS["equal"]).items():
+            if summary["competencies"]:
+                feedback[employee_id] = {"cycle": cycle, **summary}
+
+    out = {}
+    for p in people:
+        targets = []
+        if p.id in stars:
+            goals = [(r, "target", r.notes) for r in stars[p.id]]
+        elif p.title in current_roles:
+            goals = [(current_roles[p.title], "current", "")]
+        else:
+            goals = []
+        for role, kind, notes in goals:
+            percent, gaps = competency_gaps(p.competencies, role.competency_map, today)
+            targets.append({
+                "kind": kind, "name": role.name, "division": role.division, "notes": notes or "",
+                "percent": percent, "gaps": gaps,
+            })
+        out[p.id] = {
+            "title": f"ИПР — {p.name}",
+            "employee": {
+                "id": p.id, "name": p.name, "title": p.title, "department": p.department, "unit": p.unit,
+                "manager": managers.get(p.manager_id, ""),
+            },
+            "targets": targets,
+            "feedback": feedback.get(p.id),
+            "generated_on": today,
+        }
+    return out
@@ -0,0 +1,92 @@
+# app/reports/render.py
+"""
+То, что выполняется в процессах пула PDF (app/reports/service.py).
+
+Модуль намеренно лёгкий — только jinja2 (и weasyprint, лениво): воркеры стартуют через
+spawn и импортируют его заново, без приложения, БД и настроек. Шаблоны компилируются
+один раз на процесс (Environment держит их в кэше), шрифты WeasyPrint — тоже.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+_env: Environment | None = None
+_fonts = None
+
+
+class RendererUnavailable(RuntimeError):
+    """WeasyPrint не импортируется (нет pango/cairo в системе)."""
+
+
+def _as_list(value: Any) -> list:
+    """JSON-поля ролей бывают и списком, и dict — в шаблоне нужен список строк/объектов."""
+    if not value:
+        return []
+    if isinstance(value, dict):
+        return list(value.values())
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def environment() -> Environment:
+    global _env
+    if _env is None:
+        _env = Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR),
+            autoescape=select_autoescape(["html", "j2"]),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,  # шаблоны не меняются на ходу — не stat'им файлы на каждый рендер
+        )
+        _env.filters["as_list"] = _as_list
+    return _env
+
+
+def templates_fingerprint() -> str:
+    """Хэш исходников шаблонов — часть ключа кэша PDF: правка шаблона = новые PDF."""
+    digest = hashlib.sha256()
+    for path in sorted(TEMPLATES_DIR.glob("*.j2")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def init_worker() -> None:
+    """initializer пула: скомпилировать шаблоны и поднять WeasyPrint до первого заказа."""
+    env = environment()
+    for name in env.list_templates(extensions=["j2"]):
+        env.get_template(name)
+    try:
+        _weasyprint()
+    except RendererUnavailable:
+        pass  # ошибку увидит render_pdf — пул при этом остаётся живым
+
+
+def _weasyprint():
+    global _fonts
+    try:
+        import weasyprint
+        from weasyprint.text.fonts import FontConfiguration
+    except (ImportError, OSError) as exc:
+        raise RendererUnavailable(str(exc).splitlines()[0]) from None
+    if _fonts is None:
+        _fonts = FontConfiguration()
+    return weasyprint
+
+
+def render_html(template: str, context: dict) -> str:
+    return environment().get_template(template).render(**context)
+
+
+def render_pdf(template: str, context: dict) -> bytes:
+    weasyprint = _weasyprint()
+    html = render_html(template, context)
+    return weasyprint.HTML(string=html, base_url=str(TEMPLATES_DIR)).write_pdf(font_config=_fonts)
@@ -0,0 +1,182 @@
+# app/reports/service.py
+"""
+PDF из Jinja-шаблонов (app/reports/templates) через WeasyPrint.
+
+Вёрстка WeasyPrint — чистый CPU на Python (GIL), поэтому рендер идёт в пуле процессов
+PDF_WORKERS (spawn: воркер импортирует только app/reports/render.py). Event loop
+лишь ждёт future.
+
+Кэш: ключ — sha256 от (хэш исходников шаблонов, имя шаблона, контекст в каноническом
+JSON). Одинаковые данные -> тот же PDF из памяти без рендера; он же ETag ответа.
+Одновременные запросы одного ключа ждут один рендер — отдельную задачу, которая кладёт
+результат в кэш, даже если все ждавшие уже ушли (отмена запроса рендер не отменяет).
+
+    digest, body = await pdf("idp.html.j2", context)
+    StreamingResponse(zip_stream([(filename, template, context), ...]), media_type="application/zip")
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+from urllib.parse import quote
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.reports import render
+
+pdf_cache = TTLCache(maxsize=settings.PDF_CACHE_SIZE, ttl=settings.PDF_CACHE_TTL_SEC, name="pdf")
+
+_TEMPLATES_FINGERPRINT = render.templates_fingerprint()
+_executor: ProcessPoolExecutor | None = None
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),  # fork после старта event loop и потоков небезопасен
+            initializer=render.init_worker,
+        )
+    return _executor
+
+
+def cache_key(template: str, context: dict) -> str:
+    digest = hashlib.sha256()
+    digest.update(_TEMPLATES_FINGERPRINT.encode())
+    digest.update(template.encode())
+    digest.update(orjson.dumps(context, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+    return digest.hexdigest()[:32]
+
+
+async def _render(template: str, context: dict) -> bytes:
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pool(), render.render_pdf, template, context)
+    except render.RendererUnavailable as exc:
+        raise HTTPException(status_code=503, detail=f"PDF renderer is not available: {exc}")
+
+
+async def _render_to_cache(key: str, template: str, context: dict) -> bytes:
+    try:
+        body = await _render(template, context)
+        pdf_cache.set(key, body)
+        return body
+    finally:
+        _inflight.pop(key, None)
+
+
+def _consume_error(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()  # помечаем как прочитанное, если ждущих нет
+
+
+async def pdf(template: str, context: dict, key: str | None = None) -> tuple[str, bytes]:
+    """(ключ кэша, PDF) — из кэша, из уже идущего рендера того же ключа или новым рендером."""
+    key = key or cache_key(template, context)
+    body = pdf_cache.get(key)
+    if body is not None:
+        return key, body
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(_render_to_cache(key, template, context))
+        task.add_done_callback(_consume_error)
+        _inflight[key] = task
+    # отмена этого запроса не трогает рендер: остальные ждущие и кэш его получат
+    return key, await asyncio.shield(task)
+
+
+def safe_filename(name: str, suffix: str) -> str:
+    """Имя файла из ФИО/названия: без разделителей пути и управляющих, пробелы -> _."""
+    cleaned = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in name.strip())
+    return f"{cleaned.strip('._') or 'document'}{suffix}"
+
+
+def disposition(filename: str, kind: str = "inline") -> str:
+    ascii_name = filename.encode("ascii", "ignore").decode().strip("_") or "document" + filename[filename.rfind("."):]
+    return f"{kind}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+async def pdf_response(template: str, context: dict, filename: str, if_none_match: str | None = None) -> Response:
+    """PDF-ответ с ETag = ключ кэша; совпал If-None-Match — 304 без рендера."""
+    key = cache_key(template, context)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    _, body = await pdf(template, context, key)
+    headers["Content-Disposition"] = disposition(filename)
+    return Response(content=body, media_type="application/pdf", headers=headers)
+
+
+class _ZipSink(io.RawIOBase):
+    """Несикаемый поток для zipfile: копит записанное, stream забирает кусками."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def zip_stream(entries: Iterable[tuple[str, str, dict]]) -> AsyncIterator[bytes]:
+    """
+    ZIP из PDF по (имя файла, шаблон, контекст): рендер параллельно в пуле, файлы пишутся
+    в архив по мере готовности и сразу уходят клиенту. PDF уже сжат — ZIP_STORED.
+    Ошибки отдельных файлов не рвут архив — их список кладётся в ERRORS.txt.
+    """
+    limit = asyncio.Semaphore(settings.PDF_WORKERS * 2)  # пул занят, но весь отдел в его очередь не кладём
+
+    async def one(filename: str, template: str, context: dict):
+        async with limit:
+            try:
+                return filename, (await pdf(template, context))[1], None
+            except Exception as exc:
+                detail = exc.detail if isinstance(exc, HTTPException) else repr(exc)
+                return filename, None, detail
+
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    tasks = [asyncio.ensure_future(one(*entry)) for entry in entries]
+    errors = []
+    stamp = datetime.now().timetuple()[:6]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            filename, body, error = await next_done
+            if error is not None:
+                errors.append(f"{filename}: {error}")
+                continue
+            archive.writestr(zipfile.ZipInfo(filename, date_time=stamp), body)
+            yield sink.take()
+        if errors:
+            archive.writestr(zipfile.ZipInfo("ERRORS.txt", date_time=stamp), "\n".join(errors) + "\n")
+        archive.close()
+        yield sink.take()
+    finally:
+        for task in tasks:  # клиент ушёл — не рендерим остальное
+            task.cancel()
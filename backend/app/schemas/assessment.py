@@ -17,4 +17,5 @@ class AssessmentList(BaseModel):
     items: list[AssessmentOut]
     page: int
     per_page: int
-    total: int
+    total: Optional[int] = None       # None, если счёт не запрашивали (with_total=false)
+    next_cursor: Optional[str] = None  # курсор следующей страницы (keyset-режим)
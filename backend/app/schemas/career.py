@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional, Dict
+from datetime import date, datetime
+from uuid import UUID
+
+class CareerHistoryOut(BaseModel):
+    id: UUID
+    role_title: str
+    department: str
+    unit: str
+    started_at: date
+    ended_at: Optional[date] = None
+    payload: Dict
+    created_at: Optional[datetime] = None
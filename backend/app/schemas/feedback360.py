@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List
+from uuid import UUID
+
+class Feedback360Metrics(BaseModel):
+    means: Dict[str, Optional[float]]  # peers|reports|manager|self -> среднее (None — нет баллов)
+    weighted: Optional[float] = None
+    spread: Optional[float] = None     # std между средними групп
+    self_delta: Optional[float] = None # self минус среднее внешних групп
+
+class Feedback360Question(BaseModel):
+    question: str
+    scores: Dict[str, Optional[float]]
+
+class Feedback360Competency(Feedback360Metrics):
+    name: str
+    questions: Optional[List[Feedback360Question]] = None  # только в карточке сотрудника
+
+class Feedback360Employee(BaseModel):
+    employee_id: UUID
+    name: str
+    title: str
+    cycle: Optional[str] = None
+    overall: Optional[Feedback360Metrics] = None  # по всем вопросам анкеты
+    competencies: List[Feedback360Competency]
+
+class Feedback360Summary(BaseModel):
+    department: str
+    cycle: Optional[str] = None
+    preset: str
+    items: List[Feedback360Employee]
+
+class Feedback360UploadResult(BaseModel):
+    employee_id: UUID
+    cycle: str
+    competencies: int
+    questions: int
@@ -10,8 +10,35 @@ class OrgNode(BaseModel):
     unit: str
     manager_id: Optional[UUID] = None
     span: int
+    level: Optional[int] = None      # 0 — CEO, 1 — CEO-1 … (из employee_hierarchy)
+    headcount: Optional[int] = None  # все подчинённые на любой глубине
 
 class OrgTreeResponse(BaseModel):
     nodes: Dict[str, OrgNode]
     children: Dict[str, List[str]]
     deptCounts: Dict[str, int]
+    version: Optional[int] = None     # версия оргструктуры (org_changes), она же в ETag
+    since: Optional[int] = None       # задан — это дельта от since, а не полное дерево
+    removed: List[str] = []           # дельта: узлы, которых больше нет под фильтром
+
+class OrgExpandResponse(BaseModel):
+    root_ids: List[str]                 # запрошенный узел или страница корней
+    nodes: Dict[str, OrgNode]
+    children: Dict[str, List[str]]      # загруженные дети по родителю
+    next_cursor: Dict[str, str]         # родитель -> курсор следующих детей (если есть ещё)
+    roots_next_cursor: Optional[str] = None
+
+class OrgHierarchyNode(OrgNode):
+    depth: int  # расстояние от узла запроса
+
+class OrgSubtreeResponse(BaseModel):
+    root_id: UUID
+    headcount: int
+    items: List[OrgHierarchyNode]
+    page: int
+    per_page: int
+
+class OrgAncestorsResponse(BaseModel):
+    employee_id: UUID
+    level: int
+    items: List[OrgHierarchyNode]  # от непосредственного руководителя к корню
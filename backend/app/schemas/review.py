@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional, Dict
+from datetime import date, datetime
+from uuid import UUID
+
+class ReviewOut(BaseModel):
+    id: UUID
+    type: str  # client|manager
+    date: date
+    text: str
+    meta: Dict
+    created_at: Optional[datetime] = None
@@ -23,4 +23,19 @@ class RoleList(BaseModel):
     items: list[RoleOut]
     page: int
     per_page: int
-    total: int
+    total: Optional[int] = None       # None, если счёт не запрашивали (with_total=false)
+    next_cursor: Optional[str] = None  # курсор следующей страницы (keyset-режим)
+
+class RoleCandidate(BaseModel):
+    id: UUID
+    name: str
+    title: str
+    department: str
+    unit: str
+    avatar_url: Optional[str] = None
+    percent: int  # соответствие competency_map роли, 0..100
+
+class RoleCandidates(BaseModel):
+    role_id: UUID
+    items: list[RoleCandidate]  # по убыванию percent
+    scored: int                 # сколько сотрудников сравнивали
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
@@ -9,6 +9,13 @@ class SuccessionToggleIn(BaseModel):
     is_starred: bool
     notes: Optional[str] = ""
 
+class SuccessionBulkIn(BaseModel):
+    items: list[SuccessionToggleIn] = Field(min_length=1)  # не больше SUCCESSION_BULK_MAX_ITEMS
+
+class SuccessionPair(BaseModel):
+    employee_id: UUID
+    target_role: UUID
+
 class SuccessionOut(BaseModel):
     id: UUID
     employee_id: UUID
@@ -21,4 +28,9 @@ class SuccessionList(BaseModel):
     items: list[SuccessionOut]
     page: int
     per_page: int
-    total: int
+    total: Optional[int] = None       # None, если счёт не запрашивали (with_total=false)
+    next_cursor: Optional[str] = None  # курсор следующей страницы (keyset-режим)
+
+class SuccessionBulkResult(BaseModel):
+    items: list[SuccessionOut]          # созданные/обновлённые записи
+    not_found: list[SuccessionPair]     # пары, где нет сотрудника или роли — пропущены
@@ -20,4 +20,5 @@ class VacancyList(BaseModel):
     items: list[VacancyOut]
     page: int
     per_page: int
-    total: int
+    total: Optional[int] = None       # None, если счёт не запрашивали (with_total=false)
+    next_cursor: Optional[str] = None  # курсор следующей страницы (keyset-режим)
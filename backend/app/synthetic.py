@@ -0,0 +1,414 @@
+# app/synthetic.py
+"""
+Детерминированная синтетическая оргструктура для dev и бенчмарков (python -m app.seed).
+
+Один и тот же --seed и те же размеры дают те же строки байт в байт: UUID, даты и
+значения берутся из random.Random, без uuid4() и date.today(). У каждой таблицы свой
+поток случайных чисел, поэтому, например, --reviews не меняет сотрудников.
+
+Иерархия строится по уровням (BFS): у руководителя около span подчинённых, уровней не
+больше depth; корней столько, чтобы уместить всех. Подразделение задаёт руководитель
+первого уровня, юнит — второго, дальше они наследуются.
+
+Загрузка — мимо ORM: в Postgres (psycopg) COPY ... FROM STDIN, иначе executemany
+по LOAD_BATCH строк. После сотрудников — rebuild_hierarchy (closure table + сброс версии
+оргструктуры), как после импорта. 100k сотрудников со всем остальным — десятки секунд.
+"""
+from __future__ import annotations
+
+import enum
+import math
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Iterator
+
+import orjson
+from sqlalchemy import delete, func, insert, select, text
+
+from app.core.search import build_search_text
+from app.models.assessment import Assessment
+from app.models.career import CareerHistory
+from app.models.employee import Employee
+from app.models.feedback360 import Feedback360Score
+from app.models.hierarchy import EmployeeHierarchy, rebuild_hierarchy
+from app.models.review import Review
+from app.models.role import Role, RoleStatus
+from app.models.succession import Succession
+from app.models.vacancy import Vacancy, VacancyStatus
+
+LOAD_BATCH = 5000
+BASE_DATE = date(2025, 9, 1)  # «сегодня» генератора — не date.today(), иначе пропадёт детерминизм
+
+H = EmployeeHierarchy.__table__
+
+# таблицы, которые генератор заполняет (и --reset чистит), в порядке удаления
+TABLES = [
+    CareerHistory.__table__, Review.__table__, Succession.__table__, Assessment.__table__, Vacancy.__table__,
+    Feedback360Score.__table__, H, Employee.__table__, Role.__table__,
+]
+
+
+@dataclass
+class Sizes:
+    employees: int = field(default=200, metadata={"help": "сотрудников"})
+    depth: int = field(default=5, metadata={"help": "уровней иерархии, не больше"})
+    span: int = field(default=6, metadata={"help": "подчинённых у руководителя, в среднем"})
+    roles: int = field(default=20, metadata={"help": "ролей (у каждой --role-versions версий)"})
+    role_versions: int = field(default=2, metadata={"help": "версий роли; активна последняя"})
+    assessments: int = field(default=3, metadata={"help": "оценок на сотрудника, в среднем"})
+    vacancies: int = field(default=30, metadata={"help": "вакансий"})
+    stars: int = field(default=5, metadata={"help": "кандидатов преемственности на роль"})
+    reviews: int = field(default=2, metadata={"help": "отзывов на сотрудника, в среднем"})
+    career: int = field(default=2, metadata={"help": "прошлых должностей на сотрудника, в среднем"})
+
+
+# ── Справочники
+
+MALE_FIRST = [("Иван", "ivan"), ("Алексей", "aleksey"), ("Дмитрий", "dmitry"), ("Сергей", "sergey"),
+              ("Павел", "pavel"), ("Олег", "oleg"), ("Денис", "denis"), ("Кирилл", "kirill"),
+              ("Михаил", "mikhail"), ("Андрей", "andrey"), ("Никита", "nikita"), ("Роман", "roman")]
+FEMALE_FIRST = [("Анна", "anna"), ("Мария", "maria"), ("Ирина", "irina"), ("Ольга", "olga"),
+                ("Елена", "elena"), ("Наталья", "natalia"), ("Татьяна", "tatiana"), ("Юлия", "yulia"),
+                ("Екатерина", "ekaterina"), ("Светлана", "svetlana"), ("Дарья", "daria"), ("Алина", "alina")]
+LAST = [("Петров", "petrov"), ("Соколов", "sokolov"), ("Лебедев", "lebedev"), ("Смирнов", "smirnov"),
+        ("Кузнецов", "kuznetsov"), ("Попов", "popov"), ("Новиков", "novikov"), ("Морозов", "morozov"),
+        ("Волков", "volkov"), ("Фёдоров", "fedorov"), ("Орлов", "orlov"), ("Егоров", "egorov"),
+        ("Никитин", "nikitin"), ("Зайцев", "zaytsev"), ("Павлов", "pavlov"), ("Белов", "belov")]
+
+DEPARTMENTS = ["FMCG", "Electronics", "Retail", "Pharma", "Logistics", "Finance", "HR", "IT"]
+UNITS = ["Analytics", "KeyAccounts", "Coordination", "Sales", "Marketing", "Operations", "Support", "Procurement"]
+REGIONS = ["RU-Center", "RU-NW", "RU-Volga", "RU-South", "RU-Ural", "RU-Siberia"]
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Екатеринбург", "Новосибирск", "Нижний Новгород"]
+MANAGER_TITLES = ["Управляющий директор", "Директор направления", "Руководитель отдела", "Руководитель группы"]
+ROLE_NAMES = ["GKAM", "Координатор проектов", "Менеджер по продажам", "HR-аналитик", "Бренд-менеджер",
+              "Категорийный менеджер", "Аналитик данных", "Руководитель проектов", "Специалист по закупкам",
+              "Логист", "Маркетолог", "Бизнес-аналитик", "Торговый представитель", "Финансовый аналитик"]
+COMPETENCIES = ["Коммуникация", "Аналитика данных", "Переговоры", "Оргнавыки", "Внимание к деталям",
+                "Лидерство", "Excel", "Планирование", "Клиентоориентированность", "Управление проектами"]
+ASSESSMENT_SOURCES = ["manual", "test", "assessment_center", "import"]
+REVIEW_TEXTS = ["Быстро реагирует на запросы", "Хорошо ведёт переговоры", "Стоит подтянуть отчётность",
+                "Надёжный исполнитель", "Инициативен, предлагает улучшения", "Иногда срывает сроки"]
+STAR_NOTES = ["", "", "Готов через 6–12 месяцев", "Нужен опыт управления", "Сильный кандидат"]
+
+
+# ── Загрузка
+
+
+def _copy_value(value):
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    if isinstance(value, enum.Enum):
+        return value.name  # sa.Enum хранит имя члена
+    return value
+
+
+class _Loader:
+    """COPY в Postgres (psycopg), executemany пачками — в остальных СУБД."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg"
+
+    def load(self, table, rows: Iterable[dict]) -> int:
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        columns = list(first)
+        if self.copy:
+            return self._copy(table, columns, first, rows)
+        count, batch = 0, [first]
+        for row in rows:
+            batch.append(row)
+            if len(batch) == LOAD_BATCH:
+                self.connection.execute(insert(table), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.connection.execute(insert(table), batch)
+            count += len(batch)
+        return count
+
+    def _copy(self, table, columns: list[str], first: dict, rows: Iterator[dict]) -> int:
+        sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+        count = 0
+        with self.connection.connection.dbapi_connection.cursor() as cursor, cursor.copy(sql) as copy:
+            for row in _chain(first, rows):
+                copy.write_row([_copy_value(row[c]) for c in columns])
+                count += 1
+        return count
+
+
+def _chain(first: dict, rows: Iterator[dict]) -> Iterator[dict]:
+    yield first
+    yield from rows
+
+
+# ── Генерация
+
+
+def _rng(seed: int, stream: str) -> random.Random:
+    return random.Random(f"{seed}:{stream}")
+
+
+def _uuid(rnd: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rnd.getrandbits(128), version=4)
+
+
+def _days_ago(rnd: random.Random, max_days: int) -> date:
+    return BASE_DATE - timedelta(days=rnd.randint(0, max_days))
+
+
+def _around(rnd: random.Random, mean: int) -> int:
+    """Случайное число со средним mean (0..2*mean)."""
+    return rnd.randint(0, 2 * mean) if mean > 0 else 0
+
+
+def _competencies(rnd: random.Random, low: int, high: int) -> dict:
+    return {name: rnd.randint(low, high) for name in rnd.sample(COMPETENCIES, rnd.randint(3, 6))}
+
+
+@dataclass
+class _Person:
+    id: uuid.UUID
+    level: int
+    department: str
+    unit: str
+    title: str
+    started: date
+
+
+def _hierarchy(sizes: Sizes, rnd: random.Random) -> list[tuple[int, int | None]]:
+    """[(уровень, индекс руководителя | None)] в порядке BFS: руководитель всегда раньше подчинённых."""
+    depth, span = max(sizes.depth, 1), max(sizes.span, 1)
+    capacity = sum(span ** k for k in range(depth))
+    nodes: list[tuple[int, int | None]] = []
+    managers: deque[int] = deque()
+
+    def add(level: int, manager: int | None) -> None:
+        nodes.append((level, manager))
+        if level < depth - 1:
+            managers.append(len(nodes) - 1)
+
+    for _ in range(min(max(1, math.ceil(sizes.employees / capacity)), sizes.employees)):
+        add(0, None)
+    while len(nodes) < sizes.employees:
+        if not managers:
+            add(0, None)  # ширина «недобрала» — ещё один корень
+            continue
+        manager = managers.popleft()
+        for _ in range(rnd.randint(max(1, span // 2), span + span // 2)):
+            if len(nodes) == sizes.employees:
+                break
+            add(nodes[manager][0] + 1, manager)
+    return nodes
+
+
+def _employees(sizes: Sizes, seed: int, people: list[_Person], assessment_counts: list[int]) -> Iterator[dict]:
+    rnd = _rng(seed, "employees")
+    nodes = _hierarchy(sizes, rnd)
+    managers = {manager for _, manager in nodes if manager is not None}
+    heads = 0
+    for i, (level, manager) in enumerate(nodes):
+        female = rnd.random() < 0.5
+        first, first_lat = rnd.choice(FEMALE_FIRST if female else MALE_FIRST)
+        last, last_lat = rnd.choice(LAST)
+        if female:
+            last += "а"
+        name = f"{first} {last}"
+        email = f"{first_lat}.{last_lat}{'a' if female else ''}.{i}@example.com"
+
+        if level == 0:
+            department, unit = "Management", "HQ"
+        elif level == 1:
+            department, unit = DEPARTMENTS[heads % len(DEPARTMENTS)], "Management"
+            heads += 1
+        elif level == 2:
+            department = people[manager].department
+            unit = f"{rnd.choice(UNITS)}-{i % 97}"
+        else:
+            department, unit = people[manager].department, people[manager].unit
+        if i in managers:
+            title = MANAGER_TITLES[min(level, len(MANAGER_TITLES) - 1)]
+        else:
+            title = rnd.choice(ROLE_NAMES[:max(sizes.roles, 1)])
+        started = _days_ago(rnd, 5 * 365)
+        person = _Person(_uuid(rnd), level, department, unit, title, started)
+        people.append(person)
+        count = _around(rnd, sizes.assessments)
+        assessment_counts.append(count)
+        yield dict(
+            id=person.id,
+            name=name,
+            email=email,
+            title=title,
+            department=department,
+            unit=unit,
+            region=rnd.choice(REGIONS),
+            manager_id=people[manager].id if manager is not None else None,
+            avatar_url=None,
+            bio="",
+            languages={"ru": "C2", "en": rnd.choice(["A2", "B1", "B2", "C1"])},
+            contacts={"telegram": f"@{first_lat}_{i}"},
+            current_role_started_at=started,
+            competencies=_competencies(rnd, 1, 5),
+            assessments_count=count,
+            search_text=build_search_text(name, email, title),
+        )
+
+
+def _roles(sizes: Sizes, seed: int, active: list[uuid.UUID]) -> Iterator[dict]:
+    rnd = _rng(seed, "roles")
+    for i in range(sizes.roles):
+        base = ROLE_NAMES[i % len(ROLE_NAMES)]
+        division = DEPARTMENTS[i % len(DEPARTMENTS)]
+        name = base if i < len(ROLE_NAMES) else f"{base} ({division}, {i // len(ROLE_NAMES) + 1})"
+        goal = f"{base}: рост показателей направления {division}"
+        competency_map = _competencies(rnd, 2, 5)
+        versions = max(sizes.role_versions, 1)
+        for version in range(1, versions + 1):
+            role_id = _uuid(rnd)
+            if version == versions:
+                active.append(role_id)
+            yield dict(
+                id=role_id,
+                name=name,
+                version=version,
+                division=division,
+                status=RoleStatus.active if version == versions else RoleStatus.archived,
+                goal=goal,
+                responsibilities={"core": rnd.sample(["Переговоры", "План продаж", "Отчётность", "Контроль SLA",
+                                                      "Работа с подрядчиками", "Аналитика"], 2)},
+                kpi={"Plan": f">={rnd.randint(90, 110)}%", "NPS": f">={rnd.randint(30, 60)}"},
+                competency_map=competency_map,
+                assessment_guidelines={},
+                test_assignment={},
+                assessment_center={},
+                search_text=build_search_text(name, goal),
+            )
+            competency_map = {k: min(v + rnd.randint(0, 1), 5) for k, v in competency_map.items()}
+
+
+def _assessments(seed: int, people: list[_Person], counts: list[int], roles: list[uuid.UUID]) -> Iterator[dict]:
+    rnd = _rng(seed, "assessments")
+    for person, count in zip(people, counts):
+        for _ in range(count):
+            yield dict(
+                id=_uuid(rnd),
+                employee_id=person.id,
+                role_id=rnd.choice(roles) if roles and rnd.random() < 0.8 else None,
+                date=_days_ago(rnd, 2 * 365),
+                percent=round(rnd.uniform(50, 98), 2),
+                source=rnd.choice(ASSESSMENT_SOURCES),
+                payload={"details": _competencies(rnd, 2, 5)},
+            )
+
+
+def _vacancies(sizes: Sizes, seed: int, people: list[_Person], roles: list[uuid.UUID]) -> Iterator[dict]:
+    rnd = _rng(seed, "vacancies")
+    managers = [p for p in people if p.level < 2] or people
+    if not roles or not managers:
+        return
+    for _ in range(sizes.vacancies):
+        manager = rnd.choice(managers)
+        yield dict(
+            id=_uuid(rnd),
+            role_id=rnd.choice(roles),
+            department=manager.department,
+            unit=manager.unit,
+            manager_id=manager.id,
+            status=rnd.choices(list(VacancyStatus), weights=[6, 1, 3])[0],
+            headcount=rnd.randint(1, 3),
+            location=rnd.choice(CITIES),
+            notes="",
+        )
+
+
+def _succession(sizes: Sizes, seed: int, people: list[_Person], roles: list[uuid.UUID]) -> Iterator[dict]:
+    rnd = _rng(seed, "succession")
+    for role_id in roles:
+        for person in rnd.sample(people, min(sizes.stars, len(people))):
+            yield dict(
+                id=_uuid(rnd),
+                employee_id=person.id,
+                target_role=role_id,
+                is_starred=rnd.random() < 0.9,
+                notes=rnd.choice(STAR_NOTES),
+            )
+
+
+def _reviews(sizes: Sizes, seed: int, people: list[_Person]) -> Iterator[dict]:
+    rnd = _rng(seed, "reviews")
+    for person in people:
+        for _ in range(_around(rnd, sizes.reviews)):
+            yield dict(
+                id=_uuid(rnd),
+                employee_id=person.id,
+                type=rnd.choice(["client", "manager"]),
+                date=_days_ago(rnd, 2 * 365),
+                text=rnd.choice(REVIEW_TEXTS),
+                meta={"rating": rnd.randint(1, 5)},
+            )
+
+
+def _career(sizes: Sizes, seed: int, people: list[_Person]) -> Iterator[dict]:
+    rnd = _rng(seed, "career")
+    for person in people:
+        ended = person.started
+        for _ in range(_around(rnd, sizes.career)):
+            started = ended - timedelta(days=rnd.randint(180, 3 * 365))
+            yield dict(
+                id=_uuid(rnd),
+                employee_id=person.id,
+                role_title=rnd.choice(ROLE_NAMES),
+                department=person.department if rnd.random() < 0.7 else rnd.choice(DEPARTMENTS),
+                unit="",
+                started_at=started,
+                ended_at=ended,
+                payload={},
+            )
+            ended = started
+
+
+def clear(connection) -> None:
+    """Удалить всё, что пишет генератор (пользователей не трогаем)."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("TRUNCATE " + ", ".join(t.name for t in TABLES)))
+    else:
+        for table in TABLES:
+            connection.execute(delete(table))
+
+
+def is_empty(connection) -> bool:
+    return not connection.scalar(select(func.count()).select_from(Employee.__table__))
+
+
+def generate(connection, sizes: Sizes, seed: int = 42, log=print) -> dict[str, int]:
+    """Залить синтетику в пустые таблицы одной транзакцией connection; {таблица: строк}."""
+    loader = _Loader(connection)
+    people: list[_Person] = []
+    assessment_counts: list[int] = []
+    active_roles: list[uuid.UUID] = []
+    counts: dict[str, int] = {}
+
+    def step(table, rows: Iterable[dict]) -> None:
+        started = time.perf_counter()
+        counts[table.name] = loader.load(table, rows)
+        log(f"{table.name:<20} {counts[table.name]:>9} rows  {time.perf_counter() - started:6.1f} s")
+
+    step(Employee.__table__, _employees(sizes, seed, people, assessment_counts))
+    started = time.perf_counter()
+    rebuild_hierarchy(connection)  # rowcount у INSERT ... SELECT в SQLite — -1, считаем отдельно
+    counts[H.name] = connection.scalar(select(func.count()).select_from(H))
+    log(f"{H.name:<20} {counts[H.name]:>9} rows  {time.perf_counter() - started:6.1f} s")
+    step(Role.__table__, _roles(sizes, seed, active_roles))
+    step(Assessment.__table__, _assessments(seed, people, assessment_counts, active_roles))
+    step(Vacancy.__table__, _vacancies(sizes, seed, people, active_roles))
+    step(Succession.__table__, _succession(sizes, seed, people, active_roles))
+    step(Review.__table__, _reviews(sizes, seed, people))
+    step(CareerHistory.__table__, _career(sizes, seed, people))
+    return counts
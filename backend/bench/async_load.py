@@ -0,0 +1,111 @@
+# bench/async_load.py
+"""
+Нагрузочный прогон: sync-режим (threadpool + пул 5+10) против async-режима.
+
+Каждый режим поднимается в отдельном процессе (DB_ASYNC читается при импорте app),
+приложение гоняется in-process через httpx.ASGITransport — без сети, чтобы мерить
+именно сервер и БД. Нужна засеянная БД из DATABASE_URL (python -m app.seed).
+
+    python -m bench.async_load --path /api/v1/employees --concurrency 10,50,200 --requests 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.common import auth_headers, percentile, use_backend_path
+
+
+async def _drive(path: str, concurrency: int, total: int) -> dict:
+    import httpx
+    from app.main import app
+
+    headers = auth_headers()
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                r = await client.get(path, headers=headers)
+                ok = r.status_code == 200
+            except Exception:  # например, TimeoutError пула в sync-режиме
+                ok = False
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if not ok:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await client.get(path, headers=headers)  # прогрев пула
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+    }
+
+
+def _worker_main(args):
+    use_backend_path()
+    rows = [asyncio.run(_drive(args.path, c, args.requests)) for c in args.concurrency]
+    print(json.dumps(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/v1/employees")
+    parser.add_argument("--concurrency", default="10,50,200", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return _worker_main(args)
+
+    report = {}
+    for mode in args.modes.split(","):
+        env = dict(os.environ, DB_ASYNC="true" if mode == "async" else "false")
+        cmd = [
+            sys.executable, "-m", "bench.async_load", "--worker",
+            "--path", args.path,
+            "--concurrency", ",".join(map(str, args.concurrency)),
+            "--requests", str(args.requests),
+        ]
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            sys.exit(f"[{mode}] worker failed:\n{out.stderr[-2000:]}")
+        report[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':<6} {'conc':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for mode, rows in report.items():
+        for r in rows:
+            print(
+                f"{mode:<6} {r['concurrency']:>5} {r['rps']:>8} {r['p50_ms']:>8} "
+                f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# bench/common.py
+"""Общие мелочи для скриптов в bench/."""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_backend_path() -> None:
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def auth_headers(email: str | None = None) -> dict:
+    from app.core.config import settings
+    from app.core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(email or settings.ADMIN_EMAIL)}"}
@@ -0,0 +1,136 @@
+# bench/pagination.py
+"""
+OFFSET + count(*) против keyset-курсора на большой таблице employees.
+
+По умолчанию поднимает отдельную SQLite-базу и заливает в неё --rows сотрудников
+(повторный запуск переиспользует базу). С --database-url меряет на указанной БД:
+если там меньше --rows сотрудников — дольёт недостающих.
+
+    python -m bench.pagination --rows 100000 --per-page 30 --deep-page 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from bench.common import auth_headers, use_backend_path
+
+ADMIN = "bench-admin@example.com"
+
+
+def _fill(rows: int) -> None:
+    from sqlalchemy import func, insert, select
+
+    import app.models  # noqa: F401  (все таблицы в metadata)
+    from app.core.db import Base, SessionLocal, engine
+    from app.core.search import build_search_text
+    from app.core.security import hash_password
+    from app.models.employee import Employee
+    from app.models.hierarchy import rebuild_hierarchy
+    from app.models.user import User
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        if not db.scalar(select(User).where(User.email == ADMIN)):
+            db.add(User(email=ADMIN, password_hash=hash_password("bench"), role="admin"))
+            db.commit()
+
+        have = db.scalar(select(func.count()).select_from(Employee)) or 0
+        rnd = random.Random(42)
+        first = ["Анна", "Иван", "Мария", "Олег", "Ирина", "Павел", "Ольга", "Денис", "Alex", "Kate"]
+        last = ["Петров", "Соколов", "Лебедев", "Смирнов", "Кузнецов", "Попов", "Новиков", "Orlov"]
+        batch = []
+        for i in range(have, rows):
+            name = f"{rnd.choice(first)} {rnd.choice(last)}"
+            batch.append(dict(
+                id=uuid.UUID(int=rnd.getrandbits(128)),
+                name=name,
+                email=f"bench{i}@example.com",
+                search_text=build_search_text(name, f"bench{i}@example.com"),
+                title="", department=f"D{i % 40}", unit=f"U{i % 200}", region="",
+                bio="", languages={}, contacts={}, competencies={}, assessments_count=0,
+            ))
+            if len(batch) == 5000:
+                db.execute(insert(Employee), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(Employee), batch)
+        if have < rows:
+            rebuild_hierarchy(db.connection())
+        db.commit()
+
+
+def _deep_cursor(per_page: int, page: int) -> str:
+    from sqlalchemy import select
+
+    from app.api.v1.employees import EMPLOYEES_ORDER
+    from app.core.db import SessionLocal
+    from app.models.employee import Employee
+
+    # курсор, который клиент получил бы, пролистав page-1 страниц
+    with SessionLocal() as db:
+        stmt = EMPLOYEES_ORDER.order_by(select(Employee.name, Employee.id))
+        row = db.execute(stmt.offset((page - 1) * per_page - 1).limit(1)).one()
+    return EMPLOYEES_ORDER.encode(row)
+
+
+async def _measure(per_page: int, deep_page: int, repeat: int) -> list[tuple[str, float]]:
+    import httpx
+    from app.main import app
+
+    headers = auth_headers(ADMIN)
+    deep_cursor = _deep_cursor(per_page, deep_page)
+    cases = [
+        ("offset+total page 1", {"page": 1}),
+        (f"offset+total page {deep_page}", {"page": deep_page}),
+        (f"offset page {deep_page} (with_total=false)", {"page": deep_page, "with_total": "false"}),
+        ("cursor page 1", {"cursor": ""}),
+        (f"cursor page {deep_page}", {"cursor": deep_cursor}),
+    ]
+    out = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for name, params in cases:
+            params = {"per_page": per_page, **params}
+            if params.get("cursor") == "":
+                params.pop("cursor")
+                params["with_total"] = "false"
+            await client.get("/api/v1/employees", params=params, headers=headers)  # прогрев
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                r = await client.get("/api/v1/employees", params=params, headers=headers)
+                samples.append((time.perf_counter() - t0) * 1000)
+                r.raise_for_status()
+            out.append((name, statistics.median(samples)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-page", type=int, default=30)
+    parser.add_argument("--deep-page", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    db_url = args.database_url or "sqlite:///" + os.path.join(tempfile.gettempdir(), "novaprofile_bench_pagination.db")
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "novaprofile_bench_media"))
+    use_backend_path()
+
+    t0 = time.perf_counter()
+    _fill(args.rows)
+    print(f"dataset: {args.rows} employees ready in {time.perf_counter() - t0:.1f}s ({db_url.split('@')[-1]})")
+
+    for name, ms in asyncio.run(_measure(args.per_page, args.deep_page, args.repeat)):
+        print(f"{name:<40} {ms:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# bench/passwords.py
+"""
+Пропускная способность логина: сколько проверок пароля (argon2 из pwd_context)
+выдерживает процесс и сколько это на ядро.
+
+    verify    чистый pwd_context.verify в пуле из N потоков — потолок для логина
+    login     POST /auth/login in-process (httpx.ASGITransport) с конкурентностью C:
+              пул паролей PASSWORD_WORKERS + очередь с таймаутом; 503 — отбитые по таймауту
+
+На ядро = rps / min(потоков, ядер). Пользователь создаётся во временной SQLite-БД.
+
+    python -m bench.passwords --threads 1,2,4 --verifies 64 --concurrency 8,64 --logins 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.common import percentile, use_backend_path
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "Bench123!password"
+
+
+def _verify_rate(threads: int, total: int) -> float:
+    from app.core.security import hash_password, verify_password
+
+    hashed = hash_password(PASSWORD)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: verify_password(PASSWORD, hashed), range(threads)))  # прогрев
+        t0 = time.perf_counter()
+        assert all(pool.map(lambda _: verify_password(PASSWORD, hashed), range(total)))
+        return total / (time.perf_counter() - t0)
+
+
+async def _login_run(concurrency: int, total: int) -> dict:
+    import httpx
+    from app.main import app
+
+    latencies, statuses = [], []
+    remaining = total
+
+    async def worker(client):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            r = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses.append(r.status_code)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ok = statuses.count(200)
+    return {
+        "concurrency": concurrency,
+        "ok": ok,
+        "rejected": statuses.count(503),
+        "rps": ok / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 0.95),
+    }
+
+
+def _seed_user() -> None:
+    from sqlalchemy import delete
+
+    from app.core.db import Base, SessionLocal, engine
+    from app.core.security import hash_password
+    from app.models.user import User
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.execute(delete(User).where(User.email == EMAIL))
+        db.add(User(email=EMAIL, password_hash=hash_password(PASSWORD), role="viewer"))
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", default="1,2,4", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--verifies", type=int, default=64, help="проверок на точку verify")
+    parser.add_argument("--concurrency", default="8,64", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--logins", type=int, default=200, help="логинов на точку login")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "novaprofile_bench_login.db"))
+    os.environ.setdefault("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "novaprofile_bench_media"))
+    use_backend_path()
+
+    from app.core.config import settings
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, PASSWORD_WORKERS={settings.PASSWORD_WORKERS}")
+    print(f"{'verify':<8} {'threads':>8} {'per sec':>10} {'per core':>10}")
+    for threads in args.threads:
+        rate = _verify_rate(threads, args.verifies)
+        print(f"{'':<8} {threads:>8} {rate:>10.1f} {rate / min(threads, cores):>10.1f}")
+
+    _seed_user()
+    used = min(settings.PASSWORD_WORKERS, cores)
+    print(f"{'login':<8} {'conc':>8} {'per sec':>10} {'per core':>10} {'p50 ms':>9} {'p95 ms':>9} {'503':>5}")
+    for concurrency in args.concurrency:
+        with contextlib.redirect_stdout(io.StringIO()):  # access-лог middleware
+            r = asyncio.run(_login_run(concurrency, args.logins))
+        print(
+            f"{'':<8} {concurrency:>8} {r['rps']:>10.1f} {r['rps'] / used:>10.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['rejected']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
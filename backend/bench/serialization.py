@@ -0,0 +1,114 @@
+# bench/serialization.py
+"""
+Стоимость сериализации одной строки EmployeeOut (с JSON-блобами languages/contacts/
+competencies) в ответе списка — без БД и HTTP, только Python-часть.
+
+    legacy (__dict__)     EmployeeOut.model_validate(obj.__dict__) + EmployeeList
+                          + повторная валидация по response_model в FastAPI + json
+    legacy (attributes)   то же, но model_validate(obj, from_attributes=True)
+    projection + orjson   Row-кортежи колонок -> dict по полям схемы -> orjson
+
+    python -m bench.serialization --rows 200 --repeat 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import date
+
+from bench.common import use_backend_path
+
+
+def _rows(n: int):
+    from app.models.employee import Employee
+    from app.schemas.employee import EmployeeOut
+
+    rnd = random.Random(7)
+    skills = [f"skill_{i}" for i in range(40)]
+    objs = []
+    for i in range(n):
+        objs.append(Employee(
+            id=uuid.UUID(int=rnd.getrandbits(128)),
+            name=f"Сотрудник {i}",
+            email=f"user{i}@example.com",
+            title="Key Account Manager", department=f"D{i % 12}", unit=f"U{i % 40}", region="Москва",
+            manager_id=uuid.UUID(int=rnd.getrandbits(128)),
+            avatar_url=f"/media/avatars/{i}.webp",
+            bio="Опыт работы с ключевыми клиентами. " * 4,
+            languages={"ru": "native", "en": "B2", "de": "A2"},
+            contacts={"phone": "+7 900 000-00-00", "telegram": f"@user{i}", "office": "A-101"},
+            current_role_started_at=date(2020, 1 + i % 12, 1),
+            competencies={s: rnd.randint(1, 5) for s in rnd.sample(skills, 25)},
+            assessments_count=rnd.randint(0, 30),
+        ))
+    fields = list(EmployeeOut.model_fields)
+    tuples = [tuple(getattr(o, f) for f in fields) for o in objs]
+    return objs, tuples
+
+
+def _measure(fn, repeat: int) -> float:
+    fn()  # прогрев
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="строк в одной странице")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "novaprofile_bench_ser.db"))
+    os.environ.setdefault("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "novaprofile_bench_media"))
+    use_backend_path()
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    from app.core.serialization import Projection, page_response
+    from app.models.employee import Employee
+    from app.schemas.employee import EmployeeList, EmployeeOut
+
+    objs, tuples = _rows(args.rows)
+    response_field = create_model_field(name="response", type_=EmployeeList, mode="serialization")
+    projection = Projection(Employee, EmployeeOut)
+
+    def fastapi_response(items):
+        # что делает FastAPI с возвращённой моделью: dump -> validate -> serialize -> json
+        content = EmployeeList(items=items, page=1, per_page=len(items), total=None, next_cursor=None)
+        data = asyncio.run(serialize_response(field=response_field, response_content=content))
+        return JSONResponse(data).body
+
+    cases = [
+        ("legacy (__dict__)", lambda: fastapi_response([EmployeeOut.model_validate(o.__dict__) for o in objs])),
+        ("legacy (attributes)", lambda: fastapi_response(
+            [EmployeeOut.model_validate(o, from_attributes=True) for o in objs])),
+        ("projection + orjson", lambda: page_response(
+            projection, tuples, page=1, per_page=len(tuples), total=None, next_cursor=None).body),
+    ]
+
+    # asyncio.run в legacy-путях — не часть стоимости: вычтем пустой прогон
+    loop_cost = _measure(lambda: asyncio.run(asyncio.sleep(0)), args.repeat)
+
+    print(f"{args.rows} rows/page, median of {args.repeat}")
+    baseline = None
+    for name, fn in cases:
+        t = _measure(fn, args.repeat)
+        if name.startswith("legacy"):
+            t -= loop_cost
+        per_row_us = t / args.rows * 1e6
+        baseline = baseline or per_row_us
+        print(f"{name:<22} {t * 1000:>8.2f} ms/page {per_row_us:>8.2f} us/row  x{baseline / per_row_us:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# bench/suite.py
+"""
+Воспроизводимый прогон API: сценарии UI против свежей синтетической БД, результат — JSON для diff между коммитами.
+
+База засевается app.synthetic (--employees, --seed; то же зерно — те же данные), приложение
+гоняется in-process через httpx.ASGITransport с --concurrency параллельными клиентами. Запросы
+сценария выбираются из random.Random(--seed), так что два прогона шлют одно и то же.
+
+    login       POST /auth/login тестовых пользователей app.seed (argon2 в пуле паролей)
+    search      GET /employees?search=<начало фамилии>
+    org_tree    GET /org/tree
+    profile     GET /employees/{id}/profile
+    star        POST /succession/toggle случайной пары сотрудник/роль
+    mix         всё вместе с весами, как у живого UI
+
+По каждому сценарию: rps, p50/p95/p99, ошибки, статусы и SQL на запрос (X-Query-Count).
+DB_ASYNC, DATABASE_URL — как у приложения; по умолчанию временная SQLite.
+
+    python -m bench.suite --employees 20000 --concurrency 20 --requests 500 --out bench-results.json
+    python -m bench.suite --out new.json --baseline bench-results.json  # + дельты к прошлому прогону
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from bench.common import BACKEND_DIR, auth_headers, percentile, use_backend_path
+
+LOGINS = [("hr@example.com", "Hr123!test"), ("manager@example.com", "Manager123!"), ("viewer@example.com", "Viewer123!")]
+MIX = {"search": 40, "profile": 25, "org_tree": 15, "star": 15, "login": 5}
+SCENARIOS = ["login", "search", "org_tree", "profile", "star", "mix"]
+
+
+def _prepare(args) -> dict:
+    """Свежая БД нужного размера; вернуть id и фамилии, из которых сценарии собирают запросы."""
+    from sqlalchemy import select
+
+    import app.models  # noqa: F401  (все таблицы в metadata)
+    from app import seed, synthetic
+    from app.core.db import Base, SessionLocal, engine
+    from app.models.employee import Employee
+    from app.models.role import Role, RoleStatus
+
+    if not args.reuse:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        seed.seed_data(synthetic.Sizes(employees=args.employees), args.seed, reset=True, log=lambda *_: None)
+        print(f"seeded {args.employees} employees in {time.perf_counter() - started:.1f} s")
+    with SessionLocal() as db:
+        seed.seed_users(db)
+        employees = db.execute(select(Employee.id, Employee.name).order_by(Employee.id)).all()
+        roles = db.scalars(select(Role.id).where(Role.status == RoleStatus.active).order_by(Role.id)).all()
+    return {
+        "employees": [str(e.id) for e in employees],
+        "surnames": sorted({e.name.split()[-1][:4] for e in employees}),
+        "roles": [str(r) for r in roles],
+    }
+
+
+def _request(scenario: str, rnd: random.Random, data: dict) -> tuple[str, str, dict, dict | None, bool]:
+    """(method, path, params, json, нужен ли Authorization) для одного запроса сценария."""
+    if scenario == "mix":
+        scenario = rnd.choices(list(MIX), weights=list(MIX.values()))[0]
+    if scenario == "login":
+        email, password = rnd.choice(LOGINS)
+        return "POST", "/api/v1/auth/login", {}, {"email": email, "password": password}, False
+    if scenario == "search":
+        return "GET", "/api/v1/employees", {"search": rnd.choice(data["surnames"]), "per_page": 30}, None, True
+    if scenario == "org_tree":
+        return "GET", "/api/v1/org/tree", {}, None, True
+    if scenario == "profile":
+        return "GET", f"/api/v1/employees/{rnd.choice(data['employees'])}/profile", {}, None, True
+    if scenario == "star":
+        body = {"employee_id": rnd.choice(data["employees"]), "target_role": rnd.choice(data["roles"]),
+                "is_starred": rnd.random() < 0.7, "notes": ""}
+        return "POST", "/api/v1/succession/toggle", {}, body, True
+    raise ValueError(f"unknown scenario {scenario!r}")
+
+
+async def _drive(client, scenario: str, data: dict, args) -> dict:
+    rnd = random.Random(f"{args.seed}:{scenario}")
+    plan = [_request(scenario, rnd, data) for _ in range(args.requests)]
+    headers = auth_headers()
+    latencies: list[float] = []
+    queries: list[int] = []
+    statuses: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                method, path, params, body, auth = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, params=params, json=body, headers=headers if auth else None)
+                status = r.status_code
+                count = r.headers.get("x-query-count")
+                if count is not None:
+                    queries.append(int(count))
+            except Exception as exc:  # например, TimeoutError пула в sync-режиме
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[str(status)] += 1
+
+    # прогрев: пул соединений, кэш пользователя, снимок оргструктуры
+    for method, path, params, body, auth in plan[: min(5, len(plan))]:
+        await client.request(method, path, params=params, json=body, headers=headers if auth else None)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "requests": len(plan),
+        "errors": sum(n for status, n in statuses.items() if not status.startswith(("2", "3"))),
+        "statuses": dict(sorted(statuses.items())),
+        "rps": round(len(plan) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "queries_mean": round(statistics.mean(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+async def _run(args, data: dict) -> dict:
+    import httpx
+    from app.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for scenario in args.scenarios:
+            with contextlib.redirect_stdout(io.StringIO()):  # access-лог middleware
+                results[scenario] = await _drive(client, scenario, data, args)
+            r = results[scenario]
+            print(f"{scenario:<10} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+                  f"{r['errors']:>5} {r['queries_mean'] if r['queries_mean'] is not None else '-':>6}")
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=BACKEND_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def _compare(report: dict, baseline: dict) -> None:
+    print(f"\nvs baseline {baseline.get('meta', {}).get('commit')}")
+    print(f"{'scenario':<10} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>9}")
+    for scenario, r in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if not old:
+            continue
+
+        def delta(key):
+            if not old.get(key) or r.get(key) is None:
+                return "-"
+            return f"{(r[key] - old[key]) / old[key] * 100:+.0f}%"
+
+        print(f"{scenario:<10} {delta('rps'):>9} {delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9} "
+              f"{delta('queries_mean'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300, help="запросов на сценарий")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda s: s.split(","))
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--baseline", help="прошлый JSON: вывести дельты")
+    parser.add_argument("--reuse", action="store_true", help="не пересоздавать БД (уже засеяна этим же --seed)")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "novaprofile_bench_suite.db"))
+    os.environ.setdefault("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "novaprofile_bench_media"))
+    os.environ["QUERY_COUNT_HEADER"] = "true"  # X-Query-Count в ответах
+    use_backend_path()
+    from app.core.config import settings
+
+    data = _prepare(args)
+    print(f"{'scenario':<10} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5} {'sql':>6}")
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "database": settings.DB_URL.split(":", 1)[0],
+            "db_async": settings.DB_ASYNC,
+            "employees": args.employees,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "scenarios": asyncio.run(_run(args, data)),
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    print(f"written {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            _compare(report, json.load(fh))
+    sys.exit(1 if any(r["errors"] for r in report["scenarios"].values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
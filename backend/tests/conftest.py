@@ -0,0 +1,127 @@
+# tests/conftest.py
+"""
+Общие фикстуры: временная SQLite с синтетикой app.synthetic, клиент in-process и счётчик SQL.
+
+Режим БД (DB_ASYNC) читается при импорте app, поэтому оба режима гоняются в одном процессе так:
+приложение поднято с async-движком, а параметр db_mode="sync" подменяет get_session на
+ThreadedSession поверх sync-движка — ровно то, что get_session отдаёт при DB_ASYNC=false.
+
+    python -m pytest tests
+"""
+import contextlib
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), f"novaprofile_tests_{os.getpid()}.db")
+os.environ.setdefault("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "novaprofile_tests_media"))
+os.environ["DB_ASYNC"] = "true"
+os.environ["QUERY_COUNT_HEADER"] = "true"
+os.environ["QUERY_BUDGET_STRICT"] = "true"  # перерасход внутри хэндлера — 500, тест увидит
+
+ADMIN = "tests-admin@example.com"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """Свежая база: 300 сотрудников (--seed 42), звёзды, анкеты 360°, админ. id для запросов."""
+    from sqlalchemy import insert, select
+
+    import app.models  # noqa: F401  (все таблицы в metadata)
+    from app import seed, synthetic
+    from app.core.db import Base, SessionLocal, engine
+    from app.core.security import hash_password
+    from app.models.employee import Employee
+    from app.models.feedback360 import Feedback360Score
+    from app.models.role import Role, RoleStatus
+    from app.models.user import User
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seed.seed_data(synthetic.Sizes(employees=300, stars=20), log=lambda *_: None)
+    with SessionLocal() as db:
+        db.add(User(email=ADMIN, password_hash=hash_password("tests"), role="admin"))
+        employees = db.scalars(select(Employee.id)).all()
+        db.execute(insert(Feedback360Score), [
+            dict(employee_id=employee_id, cycle="2025-H1", competency=f"C{q % 3}", question=f"Q{q}", position=q,
+                 peers=3.5, reports=4.0, manager=3.0, self_=4.5)
+            for employee_id in employees for q in range(6)
+        ])
+        db.commit()
+        manager = db.scalar(select(Employee.manager_id).where(Employee.manager_id.is_not(None)))
+        role_id = db.scalar(select(Role.id).where(Role.status == RoleStatus.active))
+        department = db.scalar(select(Employee.department).where(Employee.manager_id == manager))
+    yield {"employee_id": str(manager), "role_id": str(role_id), "department": department}
+    engine.dispose()
+    with contextlib.suppress(OSError):
+        os.remove(engine.url.database)
+
+
+async def _threaded_session():
+    # ветка get_session при DB_ASYNC=false
+    from app.core.db import SessionLocal
+    from app.db.session import ThreadedSession
+
+    session = ThreadedSession(SessionLocal())
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest.fixture(params=["async", "sync"])
+def db_mode(request):
+    from app.db.session import get_session
+    from app.main import app
+
+    if request.param == "sync":
+        app.dependency_overrides[get_session] = _threaded_session
+    yield request.param
+    app.dependency_overrides.pop(get_session, None)
+
+
+@pytest.fixture
+async def client(seeded, db_mode):
+    """Клиент под админом; кэш пользователя прогрет — авторизация запроса SQL не делает."""
+    import httpx
+
+    from app.core.security import create_access_token
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {create_access_token(ADMIN)}"}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://tests", headers=headers) as c:
+        assert (await c.get("/api/v1/auth/me")).status_code == 200
+        yield c
+
+
+@pytest.fixture
+def count_queries():
+    """
+    with count_queries() as counter: ... — сколько SQL выполнено внутри блока (counter.count).
+    Тот же QueryCounter, что у middleware и @query_budget: счётчик запроса дочерний к этому.
+    Кэши ответов сбрасываются, чтобы считать настоящую выборку, а не попадание в кэш.
+    """
+    from app.core import querybudget, response_cache
+
+    @contextlib.contextmanager
+    def counting():
+        response_cache.invalidate()
+        counter, token = querybudget.request_counter()
+        try:
+            yield counter
+        finally:
+            querybudget.reset(token)
+
+    return counting
@@ -0,0 +1,67 @@
+# tests/test_employee_import.py
+"""POST /employees/import: битые файлы — 400."""
+import io
+import uuid
+import zipfile
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _zip_without_workbook() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("readme.txt", "not a workbook")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("content", [b"not a zip", _zip_without_workbook()], ids=["not-zip", "zip-without-workbook"])
+async def test_corrupt_xlsx_is_400(client, content):
+    response = await client.post(
+        "/api/v1/employees/import", files={"file": ("staff.xlsx", content, "application/octet-stream")},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File is not a valid XLSX workbook"
+
+
+def _csv(*rows) -> bytes:
+    return ("email,name,manager\n" + "".join(",".join(r) + "\n" for r in rows)).encode()
+
+
+def _ancestors(email: str) -> list[str]:
+    from sqlalchemy import select
+
+    from app.core.db import SessionLocal
+    from app.models.employee import Employee
+    from app.models.hierarchy import ancestors_stmt
+
+    with SessionLocal() as db:
+        node = db.scalar(select(Employee.id).where(Employee.email == email))
+        return [e.email for e, _ in db.execute(ancestors_stmt(node)).all()]
+
+
+@pytest.mark.parametrize("rebuild_at", [500, 0], ids=["incremental", "rebuild"])
+async def test_import_keeps_hierarchy(client, monkeypatch, rebuild_at):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "IMPORT_HIERARCHY_REBUILD_AT", rebuild_at)
+    tag = uuid.uuid4().hex[:8]
+    a, b, c = (f"{n}-{tag}@example.com" for n in "abc")
+
+    async def upload(content: bytes) -> dict:
+        response = await client.post("/api/v1/employees/import", files={"file": ("staff.csv", content, "text/csv")})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    # руководитель ниже по файлу, чем подчинённый
+    result = await upload(_csv((c, "Импорт Ц", b), (b, "Импорт Б", a), (a, "Импорт А", "")))
+    assert (result["created"], result["managers_linked"], result["error_count"]) == (3, 2, 0), result
+    assert _ancestors(c) == [b, a]
+
+    # A под C замкнул бы цикл; C под A — законная смена
+    result = await upload(_csv((a, "Импорт А", c), (c, "Импорт Ц", a)))
+    assert result["managers_linked"] == 1
+    assert [e["message"] for e in result["errors"]] == ["Manager would create a cycle in the org chart"]
+    assert _ancestors(c) == [a]
+    assert _ancestors(b) == [a]
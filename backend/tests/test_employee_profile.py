@@ -0,0 +1,92 @@
+# tests/test_employee_profile.py
+"""GET /employees/{id}/profile: вся карточка — ровно 6 SQL при любом объёме блоков."""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="module")
+def profile_employee(seeded) -> dict:
+    """Сотрудник с цепочкой из двух руководителей, оценками, карьерой, отзывами и звёздами."""
+    from sqlalchemy import select
+
+    from app.core.db import SessionLocal
+    from app.models.assessment import Assessment
+    from app.models.career import CareerHistory
+    from app.models.employee import Employee
+    from app.models.review import Review
+    from app.models.role import Role, RoleStatus
+    from app.models.succession import Succession
+
+    def person(name: str, manager_id=None) -> Employee:
+        return Employee(
+            id=uuid.uuid4(), name=name, email=f"{uuid.uuid4().hex[:12]}@profile.test", title="Аналитик",
+            department="QA", unit="Profile", manager_id=manager_id,
+            bio="", languages={}, contacts={}, competencies={"Excel": 4}, assessments_count=0,
+        )
+
+    with SessionLocal() as db:
+        director = person("Профиль Директор")
+        db.add(director)
+        db.flush()
+        head = person("Профиль Руководитель", director.id)
+        db.add(head)
+        db.flush()
+        employee = person("Профиль Сотрудник", head.id)
+        db.add(employee)
+        db.flush()
+
+        roles = db.scalars(select(Role.id).where(Role.status == RoleStatus.active).limit(3)).all()
+        day = date(2025, 9, 1)
+        db.add_all(
+            Assessment(employee_id=employee.id, role_id=roles[0], date=day - timedelta(days=30 * i),
+                       percent=60 + i, source="manual", payload={})
+            for i in range(8)
+        )
+        db.add_all(
+            CareerHistory(employee_id=employee.id, role_title=f"Должность {i}", started_at=day - timedelta(days=400 * (i + 1)),
+                          ended_at=day - timedelta(days=400 * i), payload={})
+            for i in range(3)
+        )
+        db.add_all(
+            Review(employee_id=employee.id, type="manager", date=day - timedelta(days=i), text=f"Отзыв {i}", meta={})
+            for i in range(12)
+        )
+        db.add_all([
+            Succession(employee_id=employee.id, target_role=roles[0], is_starred=True, notes="готов"),
+            Succession(employee_id=employee.id, target_role=roles[1], is_starred=True, notes=""),
+            Succession(employee_id=employee.id, target_role=roles[2], is_starred=False, notes="снята"),
+        ])
+        db.commit()
+        return {"id": str(employee.id), "managers": [str(head.id), str(director.id)]}
+
+
+async def test_profile_is_six_queries(client, count_queries, profile_employee):
+    with count_queries() as counter:
+        response = await client.get(
+            f"/api/v1/employees/{profile_employee['id']}/profile", params={"assessments": 5, "reviews": 10},
+        )
+
+    assert response.status_code == 200, response.text
+    assert counter.count == 6
+    body = response.json()
+    assert body["employee"]["id"] == profile_employee["id"]
+    assert len(body["assessments"]) == 5
+    assert len(body["career"]) == 3
+    assert len(body["reviews"]) == 10
+    assert len(body["succession"]) == 2
+    assert [m["id"] for m in body["managers"]] == profile_employee["managers"]
+
+
+async def test_profile_query_count_does_not_grow_with_limits(client, count_queries, profile_employee):
+    with count_queries() as counter:
+        response = await client.get(
+            f"/api/v1/employees/{profile_employee['id']}/profile", params={"assessments": 50, "reviews": 100},
+        )
+
+    assert response.status_code == 200, response.text
+    assert counter.count == 6
+    assert len(response.json()["reviews"]) == 12
@@ -0,0 +1,53 @@
+# tests/test_metrics.py
+"""GET /metrics и /cachez: без METRICS_TOKEN/METRICS_ALLOW_IPS закрыты, loopback и частные сети сами по себе не пускают."""
+import httpx
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _scrape(client_ip: str, path: str = "/metrics", **headers) -> int:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app, client=(client_ip, 4000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://tests") as c:
+        return (await c.get(path, headers=headers)).status_code
+
+
+async def test_closed_by_default(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "")
+    for ip in ("127.0.0.1", "10.0.0.5", "172.17.0.1"):
+        assert await _scrape(ip) == 404, ip
+
+
+async def test_token(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "")
+    assert await _scrape("203.0.113.9", Authorization="Bearer scrape-secret") == 200
+    assert await _scrape("203.0.113.9", Authorization="Bearer wrong") == 404
+    assert await _scrape("127.0.0.1") == 404
+
+
+async def test_allowlist(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "10.0.5.7,192.168.10.0/24")
+    assert await _scrape("10.0.5.7") == 200
+    assert await _scrape("192.168.10.42") == 200
+    assert await _scrape("10.0.5.8") == 404
+
+
+async def test_cachez_shares_the_gate(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "10.0.5.7")
+    assert await _scrape("127.0.0.1", "/cachez") == 404
+    assert await _scrape("10.0.5.7", "/cachez") == 200
+    assert await _scrape("203.0.113.9", "/cachez", Authorization="Bearer scrape-secret") == 200
@@ -0,0 +1,143 @@
+# tests/test_org_changes.py
+"""Журнал org_changes и GET /org/tree: что двигает версию, когда дельта, ETag и ретеншен."""
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _version() -> int:
+    from app.core.db import SessionLocal
+    from app.models.org_change import current_version_stmt
+
+    with SessionLocal() as db:
+        return db.scalar(current_version_stmt())
+
+
+def _update(employee_id: str, **values) -> None:
+    from app.core.db import SessionLocal
+    from app.models.employee import Employee
+
+    with SessionLocal() as db:
+        employee = db.get(Employee, uuid.UUID(employee_id))
+        for name, value in values.items():
+            setattr(employee, name, value)
+        db.commit()
+
+
+@pytest.fixture(scope="module")
+def team(seeded) -> dict:
+    """Руководитель с двумя подчинёнными: одного из них тесты переводят туда-обратно."""
+    from app.core.db import SessionLocal
+    from app.models.employee import Employee
+
+    def person(name: str, manager_id=None) -> Employee:
+        return Employee(
+            id=uuid.uuid4(), name=name, email=f"{uuid.uuid4().hex[:12]}@org.test", title="Инженер",
+            department="QA", unit="Org", manager_id=manager_id,
+            bio="", languages={}, contacts={}, competencies={"Python": 3}, assessments_count=0,
+        )
+
+    with SessionLocal() as db:
+        head = person("Оргжурнал Руководитель")
+        db.add(head)
+        db.flush()
+        first, second = person("Оргжурнал Первый", head.id), person("Оргжурнал Второй", head.id)
+        db.add_all([first, second])
+        db.commit()
+        return {"head": str(head.id), "first": str(first.id), "second": str(second.id)}
+
+
+def test_only_tracked_fields_move_version(team):
+    version = _version()
+    _update(team["first"], bio="новое описание", contacts={"tg": "@first"})
+    assert _version() == version
+
+    _update(team["first"], title="Старший инженер")
+    assert _version() == version + 1
+
+
+async def test_delta_after_move(client, team):
+    full = (await client.get("/api/v1/org/tree")).json()
+    _update(team["second"], manager_id=uuid.UUID(team["first"]))
+    try:
+        body = (await client.get("/api/v1/org/tree", params={"since": full["version"]})).json()
+        assert body["since"] == full["version"]
+        assert team["second"] in body["nodes"]
+        assert body["children"][team["first"]] == [team["second"]]
+    finally:
+        _update(team["second"], manager_id=uuid.UUID(team["head"]))
+
+
+async def test_since_zero_is_full_snapshot(client, team):
+    body = (await client.get("/api/v1/org/tree", params={"since": 0})).json()
+    assert body["since"] is None
+    assert team["head"] in body["nodes"]
+
+
+async def test_long_delta_is_full_snapshot(client, team, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ORG_DELTA_MAX_CHANGES", 2)
+    version = (await client.get("/api/v1/org/tree")).json()["version"]
+    for i in range(3):
+        _update(team["first"], title=f"Инженер {i}")
+
+    body = (await client.get("/api/v1/org/tree", params={"since": version})).json()
+    assert body["since"] is None
+    assert body["nodes"][team["first"]]["title"] == "Инженер 2"
+
+
+async def test_if_none_match_is_a_tag_list(client, team):
+    etag = (await client.get("/api/v1/org/tree")).headers["etag"]
+
+    for header in (etag, f'"stale", {etag}', "*"):
+        response = await client.get("/api/v1/org/tree", headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+    # текущий тег подстрокой чужого — не совпадение
+    response = await client.get("/api/v1/org/tree", headers={"If-None-Match": f'"v{etag}"'})
+    assert response.status_code == 200
+
+
+def test_journal_is_trimmed(team, monkeypatch):
+    from sqlalchemy import func, select
+
+    from app.core.config import settings
+    from app.core.db import engine
+    from app.models.org_change import OrgChange, mark_org_reset
+
+    def rows() -> tuple[int, int]:
+        with engine.connect() as connection:
+            return connection.execute(select(func.count(), func.min(OrgChange.version)).select_from(OrgChange)).one()
+
+    monkeypatch.setattr(settings, "ORG_CHANGES_KEEP", 4)
+    for i in range(10):
+        _update(team["first"], title=f"Ротация {i}")
+    count, oldest = rows()
+    assert count < 2 * 4
+    assert oldest > _version() - 2 * 4
+
+    with engine.begin() as connection:
+        mark_org_reset(connection)
+    assert rows() == (1, _version())
+
+
+async def test_since_ahead_of_version_is_full_snapshot(client, team):
+    version = (await client.get("/api/v1/org/tree")).json()["version"]
+    body = (await client.get("/api/v1/org/tree", params={"since": version + 1000})).json()
+    assert body["since"] is None
+    assert team["head"] in body["nodes"]
+
+
+async def test_only_dept_unit_trees_are_cached(client, team):
+    from app.api.v1.org import _snapshots
+
+    _snapshots.clear()
+    await client.get("/api/v1/org/tree", params={"dept": "QA", "unit": "Org"})
+    for i in range(5):
+        body = (await client.get("/api/v1/org/tree", params={"search": f"Оргжурнал {i}"})).json()
+        assert "nodes" in body
+    response = await client.get("/api/v1/org/tree", params={"manager": team["head"]})
+    assert set(response.json()["nodes"]) == {team["first"], team["second"]}
+    assert len(_snapshots) == 1
@@ -0,0 +1,32 @@
+# tests/test_org_expand.py
+"""GET /org/expand: ORG_EXPAND_MAX_NODES ограничивает ответ при любых depth × limit, остаток — по курсорам."""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_node_cap(client, monkeypatch):
+    from app.core.config import settings
+
+    roots = (await client.get("/api/v1/org/expand")).json()["nodes"].values()
+    ceo = max(roots, key=lambda n: n["headcount"])["id"]  # синтетика; остальные корни — из других тестов
+    monkeypatch.setattr(settings, "ORG_EXPAND_MAX_NODES", 40)
+    body = (await client.get("/api/v1/org/expand", params={"node": ceo, "depth": 5, "limit": 200})).json()
+    assert len(body["nodes"]) == 40
+    loaded = sum(len(ids) for ids in body["children"].values()) + len(body["root_ids"])
+    assert loaded == 40
+
+    # родитель, на котором кончился предел, дочитывается своим курсором без повторов
+    parent, cursor = next((p, c) for p, c in body["next_cursor"].items() if body["children"].get(p))
+    rest = (await client.get("/api/v1/org/expand", params={"node": parent, "cursor": cursor, "limit": 200})).json()
+    more = rest["children"][parent]
+    assert more and not set(more) & set(body["children"][parent])
+
+
+async def test_cap_applies_to_roots(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ORG_EXPAND_MAX_NODES", 1)
+    body = (await client.get("/api/v1/org/expand", params={"depth": 3, "limit": 200})).json()
+    assert len(body["nodes"]) == 1
+    assert body["children"] == {}
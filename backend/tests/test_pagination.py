@@ -0,0 +1,51 @@
+# tests/test_pagination.py
+"""Keyset-курсоры list-эндпоинтов: обход страницами совпадает с OFFSET, подделка курсора — 400."""
+import base64
+import json
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _cursor(values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+async def test_cursor_walk_matches_offset(client, seeded):
+    params = {"dept": seeded["department"], "fields": "name"}
+    full = (await client.get("/api/v1/employees", params={**params, "per_page": 200})).json()
+    expected = [item["id"] for item in full["items"]]
+    assert len(expected) > 7
+
+    walked, cursor = [], None
+    while True:
+        page = (await client.get("/api/v1/employees", params={**params, "per_page": 7, "cursor": cursor or ""})).json()
+        walked += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert walked == expected
+
+
+@pytest.mark.parametrize("values", [
+    ["x", 123],
+    ["x", {"a": 1}],
+    [{"a": 1}, uuid.uuid4().hex],
+    [["x"], uuid.uuid4().hex],
+    [True, uuid.uuid4().hex],
+    ["x", "not-a-uuid"],
+    ["x"],
+    {"name": "x"},
+])
+async def test_tampered_cursor_is_400(client, values):
+    response = await client.get("/api/v1/employees", params={"cursor": _cursor(values)})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_garbage_cursor_is_400(client):
+    response = await client.get("/api/v1/employees", params={"cursor": "%%%not-base64"})
+    assert response.status_code == 400
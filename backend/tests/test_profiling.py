@@ -0,0 +1,25 @@
+# tests/test_profiling.py
+"""Лог медленного SQL: warning в логгер app.core.profiling и строка в slow_queries.jsonl без значений."""
+import json
+import logging
+
+from sqlalchemy import create_engine, text
+
+
+def test_slow_query_is_logged(tmp_path, monkeypatch, caplog):
+    from app.core import profiling
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.000001)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    engine = create_engine("sqlite://")
+    profiling.instrument_slow_queries(engine, "tests")
+
+    with caplog.at_level(logging.WARNING, logger="app.core.profiling"), engine.connect() as conn:
+        conn.execute(text("SELECT :secret AS value"), {"secret": "p@ssw0rd"})
+
+    assert any("slow SQL" in r.getMessage() for r in caplog.records)
+    record = json.loads((tmp_path / profiling.SLOW_LOG).read_text().splitlines()[-1])
+    assert record["engine"] == "tests"
+    assert "p@ssw0rd" not in json.dumps(record)
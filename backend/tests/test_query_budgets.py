@@ -0,0 +1,87 @@
+# tests/test_query_budgets.py
+"""
+Бюджеты SQL маршрутов (@query_budget): число запросов не растёт с per_page / depth / limit.
+
+Запрос целиком (авторизация из прогретого кэша — 0) не должен превысить бюджет хэндлера;
+QUERY_BUDGET_STRICT=true, так что перерасход внутри хэндлера — ещё и 500.
+"""
+import pytest
+
+from app.core.metrics import route_template
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+SMALL, LARGE = 1, 200
+E, R = "{employee_id}", "{role_id}"
+
+# (method, path, params, json); {employee_id} / {role_id} / {department} — из фикстуры seeded
+PLAN = [
+    *[("GET", path, {"per_page": n}, None)
+      for path in ("/api/v1/employees", f"/api/v1/employees/{E}/assessments", "/api/v1/roles",
+                   "/api/v1/vacancies", "/api/v1/succession")
+      for n in (SMALL, LARGE)],
+    ("GET", "/api/v1/employees", {"search": "а", "per_page": LARGE}, None),
+    ("GET", "/api/v1/employees", {"per_page": LARGE, "cursor": "", "with_total": "false"}, None),
+    ("GET", f"/api/v1/employees/{E}", {}, None),
+    ("GET", f"/api/v1/employees/{E}/profile", {"assessments": 50, "reviews": 100}, None),
+    ("GET", f"/api/v1/roles/{R}", {}, None),
+    *[("GET", f"/api/v1/roles/{R}/candidates", {"limit": n}, None) for n in (SMALL, LARGE)],
+    ("GET", "/api/v1/org/tree", {}, None),
+    ("GET", "/api/v1/org/tree", {"since": 0}, None),
+    *[("GET", "/api/v1/org/expand", {"depth": d}, None) for d in (1, 5)],
+    ("GET", "/api/v1/org/expand", {"node": E, "depth": 5}, None),
+    ("GET", f"/api/v1/org/{E}/subtree", {}, None),
+    ("GET", f"/api/v1/org/{E}/ancestors", {}, None),
+    ("GET", "/api/v1/feedback360/summary", {"department": "{department}"}, None),
+    ("GET", f"/api/v1/feedback360/{E}", {}, None),
+    ("POST", "/api/v1/succession/toggle", {},
+     {"employee_id": E, "target_role": R, "is_starred": True, "notes": "x"}),
+    ("POST", "/api/v1/succession/bulk", {}, {"items": [
+        {"employee_id": E, "target_role": R, "is_starred": False},
+        {"employee_id": E, "target_role": R, "is_starred": True, "notes": None},
+    ]}),
+]
+
+BUDGETS = {
+    (method, route.path): route.endpoint.query_budget
+    for route in app.routes if hasattr(getattr(route, "endpoint", None), "query_budget")
+    for method in getattr(route, "methods", ())
+}
+
+
+def _fill(value, ids: dict):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {k: _fill(v, ids) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, ids) for v in value]
+    return value
+
+
+def _route(method: str, path: str) -> str:
+    return route_template(app.router.routes, {"type": "http", "method": method, "path": path, "root_path": ""})
+
+
+def _id(item) -> str:
+    method, path, params, _ = item
+    return f"{method} {path} " + ",".join(f"{k}={v}" for k, v in params.items())
+
+
+@pytest.mark.parametrize("method,path,params,body", PLAN, ids=[_id(item) for item in PLAN])
+async def test_route_within_budget(client, seeded, count_queries, method, path, params, body):
+    path, params, body = _fill(path, seeded), _fill(params, seeded), _fill(body, seeded)
+    budget = BUDGETS.get((method, _route(method, path)))
+    assert budget is not None, f"{method} {path}: no @query_budget"
+
+    with count_queries() as counter:
+        response = await client.request(method, path, params=params, json=body)
+
+    assert response.status_code < 400, response.text
+    assert counter.count <= budget, f"{method} {path} {params}: {counter.count} SQL, budget {budget}"
+
+
+def test_every_budget_is_exercised(seeded):
+    planned = {(method, _route(method, _fill(path, seeded))) for method, path, _, _ in PLAN}
+    assert set(BUDGETS) - planned == set()
@@ -0,0 +1,52 @@
+# tests/test_reports.py
+"""Общий рендер PDF: ушедший первый запрос не отменяет рендер для остальных и кэша."""
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cancelled_caller_keeps_shared_render(monkeypatch):
+    from app.reports import service
+
+    started, release, renders = asyncio.Event(), asyncio.Event(), []
+
+    async def fake_render(template, context):
+        renders.append(template)
+        started.set()
+        await release.wait()
+        return b"%PDF-shared"
+
+    monkeypatch.setattr(service, "_render", fake_render)
+    key = service.cache_key("idp.html.j2", {"case": "cancel"})
+    service.pdf_cache.pop(key)
+
+    first = asyncio.create_task(service.pdf("idp.html.j2", {"case": "cancel"}))
+    await started.wait()
+    second = asyncio.create_task(service.pdf("idp.html.j2", {"case": "cancel"}))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == (key, b"%PDF-shared")
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert renders == ["idp.html.j2"]
+    assert service.pdf_cache.get(key) == b"%PDF-shared"
+    assert key not in service._inflight
+
+
+async def test_render_error_reaches_every_caller(monkeypatch):
+    from app.reports import service
+
+    async def broken(template, context):
+        await asyncio.sleep(0)
+        raise RuntimeError("layout failed")
+
+    monkeypatch.setattr(service, "_render", broken)
+    results = await asyncio.gather(
+        *(service.pdf("idp.html.j2", {"case": "error"}) for _ in range(3)), return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service.pdf_cache.get(service.cache_key("idp.html.j2", {"case": "error"})) is None
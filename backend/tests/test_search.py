@@ -0,0 +1,16 @@
+# tests/test_search.py
+"""Нормализация search_text: складываются только строчные двойники латиницы."""
+from app.core.search import normalize
+
+
+def test_lowercase_homoglyphs_fold():
+    assert normalize("СЕО") == normalize("CEO") == "ceo"
+    assert normalize("пeтpoв") == normalize("Петров")
+    assert normalize("Ёлкин  \t Хор") == "eлкин xop"
+
+
+def test_uppercase_only_lookalikes_stay_cyrillic():
+    # в н т м к похожи на B H T M K только заглавными
+    assert normalize("Вера") != normalize("bepa")
+    assert normalize("Том") != normalize("tom")
+    assert normalize("Кнут") == "кнyт"
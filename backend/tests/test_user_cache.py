@@ -0,0 +1,74 @@
+# tests/test_user_cache.py
+"""Кэш пользователей: запись в users выкидывает запись и на flush, и на COMMIT."""
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def user_email(seeded) -> str:
+    from app.core.db import SessionLocal
+    from app.core.security import hash_password
+    from app.models.user import User
+
+    email = f"cache-{uuid.uuid4().hex[:8]}@example.com"
+    with SessionLocal() as db:
+        db.add(User(email=email, password_hash=hash_password("tests"), role="viewer"))
+        db.commit()
+    return email
+
+
+def _stale(email: str):
+    from app.core.security import Principal
+
+    return Principal(email=email, role="viewer", is_active=True)
+
+
+def test_deactivation_evicts_again_on_commit(user_email):
+    from sqlalchemy import select
+
+    from app.core.db import SessionLocal
+    from app.core.security import user_cache
+    from app.models.user import User
+
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == user_email))
+        user.is_active = False
+        db.flush()
+        assert user_cache.get(user_email) is None
+        # параллельный запрос между flush и commit видит старую строку и кэширует её
+        user_cache.set(user_email, _stale(user_email))
+        db.commit()
+    assert user_cache.get(user_email) is None
+
+
+def test_bulk_update_evicts_on_commit(user_email):
+    from sqlalchemy import update
+
+    from app.core.db import SessionLocal
+    from app.core.security import user_cache
+    from app.models.user import User
+
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == user_email).values(role="admin"))
+        user_cache.set(user_email, _stale(user_email))
+        db.commit()
+    assert user_cache.get(user_email) is None
+
+
+@pytest.mark.anyio
+async def test_load_during_eviction_is_not_cached(user_email):
+    from app.core import security
+    from app.core.db import SessionLocal
+
+    class RacingSession:
+        """Пока читаем строку, соседний запрос коммитит запись в users."""
+
+        async def scalar(self, stmt):
+            security.invalidate_user(user_email)
+            with SessionLocal() as db:
+                return db.scalar(stmt)
+
+    principal = await security._load_principal(RacingSession(), user_email)
+    assert principal.email == user_email
+    assert security.user_cache.get(user_email) is None